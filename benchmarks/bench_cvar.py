@@ -0,0 +1,58 @@
+"""
+Benchmark: CVaR optimization on large scenario sets.
+
+Measures wall-clock time and peak memory of
+PortfolioOptimizer.cvar_optimization for a synthetic scenario matrix.
+
+Usage:
+    python benchmarks/bench_cvar.py --scenarios 100000 --assets 500
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.optimizer import PortfolioOptimizer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", type=int, default=100_000)
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--time-budget", type=float, default=None, help="Fail if slower (seconds)")
+    parser.add_argument("--memory-budget", type=float, default=None, help="Fail if peak RSS exceeds (MB)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    tickers = [f"A{i}" for i in range(args.assets)]
+    # small price history just to initialise mu / S
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (300, args.assets)), axis=0)),
+                          columns=tickers)
+    scenarios = rng.standard_t(5, (args.scenarios, args.assets)) * 0.01
+
+    opt = PortfolioOptimizer(prices)
+    start = time.perf_counter()
+    result = opt.cvar_optimization(scenarios, confidence_level=args.confidence)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"scenarios={args.scenarios} assets={args.assets}")
+    print(f"wall-clock: {elapsed:.2f}s  peak RSS: {peak_mb:.0f} MB")
+    print(f"CVaR: {result['performance']['cvar']:.5f}  holdings: {len(result['weights'])}")
+
+    if args.time_budget is not None and elapsed > args.time_budget:
+        sys.exit(f"Time budget exceeded: {elapsed:.2f}s > {args.time_budget}s")
+    if args.memory_budget is not None and peak_mb > args.memory_budget:
+        sys.exit(f"Memory budget exceeded: {peak_mb:.0f} MB > {args.memory_budget} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: streaming bulk import of a broker trade file.
+
+Writes a synthetic CSV export, imports it with
+core.importer.import_trades into a scratch portfolio store and reports
+rows per second. OHLC comes from a synthetic generator instead of the
+network, so the number measures parsing, validation and writes.
+
+Usage:
+    python benchmarks/bench_import.py --rows 200000 --tickers 200 --backend sqlite [--sell-fraction 0.1]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.core.importer as importer
+import src.core.nav_cache as nav_cache
+import src.core.portfolio_io as portfolio_io
+
+
+def synthetic_ohlc(ticker, start, end):
+    days = np.arange(start, end, dtype="datetime64[D]")
+    days = pd.DatetimeIndex(days[np.is_busday(days)])
+    return pd.DataFrame({"Open": 100.0, "High": 101.0, "Low": 99.0, "Close": 100.0}, index=days)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--backend", choices=["json", "sqlite", "journal"], default="sqlite")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--sell-fraction", type=float, default=0.0, help="Share of rows that are small sells")
+    parser.add_argument("--min-rows-per-second", type=float, default=None, help="Fail if slower")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    workdir = tempfile.mkdtemp(prefix="bench_import_")
+    path = os.path.join(workdir, "trades.csv")
+    pd.DataFrame({
+        "Symbol": np.array([f"T{i}" for i in range(args.tickers)])[rng.integers(0, args.tickers, args.rows)],
+        "Trade Date": pd.bdate_range("2010-01-04", periods=3000)[rng.integers(0, 3000, args.rows)].strftime("%Y-%m-%d"),
+        "Quantity": rng.integers(1, 500, args.rows),
+        "Price": rng.uniform(99.0, 101.0, args.rows).round(2),
+        "Action": np.where(rng.random(args.rows) < args.sell_fraction, "SELL", "BUY"),
+    }).to_csv(path, index=False)
+
+    portfolio_io.PORTFOLIO_BACKEND = args.backend
+    portfolio_io.PORTFOLIO_DIR = os.path.join(workdir, "portfolios")
+    portfolio_io.PORTFOLIO_DB = os.path.join(workdir, "portfolios.db")
+    portfolio_io.PORTFOLIO_JOURNAL_DIR = os.path.join(workdir, "journal")
+    nav_cache.NAV_CACHE_DIR = os.path.join(workdir, "nav")
+    importer.fetch_ohlc_range = synthetic_ohlc
+
+    report = importer.import_trades(path, "bench", chunksize=args.chunksize)
+
+    print(f"rows={report['rows']} tickers={args.tickers} backend={args.backend}")
+    print(f"imported={report['imported']} sold={report['sold']} rejected={len(report['rejected'])} "
+          f"unverified={report['unverified']}")
+    print(f"wall-clock: {report['seconds']:.2f}s  throughput: {report['rows_per_second']:,.0f} rows/s")
+
+    if args.min_rows_per_second is not None and report["rows_per_second"] < args.min_rows_per_second:
+        sys.exit(f"Throughput below budget: {report['rows_per_second']:,.0f} < {args.min_rows_per_second:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Module: cashflows
+Money-weighted (XIRR) and time-weighted returns from lot cash flows.
+
+Features:
+- Cash flows derived from the stored lots (date, shares, price)
+- XIRR solved for every position and portfolio at once with a
+  safeguarded, vectorized Newton iteration (bisection fallback)
+- Time-weighted return from a NAV series and external flows
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+
+def _lot_flows(lots: List[dict], price: float, as_of: str) -> Tuple[list, list]:
+    """Purchase outflows for every lot plus one terminal inflow at market value."""
+    dates = [l["date"] for l in lots]
+    amounts = [-l["shares"] * l["price"] for l in lots]
+    dates.append(as_of)
+    amounts.append(sum(l["shares"] for l in lots) * price)
+    return dates, amounts
+
+
+def xirr(flow_sets: List[Tuple[list, list]], guess: float = 0.1,
+         tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+    """
+    Annualized internal rate of return for many irregular cash-flow sets at once.
+
+    Flow sets are padded into one (sets x flows) matrix and solved together:
+    every iteration takes a Newton step on all rows, falling back to
+    bisection wherever the step would leave the row's sign-change bracket.
+
+    Args:
+        flow_sets: List of (dates, amounts) pairs; outflows negative.
+        guess: Starting rate.
+        tol: Convergence tolerance on the rate.
+        max_iter: Maximum iterations.
+
+    Returns:
+        np.ndarray: Rate per flow set (NaN where no root is bracketed).
+    """
+    m = len(flow_sets)
+    lengths = np.array([len(a) for _, a in flow_sets], dtype=int)
+    k = int(lengths.max()) if m else 0
+
+    # scatter all flows into the padded matrix with one conversion of the dates
+    rows = np.repeat(np.arange(m), lengths)
+    cols = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    days = np.array([str(d)[:10] for dates, _ in flow_sets for d in dates],
+                    dtype="datetime64[D]").astype(np.int64)
+    first = np.minimum.reduceat(days, np.cumsum(lengths) - lengths) if m else days
+
+    amounts = np.zeros((m, k))
+    years = np.zeros((m, k))
+    amounts[rows, cols] = [a for _, amts in flow_sets for a in amts]
+    years[rows, cols] = (days - first[rows]) / 365.0
+
+    def npv(rate):
+        disc = (1.0 + rate)[:, None] ** -years
+        value = (amounts * disc).sum(axis=1)
+        deriv = (-years * amounts * disc / (1.0 + rate)[:, None]).sum(axis=1)
+        return value, deriv
+
+    # bracket the root: NPV is positive near -100% for a normal investment
+    lo = np.full(m, -0.9999)
+    hi = np.full(m, 1.0)
+    f_lo, _ = npv(lo)
+    f_hi, _ = npv(hi)
+    for _ in range(10):
+        grow = np.sign(f_lo) == np.sign(f_hi)
+        if not grow.any():
+            break
+        hi = np.where(grow, hi * 4, hi)
+        f_hi = np.where(grow, npv(hi)[0], f_hi)
+    bracketed = np.sign(f_lo) != np.sign(f_hi)
+
+    rate = np.clip(np.full(m, guess), lo, hi)
+    for _ in range(max_iter):
+        f, df = npv(rate)
+        # shrink the bracket around the root
+        same_as_lo = np.sign(f) == np.sign(f_lo)
+        lo = np.where(same_as_lo, rate, lo)
+        hi = np.where(same_as_lo, hi, rate)
+        f_lo = np.where(same_as_lo, f, f_lo)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = rate - f / df
+        bad = ~np.isfinite(step) | (step <= lo) | (step >= hi)
+        new_rate = np.where(bad, 0.5 * (lo + hi), step)
+        if np.all(np.abs(new_rate - rate) < tol):
+            rate = new_rate
+            break
+        rate = new_rate
+
+    return np.where(bracketed, rate, np.nan)
+
+
+def portfolio_xirr(portfolios: Dict[str, dict], prices: pd.Series, as_of=None,
+                   by_position: bool = False):
+    """
+    Money-weighted return of each portfolio (or each position) from its lots.
+
+    Args:
+        portfolios: {name: portfolio_data} with lots as stored by
+                    ``core.portfolio_io`` ({ticker: [{"shares", "price", "date"}]}).
+        prices: Current price per ticker.
+        as_of: Valuation date (defaults to today).
+        by_position: Return one rate per (portfolio, ticker) instead.
+
+    Returns:
+        pd.Series: XIRR indexed by portfolio name, or by (portfolio, ticker).
+    """
+    as_of = str(pd.Timestamp(as_of or datetime.today().date()).date())
+    keys, flow_sets = [], []
+    for name, data in portfolios.items():
+        if by_position:
+            for ticker, lots in data.items():
+                if lots and ticker in prices:
+                    keys.append((name, ticker))
+                    flow_sets.append(_lot_flows(lots, prices[ticker], as_of))
+        else:
+            dates, amounts = [], []
+            for ticker, lots in data.items():
+                if lots and ticker in prices:
+                    d, a = _lot_flows(lots, prices[ticker], as_of)
+                    dates += d
+                    amounts += a
+            if dates:
+                keys.append(name)
+                flow_sets.append((dates, amounts))
+
+    rates = xirr(flow_sets) if flow_sets else np.array([])
+    index = pd.MultiIndex.from_tuples(keys, names=["portfolio", "ticker"]) if by_position else pd.Index(keys)
+    return pd.Series(rates, index=index, name="XIRR")
+
+
+def lot_flow_series(portfolio_data: dict) -> pd.Series:
+    """External cash flows (purchase amounts, positive = money in) by date."""
+    records = [(pd.Timestamp(l["date"]), l["shares"] * l["price"])
+               for lots in portfolio_data.values() for l in lots]
+    if not records:
+        return pd.Series(dtype=float)
+    dates, amounts = zip(*records)
+    return pd.Series(amounts, index=pd.DatetimeIndex(dates)).groupby(level=0).sum()
+
+
+def time_weighted_return(nav: pd.Series, flows: pd.Series = None,
+                         periods_per_year: int = 252) -> dict:
+    """
+    Time-weighted return, neutralizing the timing of deposits.
+
+    Each period's return is (V_t - F_t) / V_{t-1} - 1, where F_t is the
+    external flow added during period t; the periods are then chained.
+
+    Args:
+        nav: Portfolio value per session.
+        flows: External flows by date (e.g. ``lot_flow_series``); flows on
+               non-session dates are attributed to the next session.
+        periods_per_year: For annualization.
+
+    Returns:
+        dict: {"twr": cumulative return, "annualized": annualized return}.
+    """
+    nav = nav.dropna()
+    if flows is None or flows.empty:
+        f = pd.Series(0.0, index=nav.index)
+    else:
+        pos = nav.index.searchsorted(flows.index)
+        keep = pos < len(nav)
+        f = pd.Series(np.bincount(pos[keep], weights=flows.values[keep], minlength=len(nav)),
+                      index=nav.index)
+
+    v = nav.to_numpy(dtype=float)
+    prev = v[:-1]
+    valid = prev > 0
+    period = np.where(valid, (v[1:] - f.to_numpy()[1:]) / np.where(valid, prev, 1.0) - 1, 0.0)
+    twr = float(np.prod(1 + period) - 1)
+    n = int(valid.sum())
+    annualized = (1 + twr) ** (periods_per_year / n) - 1 if n else float("nan")
+    return {"twr": twr, "annualized": float(annualized)}
@@ -97,6 +97,54 @@ def fetch_latest_price(ticker: str) -> float:
         return float('nan')
 
 
+def fetch_price_snapshot(tickers) -> pd.DataFrame:
+    """
+    Latest and previous close for many tickers from one batched download.
+
+    Args:
+        tickers: Iterable of ticker symbols.
+
+    Returns:
+        pd.DataFrame: Indexed by ticker with "latest" and "previous"
+                      columns (NaN where a ticker returned no data).
+    """
+    tickers = list(dict.fromkeys(tickers))
+    snapshot = pd.DataFrame(index=pd.Index(tickers), columns=["latest", "previous"], dtype=float)
+    if not tickers:
+        return snapshot
+    try:
+        df = yf.download(tickers, period="5d", auto_adjust=True, progress=False, threads=True)
+        closes = df["Close"] if "Close" in df else df
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(name=tickers[0])
+        closes = closes.reindex(columns=tickers).ffill()
+        if len(closes) >= 1:
+            snapshot["latest"] = closes.iloc[-1]
+        if len(closes) >= 2:
+            snapshot["previous"] = closes.iloc[-2]
+    except Exception as e:
+        logger.warning(f"Failed to fetch price snapshot: {e}")
+    return snapshot
+
+
+@lru_cache(maxsize=512)
+def fetch_sector(ticker: str) -> str:
+    """
+    Fetch the sector classification for a ticker (cached per process).
+
+    Args:
+        ticker (str): Stock ticker symbol.
+
+    Returns:
+        str: Sector name (e.g. "Technology"), or "Unknown".
+    """
+    try:
+        return yf.Ticker(ticker).info.get("sector") or "Unknown"
+    except Exception as e:
+        logger.warning(f"Failed to fetch sector for {ticker}: {e}")
+        return "Unknown"
+
+
 def get_daily_returns(price_df: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate daily returns from adjusted close prices.
@@ -140,6 +188,28 @@ def fetch_price_on_date(ticker: str, on_date: str) -> pd.Series:
             # As last resort, return the first row
             return df.iloc[0]
 
+
+def fetch_ohlc_range(ticker: str, start: str, end: str) -> pd.DataFrame:
+    """
+    Daily unadjusted Open/High/Low/Close for one ticker from a single download.
+
+    Args:
+        ticker (str): Stock ticker symbol.
+        start (str): "YYYY-MM-DD" (inclusive).
+        end (str): "YYYY-MM-DD" (exclusive).
+
+    Returns:
+        pd.DataFrame: Date-indexed "Open", "High", "Low", "Close"; empty on error.
+    """
+    try:
+        df = yf.download(ticker, start=start, end=end, auto_adjust=False, progress=False)
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        return df[["Open", "High", "Low", "Close"]] if not df.empty else pd.DataFrame()
+    except Exception as e:
+        logger.warning(f"Failed to fetch OHLC for {ticker}: {e}")
+        return pd.DataFrame()
+
 def fetch_recommended(followed_only=False):
     # Again, you can wire up yfinance or your own watchlist.
     lst = [
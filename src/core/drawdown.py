@@ -0,0 +1,197 @@
+"""
+Module: drawdown
+Drawdown analytics for portfolio value (NAV) series.
+
+Features:
+- Underwater curve from the running maximum
+- Max drawdown, longest drawdown duration and recovery time for many
+  portfolios at once (one vectorized pass over a time x portfolio matrix)
+- Top-N drawdown episodes for a single series
+- Incremental tracker that updates from its last state as NAV points arrive
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _as_matrix(values):
+    """(time x portfolios) float array plus index/columns for re-labelling."""
+    if isinstance(values, pd.Series):
+        values = values.to_frame()
+    if isinstance(values, pd.DataFrame):
+        return values.to_numpy(dtype=float), values.index, values.columns
+    X = np.asarray(values, dtype=float)
+    X = X.reshape(-1, 1) if X.ndim == 1 else X
+    return X, pd.RangeIndex(X.shape[0]), pd.RangeIndex(X.shape[1])
+
+
+def _running_peak(X, prev_peak=None, prev_peak_pos=None, offset=0):
+    """
+    Running maximum and the row position of that maximum, optionally
+    continuing from a previous state.
+    """
+    t = np.broadcast_to(np.arange(offset, offset + X.shape[0])[:, None], X.shape)
+    if prev_peak is not None:
+        X = np.vstack([prev_peak[None, :], X])
+        t = np.vstack([prev_peak_pos[None, :], t])
+    peak = np.maximum.accumulate(X, axis=0)
+    peak_pos = np.maximum.accumulate(np.where(X >= peak, t, -1), axis=0)
+    if prev_peak is not None:
+        peak, peak_pos = peak[1:], peak_pos[1:]
+    return peak, peak_pos
+
+
+def underwater(values) -> pd.DataFrame:
+    """
+    Drawdown from the running peak at every point (0 at new highs, negative below).
+
+    Args:
+        values: NAV series (Series) or matrix (DataFrame / 2-D array, time x portfolios).
+
+    Returns:
+        pd.DataFrame: Same shape as ``values``.
+    """
+    X, index, columns = _as_matrix(values)
+    peak, _ = _running_peak(X)
+    return pd.DataFrame(X / peak - 1.0, index=index, columns=columns)
+
+
+def drawdown_stats(values) -> pd.DataFrame:
+    """
+    Summary drawdown statistics for every portfolio in one pass.
+
+    Args:
+        values: NAV series (Series) or matrix (DataFrame / 2-D array, time x portfolios).
+
+    Returns:
+        pd.DataFrame: One row per portfolio with
+            "Max Drawdown"     deepest peak-to-trough decline (negative),
+            "Peak", "Trough"   index labels bounding the max drawdown,
+            "Recovery"         first label back at the old peak (NaN if none),
+            "Recovery Time"    periods from trough to recovery (NaN if none),
+            "Max Duration"     longest time spent below a peak, in periods,
+            "Current Drawdown" drawdown at the last point.
+    """
+    X, index, columns = _as_matrix(values)
+    T = X.shape[0]
+    peak, peak_pos = _running_peak(X)
+    dd = X / peak - 1.0
+    cols = np.arange(X.shape[1])
+
+    trough = dd.argmin(axis=0)
+    peak_at_trough = peak_pos[trough, cols]
+
+    t = np.arange(T)[:, None]
+    recovered = (dd >= 0) & (t > trough)
+    has_recovery = recovered.any(axis=0)
+    recovery = np.where(has_recovery, recovered.argmax(axis=0), -1)
+
+    labels = np.asarray(index)
+    return pd.DataFrame({
+        "Max Drawdown": dd[trough, cols],
+        "Peak": labels[peak_at_trough],
+        "Trough": labels[trough],
+        "Recovery": pd.Series(labels[recovery], dtype=object).where(has_recovery).values,
+        "Recovery Time": np.where(has_recovery, recovery - trough, np.nan),
+        "Max Duration": (t - peak_pos).max(axis=0),
+        "Current Drawdown": dd[-1],
+    }, index=columns)
+
+
+def top_drawdowns(values: pd.Series, n: int = 5) -> pd.DataFrame:
+    """
+    The ``n`` deepest distinct drawdown episodes of a single NAV series.
+
+    An episode runs from a peak, through its trough, to the first point
+    back at that peak (or the end of the series if not yet recovered).
+
+    Returns:
+        pd.DataFrame: Columns "Peak", "Trough", "Recovery", "Drawdown",
+                      "Duration" (periods peak to recovery/end), deepest first.
+    """
+    X, index, _ = _as_matrix(values)
+    peak, peak_pos = _running_peak(X)
+    dd = (X / peak - 1.0)[:, 0]
+    peak_pos = peak_pos[:, 0]
+
+    below = dd < 0
+    if not below.any():
+        return pd.DataFrame(columns=["Peak", "Trough", "Recovery", "Drawdown", "Duration"])
+
+    # every underwater point belongs to the episode of its running peak
+    ep_peak = peak_pos[below]
+    pos = np.flatnonzero(below)
+    starts = np.flatnonzero(np.r_[True, ep_peak[1:] != ep_peak[:-1]])
+    depth = np.minimum.reduceat(dd[below], starts)
+    trough = pos[starts + np.array([np.argmin(seg) for seg in np.split(dd[below], starts[1:])])]
+    last = pos[np.r_[starts[1:] - 1, len(pos) - 1]]
+    recovered = last + 1 < len(dd)
+    recovery = np.where(recovered, last + 1, len(dd) - 1)
+
+    labels = np.asarray(index)
+    episodes = pd.DataFrame({
+        "Peak": labels[ep_peak[starts]],
+        "Trough": labels[trough],
+        "Recovery": pd.Series(labels[recovery], dtype=object).where(recovered).values,
+        "Drawdown": depth,
+        "Duration": recovery - ep_peak[starts],
+    })
+    return episodes.sort_values("Drawdown").head(n).reset_index(drop=True)
+
+
+class DrawdownTracker:
+    """
+    Incremental drawdown statistics for one or more NAV series.
+
+    Keeps only the running peak, its position and the extremes seen so
+    far, so appending new NAV points never rescans history.
+    """
+
+    def __init__(self, n_series: int = 1):
+        self.n_obs = 0
+        self.peak = np.full(n_series, -np.inf)
+        self.peak_pos = np.zeros(n_series, dtype=int)
+        self.max_drawdown = np.zeros(n_series)
+        self.max_drawdown_pos = np.zeros(n_series, dtype=int)
+        self.max_duration = np.zeros(n_series, dtype=int)
+        self.current_drawdown = np.zeros(n_series)
+
+    def update(self, values) -> np.ndarray:
+        """
+        Append new NAV points (1-D for one step, or time x series).
+
+        Returns:
+            np.ndarray: Underwater values for the appended points.
+        """
+        X = np.asarray(values, dtype=float)
+        X = X.reshape(1, -1) if X.ndim == 1 else X
+        if self.n_obs == 0:
+            peak, peak_pos = _running_peak(X)
+        else:
+            peak, peak_pos = _running_peak(X, self.peak, self.peak_pos, offset=self.n_obs)
+        dd = X / peak - 1.0
+        t = np.arange(self.n_obs, self.n_obs + X.shape[0])[:, None]
+
+        cols = np.arange(X.shape[1])
+        chunk_trough = dd.argmin(axis=0)
+        deeper = dd[chunk_trough, cols] < self.max_drawdown
+        self.max_drawdown = np.where(deeper, dd[chunk_trough, cols], self.max_drawdown)
+        self.max_drawdown_pos = np.where(deeper, chunk_trough + self.n_obs, self.max_drawdown_pos)
+        self.max_duration = np.maximum(self.max_duration, (t - peak_pos).max(axis=0))
+
+        self.peak, self.peak_pos = peak[-1], peak_pos[-1]
+        self.current_drawdown = dd[-1]
+        self.n_obs += X.shape[0]
+        return dd
+
+    def state_dict(self) -> dict:
+        """Return a copy of the tracker state."""
+        return {k: (v.copy() if isinstance(v, np.ndarray) else v) for k, v in vars(self).items()}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "DrawdownTracker":
+        """Rebuild a tracker from ``state_dict`` output."""
+        tracker = cls(len(state["peak"]))
+        for key, value in state.items():
+            setattr(tracker, key, np.array(value) if isinstance(value, (list, np.ndarray)) else value)
+        return tracker
@@ -0,0 +1,170 @@
+"""
+Module: estimators
+Online (streaming) estimators of mean returns and covariance.
+
+Features:
+- Welford / Chan updates, one bar or a small batch at a time
+- Optional exponential weighting via a half-life
+- O(n^2) work per update, independent of history length
+- Checkpoint / restore of the full estimator state
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List
+
+
+class OnlineCovariance:
+    """
+    Streaming estimator of the mean and covariance of asset returns.
+
+    Feed it price bars with ``update`` (returns are derived from the last
+    seen bar) or returns directly with ``update_returns``. The estimates
+    can be handed to ``PortfolioOptimizer.from_estimator``.
+    """
+
+    def __init__(self, tickers: List[str], halflife: float = None):
+        """
+        Args:
+            tickers: Asset names, in column order.
+            halflife: If given, observations are exponentially weighted so
+                      that an observation ``halflife`` bars old carries half
+                      the weight of the newest one. None = equal weights.
+        """
+        self.tickers = list(tickers)
+        self.halflife = halflife
+        self.decay = 0.5 ** (1.0 / halflife) if halflife else 1.0
+
+        n = len(self.tickers)
+        self.n_obs = 0
+        self.weight_sum = 0.0
+        self._mean = np.zeros(n)
+        self._m2 = np.zeros((n, n))
+        self.last_prices = None
+
+    # ---- updates ----------------------------------------------------------
+
+    def _as_matrix(self, data) -> np.ndarray:
+        if isinstance(data, (pd.DataFrame, pd.Series)):
+            # align columns (or a single bar's index) to our ticker order
+            data = data[self.tickers]
+        x = np.asarray(data, dtype=float)
+        return x.reshape(1, -1) if x.ndim == 1 else x
+
+    def update(self, prices) -> "OnlineCovariance":
+        """
+        Ingest one price bar (1-D / Series) or a batch of bars (2-D / DataFrame).
+        The first bar ever seen only primes the previous price.
+        """
+        p = self._as_matrix(prices)
+        if self.last_prices is not None:
+            p_full = np.vstack([self.last_prices, p])
+        else:
+            p_full = p
+        if len(p_full) > 1:
+            self.update_returns(p_full[1:] / p_full[:-1] - 1.0)
+        self.last_prices = p_full[-1].copy()
+        return self
+
+    def update_returns(self, returns) -> "OnlineCovariance":
+        """
+        Ingest one return vector or a batch of return rows.
+        """
+        x = self._as_matrix(returns)
+        if len(x) == 0:
+            return self
+
+        if self.halflife:
+            # West's weighted update with exponentially decaying weights
+            for row in x:
+                self.weight_sum = self.decay * self.weight_sum + 1.0
+                delta = row - self._mean
+                self._mean += delta / self.weight_sum
+                self._m2 = self.decay * self._m2 + np.outer(delta, row - self._mean)
+        else:
+            # Chan et al. pairwise combination of the batch with the running state
+            nb = len(x)
+            mean_b = x.mean(axis=0)
+            centered = x - mean_b
+            m2_b = centered.T @ centered
+            na = self.weight_sum
+            n_tot = na + nb
+            delta = mean_b - self._mean
+            self._mean = self._mean + delta * (nb / n_tot)
+            self._m2 = self._m2 + m2_b + np.outer(delta, delta) * (na * nb / n_tot)
+            self.weight_sum = n_tot
+
+        self.n_obs += len(x)
+        return self
+
+    # ---- estimates --------------------------------------------------------
+
+    @property
+    def mean(self) -> pd.Series:
+        """Per-period mean return."""
+        return pd.Series(self._mean, index=self.tickers)
+
+    @property
+    def covariance(self) -> pd.DataFrame:
+        """Per-period covariance (sample for equal weights, weighted otherwise)."""
+        if self.halflife:
+            denom = self.weight_sum
+        else:
+            denom = self.weight_sum - 1
+        cov = self._m2 / denom if denom > 0 else np.full_like(self._m2, np.nan)
+        return pd.DataFrame(cov, index=self.tickers, columns=self.tickers)
+
+    # ---- checkpoint / restore ----------------------------------------------
+
+    def state_dict(self) -> dict:
+        """Return a copy of the estimator state."""
+        return {
+            "tickers": list(self.tickers),
+            "halflife": self.halflife,
+            "n_obs": self.n_obs,
+            "weight_sum": self.weight_sum,
+            "mean": self._mean.copy(),
+            "m2": self._m2.copy(),
+            "last_prices": None if self.last_prices is None else self.last_prices.copy(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "OnlineCovariance":
+        """Rebuild an estimator from ``state_dict`` output."""
+        est = cls(state["tickers"], halflife=state["halflife"])
+        est.n_obs = int(state["n_obs"])
+        est.weight_sum = float(state["weight_sum"])
+        est._mean = np.array(state["mean"], dtype=float)
+        est._m2 = np.array(state["m2"], dtype=float)
+        if state.get("last_prices") is not None:
+            est.last_prices = np.array(state["last_prices"], dtype=float)
+        return est
+
+    def save(self, path: str):
+        """Checkpoint the estimator to an .npz file."""
+        state = self.state_dict()
+        np.savez(
+            path,
+            tickers=np.array(state["tickers"]),
+            halflife=np.array(np.nan if state["halflife"] is None else state["halflife"]),
+            n_obs=np.array(state["n_obs"]),
+            weight_sum=np.array(state["weight_sum"]),
+            mean=state["mean"],
+            m2=state["m2"],
+            last_prices=np.array([]) if state["last_prices"] is None else state["last_prices"],
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "OnlineCovariance":
+        """Restore an estimator saved with ``save``."""
+        with np.load(path) as f:
+            halflife = float(f["halflife"])
+            return cls.from_state({
+                "tickers": [str(t) for t in f["tickers"]],
+                "halflife": None if np.isnan(halflife) else halflife,
+                "n_obs": int(f["n_obs"]),
+                "weight_sum": float(f["weight_sum"]),
+                "mean": f["mean"],
+                "m2": f["m2"],
+                "last_prices": f["last_prices"] if f["last_prices"].size else None,
+            })
@@ -0,0 +1,156 @@
+"""
+Module: harvest
+Tax-loss harvesting scanner across all saved portfolios.
+
+Features:
+- Every lot of every portfolio flattened into one columnar table
+- Losses valued against a single price snapshot
+- Wash-sale checks against recent purchases of the same ticker with
+  sorted-date searches (two ``searchsorted`` calls for all lots)
+- Candidates ranked by harvest value (loss x tax rate)
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict
+
+from .data_loader import fetch_price_snapshot
+from .lots import holding_term
+from .portfolio_io import get_all_portfolio_names, get_portfolio
+
+HARVEST_LOT_DTYPE = np.dtype([
+    ("portfolio", np.int32),
+    ("ticker", np.int32),
+    ("lot", np.int32),
+    ("date", "datetime64[D]"),
+    ("shares", np.float64),
+    ("price", np.float64),
+])
+
+DEFAULT_TAX_RATES = {"Short": 0.37, "Long": 0.20}
+
+
+def lot_table(portfolios: Dict[str, dict]):
+    """
+    Flatten the lots of many portfolios into one structured array.
+
+    Args:
+        portfolios: {name: portfolio_data} with lots as stored by
+                    ``core.portfolio_io``.
+
+    Returns:
+        (names, tickers, lots): portfolio names, ticker symbols and a
+        HARVEST_LOT_DTYPE array whose "portfolio"/"ticker" fields index
+        into them and whose "lot" field is the lot's position in its
+        ticker's list.
+    """
+    names = list(portfolios)
+    tickers = sorted({t for data in portfolios.values() for t, lots in data.items() if lots})
+    ticker_id = {t: i for i, t in enumerate(tickers)}
+
+    groups = [(p, ticker_id[t], lots) for p, name in enumerate(names)
+              for t, lots in portfolios[name].items() if lots]
+    counts = np.array([len(lots) for _, _, lots in groups], dtype=int)
+    flat = [l for _, _, lots in groups for l in lots]
+
+    table = np.empty(len(flat), dtype=HARVEST_LOT_DTYPE)
+    table["portfolio"] = np.repeat([p for p, _, _ in groups], counts)
+    table["ticker"] = np.repeat([t for _, t, _ in groups], counts)
+    table["lot"] = np.arange(len(flat)) - np.repeat(np.cumsum(counts) - counts, counts)
+    table["date"] = [str(l["date"])[:10] for l in flat]
+    table["shares"] = [l["shares"] for l in flat]
+    table["price"] = [l["price"] for l in flat]
+    return names, tickers, table
+
+
+def scan_harvest(portfolios: Dict[str, dict], prices=None, as_of=None,
+                 min_loss: float = 0.0, wash_window: int = 30,
+                 tax_rates: dict = None, across_portfolios: bool = True) -> pd.DataFrame:
+    """
+    Rank lots trading below cost by the tax value of realizing the loss.
+
+    A lot is flagged for wash-sale risk when another lot of the same
+    ticker was bought within ``wash_window`` days before ``as_of``
+    (selling now would disallow the loss). Purchases of all lots are
+    sorted once by (ticker, date), so the check is two binary searches
+    per lot.
+
+    Args:
+        portfolios: {name: portfolio_data}.
+        prices: Current price per ticker; fetched in one batched request
+                if omitted.
+        as_of: Scan date (defaults to today).
+        min_loss: Minimum unrealized loss (positive dollars) to report.
+        wash_window: Wash-sale look-back in days.
+        tax_rates: {"Short": rate, "Long": rate}.
+        across_portfolios: Treat all portfolios as one taxpayer's accounts
+                           for wash sales (otherwise per portfolio).
+
+    Returns:
+        pd.DataFrame: "Portfolio", "Ticker", "Lot", "Purchase Date",
+                      "Shares", "Purchase Price", "Current Price",
+                      "Unrealized Loss", "Loss %", "Term",
+                      "Harvest Value", "Wash Sale Risk", "Clean Date",
+                      sorted by harvest value (largest first).
+    """
+    tax_rates = {**DEFAULT_TAX_RATES, **(tax_rates or {})}
+    as_of = np.datetime64(str(pd.Timestamp(as_of or datetime.today().date()).date()))
+    names, tickers, lots = lot_table(portfolios)
+    if prices is None:
+        prices = fetch_price_snapshot(tickers)["latest"]
+    current = pd.Series(prices, dtype=float).reindex(tickers).to_numpy()[lots["ticker"]]
+
+    loss = lots["shares"] * (lots["price"] - current)
+    candidate = np.flatnonzero(loss > max(min_loss, 0.0))
+
+    # wash-sale look-back: purchases sorted by (group, day)
+    # key = group * span + day keeps each group's dates contiguous and ordered
+    today = as_of.astype(np.int64)
+    base = min(lots["date"].min().astype(np.int64), today - wash_window) if len(lots) else 0
+    days = lots["date"].astype(np.int64) - base
+    today -= base
+    span = int(max(days.max(initial=0), today)) + 1
+    group = lots["ticker"].astype(np.int64)
+    if not across_portfolios:
+        group = lots["portfolio"].astype(np.int64) * len(tickers) + group
+    keys = np.sort(group * span + days)
+
+    g = group[candidate] * span
+    lo = np.searchsorted(keys, g + today - wash_window, side="left")
+    hi = np.searchsorted(keys, g + today, side="right")
+    own = (days[candidate] >= today - wash_window) & (days[candidate] <= today)
+    recent = (hi - lo) - own
+    latest = np.where(hi > 0, keys[np.maximum(hi - 1, 0)] - g, 0)
+    clean = (np.where(recent > 0, latest + wash_window + 1, today) + base).astype("datetime64[D]")
+
+    c = lots[candidate]
+    term = holding_term(c["date"], as_of)
+    rate = np.where(term == "Long", tax_rates["Long"], tax_rates["Short"])
+    cand_loss = loss[candidate]
+    cost = c["shares"] * c["price"]
+
+    result = pd.DataFrame({
+        "Portfolio": np.asarray(names, dtype=object)[c["portfolio"]] if len(c) else [],
+        "Ticker": np.asarray(tickers, dtype=object)[c["ticker"]] if len(c) else [],
+        "Lot": c["lot"],
+        "Purchase Date": c["date"],
+        "Shares": c["shares"],
+        "Purchase Price": c["price"],
+        "Current Price": current[candidate],
+        "Unrealized Loss": cand_loss,
+        "Loss %": np.where(cost != 0, cand_loss / np.where(cost != 0, cost, 1.0) * 100, 0.0),
+        "Term": term,
+        "Harvest Value": cand_loss * rate,
+        "Wash Sale Risk": recent > 0,
+        "Clean Date": clean,
+    })
+    return result.sort_values("Harvest Value", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def scan_all_portfolios(as_of=None, **kwargs) -> pd.DataFrame:
+    """
+    Scan every saved portfolio (see ``scan_harvest``).
+    """
+    portfolios = {name: get_portfolio(name) for name in get_all_portfolio_names()}
+    return scan_harvest(portfolios, as_of=as_of, **kwargs)
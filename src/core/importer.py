@@ -0,0 +1,318 @@
+"""
+Module: importer
+Streaming bulk import of broker trade files into portfolios.
+
+Features:
+- CSV read in chunks, XLSX read row by row (openpyxl read-only mode)
+- Broker column names mapped onto ticker / date / shares / price
+- Prices checked against the day's Low-High range from one OHLC
+  download per ticker, looked up for whole chunks with searchsorted
+- Sells matched against open lots through ``core.lots.LotLedger``
+  (FIFO, LIFO or HIFO)
+- Nothing written until the whole file is processed, then one write
+  through ``core.portfolio_io``; progress reported per chunk
+"""
+
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import fetch_ohlc_range
+from .lots import LotLedger
+from .portfolio_io import add_lots, load_portfolio, save_portfolio
+
+COLUMN_ALIASES = {
+    "ticker": ("ticker", "symbol", "instrument", "security"),
+    "date": ("date", "trade date", "trade_date", "transaction date", "execution date"),
+    "shares": ("shares", "quantity", "qty", "units"),
+    "price": ("price", "trade price", "execution price", "price per share"),
+    "side": ("side", "action", "transaction type", "buy/sell"),
+}
+SELL_SIDES = {"sell", "s", "sld", "sale"}
+
+PRICE_TOLERANCE = 0.02    # same band as the manual investment form
+
+# OHLC lookup key: ticker id * _SPAN + days since epoch (+ offset to stay positive)
+_SPAN = 1_000_000
+_DAY_OFFSET = 500_000
+
+
+def read_trades(path: str, chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+    """
+    Stream a broker export as DataFrame chunks with the file's own headers.
+
+    Args:
+        path: .csv, .xlsx or .xlsm file.
+        chunksize: Rows per chunk.
+
+    Yields:
+        pd.DataFrame
+    """
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        try:
+            import openpyxl
+        except ImportError as e:
+            raise ImportError("Importing XLSX files needs openpyxl (pip install openpyxl)") from e
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = [str(h) if h is not None else "" for h in next(rows, [])]
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == chunksize:
+                    yield pd.DataFrame(batch, columns=header)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header)
+        finally:
+            wb.close()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def _resolve_columns(header, columns: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Map ticker/date/shares/price/side onto the file's column names."""
+    lookup = {str(h).strip().lower(): h for h in header}
+    resolved = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        if columns and field in columns:
+            resolved[field] = columns[field]
+            continue
+        match = next((lookup[a] for a in aliases if a in lookup), None)
+        if match is not None:
+            resolved[field] = match
+    missing = [f for f in ("ticker", "date", "shares", "price") if f not in resolved]
+    if missing:
+        raise ValueError(f"Trade file has no column for: {', '.join(missing)}")
+    return resolved
+
+
+def _to_number(col: pd.Series) -> pd.Series:
+    if not pd.api.types.is_numeric_dtype(col):
+        col = col.astype(str).str.replace(r"[,$₹€£\s]", "", regex=True)
+    return pd.to_numeric(col, errors="coerce")
+
+
+def normalize_trades(raw: pd.DataFrame, columns: Dict[str, str]) -> pd.DataFrame:
+    """
+    One chunk in canonical form.
+
+    Returns:
+        pd.DataFrame: "ticker", "date" (datetime64), "shares", "price",
+                      "sell" (bool) and "reason" (None for usable rows).
+    """
+    out = pd.DataFrame(index=raw.index)
+    out["ticker"] = raw[columns["ticker"]].astype(str).str.strip().str.upper()
+    out["date"] = pd.to_datetime(raw[columns["date"]], errors="coerce")
+    out["shares"] = _to_number(raw[columns["shares"]])
+    out["price"] = _to_number(raw[columns["price"]])
+
+    sell = out["shares"] < 0
+    if "side" in columns:
+        sell |= raw[columns["side"]].astype(str).str.strip().str.lower().isin(SELL_SIDES)
+    out["sell"] = sell
+    out["shares"] = out["shares"].abs()
+
+    reason = pd.Series(None, index=raw.index, dtype=object)
+    reason[out["ticker"].isin(["", "NAN", "NONE"])] = "missing ticker"
+    reason[out["date"].isna()] = "unparseable date"
+    reason[~(out["shares"] > 0) | ~(out["price"] > 0)] = "non-positive shares or price"
+    out["reason"] = reason
+    return out
+
+
+class _OHLCIndex:
+    """Daily Low/High for many tickers in one sorted (ticker, day) key array."""
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        frames = {t: f for t, f in frames.items() if not f.empty}
+        self.ticker_id = {t: i for i, t in enumerate(frames)}
+        keys, low, high = [], [], []
+        for t, f in frames.items():
+            days = pd.DatetimeIndex(f.index).tz_localize(None).values.astype("datetime64[D]").astype(np.int64)
+            keys.append(self.ticker_id[t] * _SPAN + days + _DAY_OFFSET)
+            low.append(f["Low"].to_numpy(dtype=float))
+            high.append(f["High"].to_numpy(dtype=float))
+        keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.low = np.concatenate(low)[order] if low else np.empty(0)
+        self.high = np.concatenate(high)[order] if high else np.empty(0)
+
+    def lookup(self, tickers: pd.Series, dates: pd.Series):
+        """(found, low, high) for each trade."""
+        n = len(tickers)
+        if not len(self.keys):
+            return np.zeros(n, dtype=bool), np.full(n, np.nan), np.full(n, np.nan)
+        ids = tickers.map(self.ticker_id)
+        known = ids.notna().to_numpy()
+        days = dates.values.astype("datetime64[D]").astype(np.int64)
+        keys = np.where(known, ids.fillna(0).to_numpy(dtype=np.int64) * _SPAN + days + _DAY_OFFSET, -1)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = known & (self.keys[pos] == keys)
+        return found, np.where(found, self.low[pos], np.nan), np.where(found, self.high[pos], np.nan)
+
+
+def _fetch_ranges(path, columns, chunksize) -> Tuple[int, Dict[str, pd.DataFrame]]:
+    """First pass: row count and one OHLC download per ticker over its date range."""
+    total, first, last = 0, {}, {}
+    for raw in read_trades(path, chunksize):
+        trades = normalize_trades(raw, columns)
+        total += len(trades)
+        ok = trades[trades["reason"].isna()]
+        span = ok.groupby("ticker")["date"].agg(["min", "max"])
+        for t, (lo, hi) in span.iterrows():
+            first[t] = min(first.get(t, lo), lo)
+            last[t] = max(last.get(t, hi), hi)
+    frames = {t: fetch_ohlc_range(t, first[t].strftime("%Y-%m-%d"),
+                                  (last[t] + pd.Timedelta(days=1)).strftime("%Y-%m-%d"))
+              for t in first}
+    return total, frames
+
+
+def _apply_sells(portfolio_name: str, buys: pd.DataFrame, sells: pd.DataFrame, method: str):
+    """
+    Existing lots plus ``buys``, reduced by ``sells`` in date order.
+
+    Each sold ticker gets its own ``LotLedger`` (see ``LotLedger.sell_many``),
+    so matching a sell scans only that ticker's lots; tickers without
+    sells are left untouched.
+
+    Returns:
+        (dict, pd.DataFrame, pd.Series): open lots in the
+        ``core.portfolio_io`` layout, realized gains (lot IDs are per
+        ticker), and a rejection reason per sell row (None if applied).
+    """
+    data = load_portfolio(portfolio_name)
+    for ticker, lots in _lots_by_ticker(buys).items():
+        data.setdefault(ticker, []).extend(lots)
+
+    reason = pd.Series(None, index=sells.index, dtype=object)
+    realized = []
+    for ticker, group in sells.groupby("ticker", sort=False):
+        ledger = LotLedger.from_portfolio({ticker: data.get(ticker, [])})
+        applied = ledger.sell_many(ticker, group["shares"].to_numpy(), group["price"].to_numpy(),
+                                   group["date"].to_numpy(), method)
+        reason[group.index[~applied]] = "sell exceeds shares held"
+        data[ticker] = ledger.to_portfolio().get(ticker, [])
+        if not data[ticker]:
+            del data[ticker]
+        realized.append(ledger.realized_gains())
+    return data, pd.concat(realized, ignore_index=True), reason
+
+
+def _lots_by_ticker(trades: pd.DataFrame) -> Dict[str, list]:
+    lots = {}
+    dates = trades["date"].dt.strftime("%Y-%m-%d")
+    for ticker, shares, price, date in zip(trades["ticker"], trades["shares"], trades["price"], dates):
+        lots.setdefault(ticker, []).append({"shares": float(shares), "price": float(price), "date": date})
+    return lots
+
+
+def import_trades(path: str, portfolio_name: str, columns: Optional[Dict[str, str]] = None,
+                  chunksize: int = 50_000, validate: bool = True,
+                  tolerance: float = PRICE_TOLERANCE, sell_method: str = "fifo",
+                  ignore_sells: bool = False,
+                  progress: Optional[Callable[[int, Optional[int]], None]] = None) -> dict:
+    """
+    Import the trades of a broker export into a portfolio.
+
+    With ``validate`` the file is streamed twice: the first pass finds
+    each ticker's date range and downloads its OHLC once, the second
+    checks every price against the day's Low-High band (widened by
+    ``tolerance``). Trades on dates without OHLC data are imported but
+    counted as unverified.
+
+    Buys become lots. Sells are applied in date order through
+    ``core.lots.LotLedger`` against the portfolio's existing lots and
+    the file's buys; a sell larger than the shares held on its date is
+    rejected. Usable trades are staged in memory and written once at the
+    end, so a failed import leaves the portfolio unchanged and can be
+    re-run as is.
+
+    Args:
+        path: CSV or XLSX export.
+        portfolio_name: Target portfolio (created if missing).
+        columns: Explicit {"ticker"|"date"|"shares"|"price"|"side": header}
+                 overrides for the alias matching.
+        chunksize: Rows parsed per chunk.
+        validate: Check prices against OHLC.
+        tolerance: Relative slack on the Low-High band.
+        sell_method: Lot matching for sells: "fifo", "lifo" or "hifo".
+        ignore_sells: Skip sells (counted in "skipped_sells") and only
+                      import buys.
+        progress: Called as progress(rows_done, total_rows) after each
+                  chunk (total is None without validation).
+
+    Returns:
+        dict: rows, imported (buys), sold, unverified, skipped_sells,
+              rejected (DataFrame of rejected rows with "row" and
+              "reason"), realized (see ``LotLedger.realized_gains``),
+              seconds, rows_per_second.
+    """
+    started = time.perf_counter()
+    header = next(read_trades(path, chunksize=1)).columns
+    columns = _resolve_columns(header, columns)
+
+    total, ohlc = None, None
+    if validate:
+        total, frames = _fetch_ranges(path, columns, chunksize)
+        ohlc = _OHLCIndex(frames)
+
+    done = unverified = skipped_sells = 0
+    rejected, staged = [], []
+    for raw in read_trades(path, chunksize):
+        trades = normalize_trades(raw, columns)
+        trades["row"] = np.arange(done, done + len(trades)) + 1
+        done += len(trades)
+
+        if ignore_sells:
+            sells = trades["sell"] & trades["reason"].isna()
+            skipped_sells += int(sells.sum())
+            trades = trades[~sells]
+
+        if ohlc is not None:
+            found, low, high = ohlc.lookup(trades["ticker"], trades["date"])
+            price = trades["price"].to_numpy()
+            outside = found & ((price < low * (1 - tolerance)) | (price > high * (1 + tolerance)))
+            usable = trades["reason"].isna().to_numpy()
+            trades.loc[outside & usable, "reason"] = "price outside the day's range"
+            unverified += int((~found & usable).sum())
+
+        bad = trades["reason"].notna()
+        if bad.any():
+            rejected.append(trades.loc[bad])
+        staged.append(trades[~bad])
+        if progress is not None:
+            progress(done, total)
+
+    columns_out = ["row", "ticker", "date", "shares", "price", "reason"]
+    good = pd.concat(staged, ignore_index=True) if staged else pd.DataFrame(columns=columns_out + ["sell"])
+    buys, sells = good[~good["sell"]], good[good["sell"]]
+    realized = LotLedger().realized_gains()
+    if sells.empty:
+        add_lots(portfolio_name, _lots_by_ticker(buys))
+    else:
+        data, realized, reason = _apply_sells(portfolio_name, buys, sells, sell_method)
+        save_portfolio(portfolio_name, data)
+        refused = reason.notna()
+        rejected.append(sells[refused].assign(reason=reason[refused]))
+        sells = sells[~refused]
+
+    rejected = [r for r in rejected if not r.empty]
+    seconds = time.perf_counter() - started
+    return {
+        "rows": done,
+        "imported": len(buys),
+        "sold": len(sells),
+        "unverified": unverified,
+        "skipped_sells": skipped_sells,
+        "rejected": (pd.concat(rejected, ignore_index=True)[columns_out].sort_values("row", ignore_index=True)
+                     if rejected else pd.DataFrame(columns=columns_out)),
+        "realized": realized,
+        "seconds": seconds,
+        "rows_per_second": done / seconds if seconds > 0 else float("inf"),
+    }
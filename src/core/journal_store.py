@@ -0,0 +1,300 @@
+"""
+Module: journal_store
+Event-sourced storage backend for portfolios.
+
+Features:
+- Append-only JSON-lines journal of lot events per portfolio
+  ("add", "remove", "split")
+- Periodic snapshots of the folded state, so a load reads the latest
+  snapshot plus the journal tail
+- O(1) appends; fsync is batched by event count and elapsed time, with a
+  timer syncing the tail of a burst once FSYNC_INTERVAL has passed
+- Point-in-time reconstruction by replaying the journal up to a moment
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-writer use only
+    fcntl = None
+
+JOURNAL_SUFFIX = ".log"
+SNAPSHOT_SUFFIX = ".snap.json"
+
+SNAPSHOT_EVERY = 500      # events between snapshots
+FSYNC_EVERY = 64          # events between fsyncs
+FSYNC_INTERVAL = 1.0      # seconds between fsyncs
+
+_journals = {}
+
+
+def split_adjust(lots: List[dict], ratio: float, date: str) -> List[dict]:
+    """
+    Restate lots bought before ``date`` for a ``ratio``-for-1 split.
+
+    Shares are multiplied and prices divided by ``ratio``, so each lot's
+    cost basis is unchanged.
+    """
+    return [{**l, "shares": l["shares"] * ratio, "price": l["price"] / ratio}
+            if str(l["date"]) < str(date) else dict(l) for l in lots]
+
+
+def apply_event(data: dict, event: dict) -> dict:
+    """Fold one journal event into portfolio data (in place)."""
+    op, ticker = event["op"], event.get("ticker")
+    if op == "add":
+        data.setdefault(ticker, []).append(dict(event["lot"]))
+    elif op == "remove":
+        lots = data[ticker]
+        lots.pop(event["index"])
+        if not lots:
+            del data[ticker]
+    elif op == "split":
+        data[ticker] = split_adjust(data[ticker], event["ratio"], event["date"])
+    else:
+        raise ValueError(f"Unknown journal event: {op}")
+    return data
+
+
+def diff_events(old: dict, new: dict) -> List[dict]:
+    """
+    Events turning ``old`` into ``new``.
+
+    Per ticker, lots after the longest common prefix are removed (last
+    first) and the new ones added, so appending a lot or dropping a
+    ticker costs only the events for that change.
+    """
+    events = []
+    for ticker in list(old) + [t for t in new if t not in old]:
+        before, after = old.get(ticker, []), new.get(ticker, [])
+        common = 0
+        while common < min(len(before), len(after)) and before[common] == after[common]:
+            common += 1
+        events += [{"op": "remove", "ticker": ticker, "index": i}
+                   for i in range(len(before) - 1, common - 1, -1)]
+        events += [{"op": "add", "ticker": ticker, "lot": lot} for lot in after[common:]]
+    return events
+
+
+def _timestamp(as_of) -> float:
+    if isinstance(as_of, (int, float)):
+        return float(as_of)
+    if isinstance(as_of, str):
+        as_of = datetime.fromisoformat(as_of)
+    return as_of.timestamp()
+
+
+def _read_events(path: str, offset: int = 0):
+    """Events from ``offset`` on; a torn final line from a crash is ignored."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                break
+
+
+@contextmanager
+def _exclusive(fh):
+    """Hold an exclusive advisory lock on an open journal file."""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+class _Journal:
+    """Open append handle and sequence state for one portfolio's journal."""
+
+    def __init__(self, directory: str, name: str):
+        self.log_path = os.path.join(directory, name + JOURNAL_SUFFIX)
+        self.snap_path = os.path.join(directory, name + SNAPSHOT_SUFFIX)
+        os.makedirs(directory, exist_ok=True)
+
+        snap = self.read_snapshot()
+        self.seq = snap["seq"]
+        self.since_snapshot = 0
+        self.fh = open(self.log_path, "ab")
+        # writers hold the lock while appending, so a torn line seen under
+        # the lock is left by a crash, not by a line still being written
+        with _exclusive(self.fh):
+            end = snap["offset"]
+            with open(self.log_path, "rb") as f:
+                f.seek(end)
+                for line in f:
+                    try:
+                        self.seq = json.loads(line)["seq"]
+                    except ValueError:
+                        break
+                    self.since_snapshot += 1
+                    end += len(line)
+            # drop a torn final line so the next append starts on a fresh line
+            if os.path.getsize(self.log_path) > end:
+                os.truncate(self.log_path, end)
+
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.lock = threading.Lock()
+        self.timer = None
+
+    def read_snapshot(self) -> dict:
+        if os.path.exists(self.snap_path):
+            with open(self.snap_path, "r") as f:
+                return json.load(f)
+        return {"seq": 0, "offset": 0, "data": {}}
+
+    def load(self) -> dict:
+        snap = self.read_snapshot()
+        data = snap["data"]
+        for event in _read_events(self.log_path, snap["offset"]):
+            apply_event(data, event)
+        return data
+
+    def append(self, events: List[dict]):
+        now = time.time()
+        lines = []
+        for event in events:
+            self.seq += 1
+            lines.append(json.dumps({"seq": self.seq, "ts": now, **event}).encode() + b"\n")
+        with self.lock:
+            with _exclusive(self.fh):
+                self.fh.write(b"".join(lines))
+                self.fh.flush()             # visible to readers; durable at the next sync
+            self.unsynced += len(events)
+        self.since_snapshot += len(events)
+
+        if self.unsynced >= FSYNC_EVERY or time.monotonic() - self.last_sync >= FSYNC_INTERVAL:
+            self.sync()
+        elif self.timer is None:
+            # the writer may go idle before the next append checks the interval
+            self.timer = threading.Timer(FSYNC_INTERVAL, self.sync)
+            self.timer.daemon = True
+            self.timer.start()
+        if self.since_snapshot >= SNAPSHOT_EVERY:
+            self.snapshot()
+
+    def sync(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if self.unsynced and not self.fh.closed:
+                os.fsync(self.fh.fileno())
+                self.unsynced = 0
+            self.last_sync = time.monotonic()
+
+    def snapshot(self):
+        """Persist the folded state and the journal offset it covers."""
+        self.sync()
+        snap = {"seq": self.seq, "offset": self.fh.tell(), "ts": time.time(), "data": self.load()}
+        tmp = self.snap_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(json.dumps(snap))           # one C-encoded string; json.dump streams in Python
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snap_path)
+        self.since_snapshot = 0
+
+    def close(self):
+        self.sync()
+        self.fh.close()
+
+
+def _journal(directory: str, name: str) -> _Journal:
+    key = (os.path.abspath(directory), name)
+    if key not in _journals:
+        _journals[key] = _Journal(directory, name)
+    return _journals[key]
+
+
+def get_all_portfolio_names(directory: str) -> List[str]:
+    """Portfolios with a journal in ``directory``."""
+    if not os.path.exists(directory):
+        return []
+    return [f[:-len(JOURNAL_SUFFIX)] for f in os.listdir(directory) if f.endswith(JOURNAL_SUFFIX)]
+
+
+def load_portfolio(directory: str, name: str) -> dict:
+    """Latest snapshot plus the journal tail ({} if the portfolio is missing)."""
+    key = (os.path.abspath(directory), name)
+    if key in _journals:
+        return _journals[key].load()
+    if not os.path.exists(os.path.join(directory, name + JOURNAL_SUFFIX)):
+        return {}
+    return _journal(directory, name).load()
+
+
+def load_portfolio_at(directory: str, name: str, as_of) -> dict:
+    """
+    Portfolio as it stood at ``as_of`` (datetime, ISO string or epoch
+    seconds), replayed from the start of the journal.
+    """
+    cutoff = _timestamp(as_of)
+    data = {}
+    for event in _read_events(os.path.join(directory, name + JOURNAL_SUFFIX)):
+        if event["ts"] > cutoff:
+            break
+        apply_event(data, event)
+    return data
+
+
+def append_events(directory: str, name: str, events: List[dict]):
+    """Append events to a portfolio's journal (creating it if needed)."""
+    journal = _journal(directory, name)
+    if events:
+        journal.append(events)
+
+
+def save_portfolio(directory: str, name: str, portfolio_data: dict):
+    """Journal the difference between the stored and the given lots."""
+    append_events(directory, name, diff_events(load_portfolio(directory, name), portfolio_data))
+
+
+def compact(directory: str, name: str):
+    """Write a snapshot now, regardless of SNAPSHOT_EVERY."""
+    _journal(directory, name).snapshot()
+
+
+def sync():
+    """fsync every open journal."""
+    for journal in _journals.values():
+        journal.sync()
+
+
+def close_all():
+    """Sync and close every open journal."""
+    for journal in _journals.values():
+        journal.close()
+    _journals.clear()
+
+
+def import_json_dir(directory: str, json_dir: str) -> Dict[str, int]:
+    """Journal every ``<name>.json`` portfolio in ``json_dir``; returns lots per portfolio."""
+    imported = {}
+    for fname in sorted(os.listdir(json_dir)):
+        if not fname.endswith(".json"):
+            continue
+        name = fname[:-len(".json")]
+        with open(os.path.join(json_dir, fname), "r") as f:
+            data = json.load(f)
+        save_portfolio(directory, name, data)
+        imported[name] = sum(len(lots) for lots in data.values())
+    return imported
+
+
+atexit.register(sync)
@@ -0,0 +1,331 @@
+"""
+Module: lots
+Columnar tax-lot ledger.
+
+Features:
+- Lots held in one NumPy structured array (ticker id, date, shares,
+  price, remaining shares) instead of per-ticker lists of dicts
+- Sells matched FIFO, LIFO, HIFO or by specific lot ID in a single
+  cumulative-sum pass over the ticker's open lots
+- Realized and unrealized gains with short/long-term classification
+  for every lot at once
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import List, Optional
+
+LOT_DTYPE = np.dtype([
+    ("ticker", np.int32),
+    ("date", "datetime64[D]"),
+    ("shares", np.float64),
+    ("price", np.float64),
+    ("remaining", np.float64),
+])
+
+REALIZED_DTYPE = np.dtype([
+    ("lot", np.int64),
+    ("ticker", np.int32),
+    ("buy_date", "datetime64[D]"),
+    ("sell_date", "datetime64[D]"),
+    ("shares", np.float64),
+    ("cost", np.float64),
+    ("proceeds", np.float64),
+])
+
+MATCHING_METHODS = ("fifo", "lifo", "hifo", "specific")
+
+
+def _one_year_after(dates: np.ndarray) -> np.ndarray:
+    """Same calendar day one year later (Feb 29 rolls to Mar 1)."""
+    month = dates.astype("datetime64[M]")
+    offset = dates - month.astype("datetime64[D]")
+    return (month + 12).astype("datetime64[D]") + offset
+
+
+def holding_term(buy_dates, sell_dates) -> np.ndarray:
+    """
+    "Long" for lots held more than one year, "Short" otherwise.
+
+    Args:
+        buy_dates: Purchase dates.
+        sell_dates: Sale (or valuation) dates, broadcast against buy_dates.
+
+    Returns:
+        np.ndarray: "Short"/"Long" per lot.
+    """
+    buy = np.asarray(buy_dates, dtype="datetime64[D]")
+    sell = np.asarray(sell_dates, dtype="datetime64[D]")
+    return np.where(sell > _one_year_after(buy), "Long", "Short")
+
+
+class LotLedger:
+    """
+    All lots of a portfolio in columnar form.
+
+    Lot IDs are row positions in ``lots`` and stay stable: sells only
+    reduce a lot's ``remaining`` shares, they never drop rows.
+    """
+
+    def __init__(self, tickers: List[str] = None, lots: np.ndarray = None):
+        self.tickers = list(tickers or [])
+        self._ticker_id = {t: i for i, t in enumerate(self.tickers)}
+        self.lots = lots if lots is not None else np.empty(0, dtype=LOT_DTYPE)
+        self.realized = np.empty(0, dtype=REALIZED_DTYPE)
+
+    @classmethod
+    def from_portfolio(cls, portfolio_data: dict) -> "LotLedger":
+        """
+        Build a ledger from stored lots.
+
+        Args:
+            portfolio_data: {ticker: [{"shares", "price", "date"}, ...]} as
+                            returned by ``core.portfolio_io.load_portfolio``.
+
+        Returns:
+            LotLedger
+        """
+        tickers = [t for t, lots in portfolio_data.items() if lots]
+        counts = [len(portfolio_data[t]) for t in tickers]
+        lots = np.empty(sum(counts), dtype=LOT_DTYPE)
+        lots["ticker"] = np.repeat(np.arange(len(tickers)), counts)
+        lots["date"] = [str(l["date"])[:10] for t in tickers for l in portfolio_data[t]]
+        lots["shares"] = [l["shares"] for t in tickers for l in portfolio_data[t]]
+        lots["price"] = [l["price"] for t in tickers for l in portfolio_data[t]]
+        lots["remaining"] = lots["shares"]
+        return cls(tickers, lots)
+
+    def to_portfolio(self) -> dict:
+        """Open lots (remaining shares) in the ``core.portfolio_io`` layout."""
+        data = {t: [] for t in self.tickers}
+        for row in self.lots[self.lots["remaining"] > 0]:
+            data[self.tickers[row["ticker"]]].append({
+                "shares": float(row["remaining"]),
+                "price": float(row["price"]),
+                "date": str(row["date"]),
+            })
+        return {t: lots for t, lots in data.items() if lots}
+
+    def _id(self, ticker: str) -> int:
+        if ticker not in self._ticker_id:
+            self._ticker_id[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+        return self._ticker_id[ticker]
+
+    def buy(self, ticker: str, shares: float, price: float, date: str) -> int:
+        """Append a lot and return its lot ID."""
+        row = np.array([(self._id(ticker), str(date)[:10], shares, price, shares)], dtype=LOT_DTYPE)
+        self.lots = np.concatenate([self.lots, row])
+        return len(self.lots) - 1
+
+    def open_lots(self, ticker: str, method: str = "fifo",
+                  lot_ids: Optional[List[int]] = None) -> np.ndarray:
+        """
+        IDs of a ticker's open lots in the order a sell would consume them.
+
+        Args:
+            ticker: Ticker symbol.
+            method: "fifo" (oldest first), "lifo" (newest first),
+                    "hifo" (highest cost first) or "specific".
+            lot_ids: Lot IDs in the order to sell, for "specific".
+
+        Returns:
+            np.ndarray: Lot IDs.
+        """
+        method = method.lower()
+        if method not in MATCHING_METHODS:
+            raise ValueError(f"Unknown lot matching method: {method}")
+        tid = self._ticker_id.get(ticker, -1)
+        open_mask = (self.lots["ticker"] == tid) & (self.lots["remaining"] > 0)
+
+        if method == "specific":
+            ids = np.asarray(lot_ids if lot_ids is not None else [], dtype=np.int64)
+            bad = ids[(ids < 0) | (ids >= len(self.lots))]
+            if len(bad):
+                raise ValueError(f"Lot IDs {bad.tolist()} do not exist")
+            if len(np.unique(ids)) < len(ids):
+                raise ValueError(f"Lot IDs {ids.tolist()} name a lot more than once")
+            if not open_mask[ids].all():
+                raise ValueError(f"Lot IDs {ids[~open_mask[ids]].tolist()} are not open {ticker} lots")
+            return ids
+
+        ids = np.flatnonzero(open_mask)
+        lots = self.lots[ids]
+        # stable sorts so ties keep stored (purchase) order
+        if method == "fifo":
+            order = np.argsort(lots["date"], kind="stable")
+        elif method == "lifo":
+            order = np.argsort(-lots["date"].astype(np.int64), kind="stable")
+        else:
+            order = np.argsort(-lots["price"], kind="stable")
+        return ids[order]
+
+    def sell(self, ticker: str, shares: float, price: float, date: str,
+             method: str = "fifo", lot_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        """
+        Sell shares of a ticker, consuming lots in the chosen order.
+
+        Args:
+            ticker: Ticker symbol.
+            shares: Shares to sell.
+            price: Sale price per share.
+            date: Sale date "YYYY-MM-DD".
+            method: Lot matching method (see ``open_lots``).
+            lot_ids: Lot IDs for specific identification.
+
+        Returns:
+            pd.DataFrame: One row per lot consumed (see ``realized_gains``).
+        """
+        if not shares > 0:
+            raise ValueError(f"Shares to sell must be positive, got {shares}")
+        ids = self.open_lots(ticker, method, lot_ids)
+        fills = self._fill(ticker, ids, shares, price, np.datetime64(str(date)[:10]))
+        if fills is None:
+            held = self.lots["remaining"][ids].sum()
+            raise ValueError(f"Cannot sell {shares} {ticker}: only {held} held in the selected lots")
+        self.realized = np.concatenate([self.realized, fills])
+        return self._realized_frame(fills)
+
+    def sell_many(self, ticker: str, shares, prices, dates, method: str = "fifo") -> np.ndarray:
+        """
+        Apply many sells of one ticker in date order.
+
+        Each sell consumes only lots bought on or before its date; a sell
+        larger than the shares then held is skipped. Fills are recorded
+        as by ``sell`` without building a frame per sell.
+
+        Args:
+            ticker: Ticker symbol.
+            shares: Shares per sell.
+            prices: Sale price per sell.
+            dates: Sale date per sell.
+            method: "fifo", "lifo" or "hifo".
+
+        Returns:
+            np.ndarray: True for every sell that was applied.
+        """
+        if method.lower() == "specific":
+            raise ValueError("sell_many matches fifo, lifo or hifo; sell specific lots with sell()")
+        shares = np.asarray(shares, dtype=float)
+        if not (shares > 0).all():
+            raise ValueError("Shares to sell must be positive")
+        prices = np.asarray(prices, dtype=float)
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        applied = np.zeros(len(dates), dtype=bool)
+        fills = []
+        for k in np.argsort(dates, kind="stable"):
+            ids = self.open_lots(ticker, method)
+            fill = self._fill(ticker, ids[self.lots["date"][ids] <= dates[k]], shares[k], prices[k], dates[k])
+            if fill is not None:
+                fills.append(fill)
+                applied[k] = True
+        self.realized = np.concatenate([self.realized, *fills])
+        return applied
+
+    def _fill(self, ticker: str, ids: np.ndarray, shares: float, price: float, date: np.datetime64):
+        """Consume ``shares`` from lots ``ids`` in order; None if they hold too few."""
+        remaining = self.lots["remaining"][ids]
+        if shares > remaining.sum() + 1e-9:
+            return None
+
+        # shares taken from each lot: what is left of the order when the lot is reached
+        before = np.cumsum(remaining) - remaining
+        take = np.clip(shares - before, 0.0, remaining)
+        used = take > 0
+        ids, take = ids[used], take[used]
+        np.subtract.at(self.lots["remaining"], ids, take)
+
+        fills = np.empty(len(ids), dtype=REALIZED_DTYPE)
+        fills["lot"] = ids
+        fills["ticker"] = self._ticker_id[ticker]
+        fills["buy_date"] = self.lots["date"][ids]
+        fills["sell_date"] = date
+        fills["shares"] = take
+        fills["cost"] = take * self.lots["price"][ids]
+        fills["proceeds"] = take * price
+        return fills
+
+    def _realized_frame(self, fills: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame({
+            "Lot ID": fills["lot"],
+            "Ticker": np.asarray(self.tickers, dtype=object)[fills["ticker"]] if len(fills) else [],
+            "Purchase Date": fills["buy_date"],
+            "Sale Date": fills["sell_date"],
+            "Shares": fills["shares"],
+            "Cost Basis": fills["cost"],
+            "Proceeds": fills["proceeds"],
+            "Realized Gain": fills["proceeds"] - fills["cost"],
+            "Term": holding_term(fills["buy_date"], fills["sell_date"]),
+        })
+
+    def realized_gains(self) -> pd.DataFrame:
+        """
+        Every sell fill recorded so far.
+
+        Returns:
+            pd.DataFrame: "Lot ID", "Ticker", "Purchase Date", "Sale Date",
+                          "Shares", "Cost Basis", "Proceeds",
+                          "Realized Gain", "Term".
+        """
+        return self._realized_frame(self.realized)
+
+    def unrealized_gains(self, prices, as_of=None) -> pd.DataFrame:
+        """
+        Unrealized gain and holding period of every open lot.
+
+        Args:
+            prices: Current price per ticker (Series or dict).
+            as_of: Valuation date (defaults to today).
+
+        Returns:
+            pd.DataFrame: Indexed by lot ID with "Ticker", "Purchase Date",
+                          "Shares", "Purchase Price", "Current Price",
+                          "Cost Basis", "Market Value", "Unrealized Gain",
+                          "Unrealized Gain %", "Holding Days", "Term".
+                          Lots without a price get NaN values.
+        """
+        as_of = np.datetime64(str(pd.Timestamp(as_of or datetime.today().date()).date()))
+        ids = np.flatnonzero(self.lots["remaining"] > 0)
+        lots = self.lots[ids]
+
+        price_by_id = pd.Series(prices, dtype=float).reindex(self.tickers).to_numpy()
+        current = price_by_id[lots["ticker"]] if len(self.tickers) else np.empty(0)
+        cost = lots["remaining"] * lots["price"]
+        value = lots["remaining"] * current
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.where(cost != 0, (value - cost) / cost * 100, 0.0)
+
+        return pd.DataFrame({
+            "Ticker": np.asarray(self.tickers, dtype=object)[lots["ticker"]] if len(lots) else [],
+            "Purchase Date": lots["date"],
+            "Shares": lots["remaining"],
+            "Purchase Price": lots["price"],
+            "Current Price": current,
+            "Cost Basis": cost,
+            "Market Value": value,
+            "Unrealized Gain": value - cost,
+            "Unrealized Gain %": pct,
+            "Holding Days": (as_of - lots["date"]).astype(np.int64),
+            "Term": holding_term(lots["date"], as_of),
+        }, index=pd.Index(ids, name="Lot ID"))
+
+    def gains_summary(self, prices, as_of=None) -> pd.DataFrame:
+        """
+        Realized and unrealized gains per ticker, split by holding term.
+
+        Returns:
+            pd.DataFrame: Indexed by ticker with "Realized Short",
+                          "Realized Long", "Unrealized Short",
+                          "Unrealized Long".
+        """
+        realized = self.realized_gains()
+        unrealized = self.unrealized_gains(prices, as_of)
+        r = realized.pivot_table(index="Ticker", columns="Term", values="Realized Gain", aggfunc="sum")
+        u = unrealized.pivot_table(index="Ticker", columns="Term", values="Unrealized Gain", aggfunc="sum")
+        out = pd.DataFrame(index=pd.Index(self.tickers, name="Ticker"))
+        for term in ("Short", "Long"):
+            out[f"Realized {term}"] = r[term] if term in r else 0.0
+        for term in ("Short", "Long"):
+            out[f"Unrealized {term}"] = u[term] if term in u else 0.0
+        return out.fillna(0.0)
@@ -0,0 +1,213 @@
+"""
+Module: nav
+Historical portfolio value (NAV) from dated lots.
+
+The share count held on every session is built from the lot purchase
+dates as a cumulative sum over a sessions x tickers grid, prices for all
+tickers come from one batched download, and the NAV is a single
+elementwise multiply and row sum.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+from .data_loader import fetch_historical_data
+from .nav_cache import (read_nav, write_nav, append_nav, invalidate_nav,
+                        read_drawdown_state, write_drawdown_state)
+from .drawdown import DrawdownTracker
+
+
+def share_position_matrix(portfolio_data: dict, sessions: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    Shares held per ticker on every session, from lot purchase dates.
+
+    A lot counts from the first session on or after its purchase date;
+    lots bought before the first session are held throughout.
+
+    Args:
+        portfolio_data: {ticker: [{"shares", "price", "date"}, ...]}.
+        sessions: Trading sessions (sorted).
+
+    Returns:
+        pd.DataFrame: (sessions x tickers) share counts.
+    """
+    tickers = [t for t, lots in portfolio_data.items() if lots]
+    counts = np.array([len(portfolio_data[t]) for t in tickers], dtype=int)
+    col = np.repeat(np.arange(len(tickers)), counts)
+    dates = pd.DatetimeIndex([l["date"] for t in tickers for l in portfolio_data[t]])
+    shares = np.array([l["shares"] for t in tickers for l in portfolio_data[t]], dtype=float)
+
+    sessions = pd.DatetimeIndex(sessions)
+    if sessions.tz is not None:
+        sessions = sessions.tz_localize(None)
+    row = sessions.searchsorted(dates)
+
+    # scatter each lot into the session it becomes held, then accumulate
+    deltas = np.zeros((len(sessions) + 1, len(tickers)))
+    np.add.at(deltas, (row, col), shares)
+    held = np.cumsum(deltas[:-1], axis=0)
+    return pd.DataFrame(held, index=sessions, columns=tickers)
+
+
+def compute_nav_series(portfolio_data: dict, start_date: str, end_date: str,
+                       seed_prices: pd.Series = None) -> pd.DataFrame:
+    """
+    Historical value of a portfolio whose holdings change as lots are bought.
+
+    Args:
+        portfolio_data: Lots keyed by ticker (see ``core.portfolio_io``).
+        start_date: "YYYY-MM-DD"; clipped to the first purchase date.
+        end_date: "YYYY-MM-DD" (exclusive).
+        seed_prices: Last known price per ticker before ``start_date``;
+                     forward-filled into tickers with no quote at the
+                     start of the window.
+
+    Returns:
+        pd.DataFrame: Date-indexed per-ticker values plus "Total Value",
+                      starting at the first session with holdings. Empty
+                      if no prices could be fetched.
+    """
+    tickers = [t for t, lots in portfolio_data.items() if lots]
+    if not tickers:
+        return pd.DataFrame()
+
+    first_lot = min(l["date"] for t in tickers for l in portfolio_data[t])
+    start_date = max(start_date, first_lot)
+
+    prices = fetch_historical_data(tuple(tickers), start_date, end_date)
+    if prices.empty:
+        return pd.DataFrame()
+    prices = prices.reindex(columns=tickers)
+    if seed_prices is not None:
+        prices.iloc[0] = prices.iloc[0].fillna(seed_prices.reindex(tickers))
+    prices = prices.ffill()
+
+    held = share_position_matrix(portfolio_data, prices.index)
+    values = (prices.to_numpy() * held.to_numpy())
+    values = np.nan_to_num(values, nan=0.0)
+
+    df = pd.DataFrame(values, index=held.index, columns=tickers)
+    df["Total Value"] = values.sum(axis=1)
+    return df[df["Total Value"] > 0]
+
+
+def flow_adjusted_returns(nav_df: pd.DataFrame, portfolio_data: dict) -> pd.Series:
+    """
+    Session returns of a NAV frame with lot purchases neutralized.
+
+    Each session revalues the previous session's share counts at the
+    day's prices, so buying a lot raises the NAV but not the return.
+
+    Args:
+        nav_df: Per-ticker values plus "Total Value" (see ``compute_nav_series``).
+        portfolio_data: The lots the frame was computed from.
+
+    Returns:
+        pd.Series: Return per session after the first (NaN where nothing
+                   priced was held on the previous session).
+    """
+    tickers = [t for t in nav_df.columns if t != "Total Value"]
+    held = share_position_matrix(portfolio_data, nav_df.index).reindex(columns=tickers, fill_value=0.0)
+    held = held.to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prices = np.where(held > 0, nav_df[tickers].to_numpy(dtype=float) / held, np.nan)
+
+    priced = (prices[1:] > 0) & (prices[:-1] > 0)
+    now = np.where(priced, held[:-1] * prices[1:], 0.0).sum(axis=1)
+    before = np.where(priced, held[:-1] * prices[:-1], 0.0).sum(axis=1)
+    returns = np.where(before > 0, now / np.where(before > 0, before, 1.0) - 1.0, np.nan)
+    return pd.Series(returns, index=nav_df.index[1:], name="Return")
+
+
+def cached_nav_series(name: str, portfolio_data: dict, end_date: str = None) -> pd.DataFrame:
+    """
+    NAV series for a saved portfolio, served from the persisted cache.
+
+    Only sessions after the last cached date are computed and appended,
+    with each ticker's last cached price seeding the forward-fill, so a
+    ticker without a quote on the first new session keeps its value.
+    A cached row for today may hold an intraday price, so it is dropped
+    and recomputed. Lot edits through ``core.portfolio_io.save_portfolio``
+    truncate the cache from the earliest affected purchase date.
+
+    Args:
+        name: Portfolio name (cache key).
+        portfolio_data: Lots keyed by ticker.
+        end_date: "YYYY-MM-DD" (exclusive), defaults to tomorrow.
+
+    Returns:
+        pd.DataFrame: See ``compute_nav_series``.
+    """
+    end_date = end_date or (datetime.today() + timedelta(days=1)).strftime("%Y-%m-%d")
+    cached = read_nav(name)
+
+    today = pd.Timestamp(datetime.today().date())
+    if not cached.empty and cached.index[-1] >= today:
+        invalidate_nav(name, today.strftime("%Y-%m-%d"))
+        cached = read_nav(name)
+
+    if cached.empty:
+        nav_df = compute_nav_series(portfolio_data, "1900-01-01", end_date)
+        if not nav_df.empty:
+            write_nav(name, nav_df)
+        return nav_df
+
+    start = (cached.index[-1] + timedelta(days=1)).strftime("%Y-%m-%d")
+    if start >= end_date:
+        return cached
+
+    new_rows = compute_nav_series(portfolio_data, start, end_date,
+                                  seed_prices=_last_cached_prices(cached, portfolio_data))
+    return append_nav(name, new_rows)
+
+
+def cached_drawdown(name: str, nav_df: pd.DataFrame, portfolio_data: dict) -> DrawdownTracker:
+    """
+    Drawdown tracker of the flow-adjusted growth of a cached NAV frame.
+
+    The tracker state is persisted with the NAV cache and advanced only
+    with the sessions after its last date. Today's row may hold an
+    intraday price, so it is applied to a copy that is not persisted.
+
+    Args:
+        name: Portfolio name (cache key).
+        nav_df: Full frame from ``cached_nav_series``.
+        portfolio_data: The lots the frame was computed from.
+
+    Returns:
+        DrawdownTracker: Tracker covering every session of ``nav_df``.
+    """
+    state = read_drawdown_state(name)
+    if state is None or pd.Timestamp(state["date"]) not in nav_df.index:
+        tracker, growth, last = DrawdownTracker(), 1.0, nav_df.index[0]
+        tracker.update([growth])
+    else:
+        tracker = DrawdownTracker.from_state(state["tracker"])
+        growth, last = state["growth"], pd.Timestamp(state["date"])
+
+    today = pd.Timestamp(datetime.today().date())
+    new_rows = nav_df[nav_df.index >= last]
+    returns = flow_adjusted_returns(new_rows, portfolio_data).dropna()
+
+    done = returns[returns.index < today]
+    if not done.empty:
+        path = growth * (1 + done).cumprod()
+        tracker.update(path.to_numpy()[:, None])
+        growth, last = float(path.iloc[-1]), path.index[-1]
+    if state is None or pd.Timestamp(state["date"]) != last:
+        write_drawdown_state(name, {"date": last.strftime("%Y-%m-%d"), "growth": growth,
+                                    "tracker": tracker.state_dict()})
+
+    intraday = returns[returns.index >= today]
+    if not intraday.empty:
+        tracker = DrawdownTracker.from_state(tracker.state_dict())
+        tracker.update(growth * (1 + intraday).cumprod().to_numpy()[:, None])
+    return tracker
+
+
+def _last_cached_prices(cached: pd.DataFrame, portfolio_data: dict) -> pd.Series:
+    """Per-ticker price on the last cached session: cached value / shares held."""
+    held = share_position_matrix(portfolio_data, cached.index[-1:]).iloc[0]
+    values = cached.iloc[-1].reindex(held.index)
+    return (values / held.where(held > 0)).where(values > 0)
@@ -0,0 +1,122 @@
+"""
+Module: nav_cache
+Persisted per-portfolio NAV series.
+
+Each portfolio's computed NAV is stored as a CSV under NAV_CACHE_DIR. The
+last row's date is the last computed session; callers append only newer
+sessions, and edits to the lots truncate the cache from the earliest
+affected date. The drawdown tracker state of the cached sessions is kept
+next to the CSV so it can resume from its last session.
+"""
+
+import os
+import json
+import pandas as pd
+from collections import Counter
+
+NAV_CACHE_DIR = "data/cache/nav"
+
+
+def _nav_path(name: str) -> str:
+    return os.path.join(NAV_CACHE_DIR, f"{name}.csv")
+
+
+def _drawdown_path(name: str) -> str:
+    return os.path.join(NAV_CACHE_DIR, f"{name}.drawdown.json")
+
+
+def read_nav(name: str) -> pd.DataFrame:
+    """Cached NAV frame for a portfolio (empty if none)."""
+    path = _nav_path(name)
+    if os.path.exists(path):
+        return pd.read_csv(path, index_col=0, parse_dates=True)
+    return pd.DataFrame()
+
+
+def write_nav(name: str, nav_df: pd.DataFrame):
+    """Replace the cached NAV frame."""
+    os.makedirs(NAV_CACHE_DIR, exist_ok=True)
+    nav_df.to_csv(_nav_path(name))
+
+
+def append_nav(name: str, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Append sessions after the last cached date and return the full frame.
+    Rows at or before the last cached date are ignored.
+    """
+    cached = read_nav(name)
+    if new_rows.empty:
+        return cached
+    if not cached.empty:
+        new_rows = new_rows[new_rows.index > cached.index[-1]]
+        if new_rows.empty:
+            return cached
+    path = _nav_path(name)
+    if cached.empty or list(new_rows.columns) != list(cached.columns):
+        # new columns (e.g. a new ticker) -> rewrite with the union of columns
+        combined = pd.concat([cached, new_rows]).fillna(0.0)
+        write_nav(name, combined)
+        return combined
+    new_rows.to_csv(path, mode="a", header=False)
+    return pd.concat([cached, new_rows])
+
+
+def read_drawdown_state(name: str):
+    """Persisted drawdown state for a portfolio (None if none)."""
+    path = _drawdown_path(name)
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return None
+
+
+def write_drawdown_state(name: str, state: dict):
+    """
+    Replace the persisted drawdown state. ``state`` holds the last session
+    ("date"), its growth level ("growth") and ``DrawdownTracker.state_dict()``
+    ("tracker").
+    """
+    os.makedirs(NAV_CACHE_DIR, exist_ok=True)
+    tracker = {k: (v.tolist() if hasattr(v, "tolist") else v) for k, v in state["tracker"].items()}
+    with open(_drawdown_path(name), "w") as f:
+        json.dump({**state, "tracker": tracker}, f)
+
+
+def invalidate_nav(name: str, from_date: str = None):
+    """
+    Drop cached sessions on or after ``from_date`` (everything if None).
+    The drawdown state is dropped if it covers any of them.
+    """
+    state = read_drawdown_state(name)
+    if state is not None and (from_date is None
+                              or pd.Timestamp(state["date"]) >= pd.Timestamp(from_date)):
+        os.remove(_drawdown_path(name))
+    path = _nav_path(name)
+    if not os.path.exists(path):
+        return
+    if from_date is None:
+        os.remove(path)
+        return
+    cached = read_nav(name)
+    kept = cached[cached.index < pd.Timestamp(from_date)]
+    if kept.empty:
+        os.remove(path)
+    else:
+        write_nav(name, kept)
+
+
+def earliest_changed_date(old: dict, new: dict):
+    """
+    Earliest purchase date of any lot added or removed between two
+    versions of a portfolio, or None if the lots are identical.
+    """
+    def lot_keys(data):
+        keys = []
+        for ticker, lots in data.items():
+            for l in lots:
+                keys.append((ticker, str(l["date"]), float(l["shares"]), float(l["price"])))
+        return keys
+
+    old_keys, new_keys = Counter(lot_keys(old)), Counter(lot_keys(new))
+    changed = (old_keys - new_keys) + (new_keys - old_keys)
+    return min(k[1] for k in changed) if changed else None
@@ -85,7 +85,83 @@ class PortfolioOptimizer:
 
 import numpy as np
 import pandas as pd
-from scipy.optimize import minimize
+from scipy import sparse
+from scipy.optimize import minimize, linprog
+from scipy.cluster.hierarchy import linkage, leaves_list
+from scipy.spatial.distance import squareform
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+import time
+
+
+def _max_sharpe_weights(mu: np.ndarray, S: np.ndarray, risk_free_rate: float = 0.0) -> np.ndarray:
+    """
+    Solve max Sharpe = (w^T mu - rf) / sqrt(w^T S w)
+    under w >= 0 and sum(w)==1 with SLSQP.
+    """
+    n = len(mu)
+
+    def neg_sharpe(w):
+        # portfolio return
+        port_ret = w @ mu
+        # portfolio vol
+        port_vol = np.sqrt(w @ S @ w)
+        # negative Sharpe
+        return - (port_ret - risk_free_rate) / port_vol
+
+    # constraints: sum weights = 1
+    cons = ({'type': 'eq', 'fun': lambda w: np.sum(w) - 1})
+    # bounds: no shorting
+    bnds = tuple((0.0, 1.0) for _ in range(n))
+    # initial guess: equal weights
+    w0 = np.repeat(1/n, n)
+
+    sol = minimize(neg_sharpe, w0,
+                   method="SLSQP",
+                   bounds=bnds,
+                   constraints=cons)
+
+    if not sol.success:
+        raise ValueError(f"Optimization failed: {sol.message}")
+
+    return sol.x
+
+
+# Per-process view of the shared return matrix used by resampled_optimization
+_RESAMPLE_RETURNS = None
+_RESAMPLE_SHM = None
+
+
+def _init_resample_worker(shm_name, shape, dtype):
+    """Attach a worker to the shared, read-only return matrix."""
+    global _RESAMPLE_RETURNS, _RESAMPLE_SHM
+    _RESAMPLE_SHM = shared_memory.SharedMemory(name=shm_name)
+    _RESAMPLE_RETURNS = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_RESAMPLE_SHM.buf)
+    _RESAMPLE_RETURNS.flags.writeable = False
+
+
+def _solve_resample(task, R=None):
+    """
+    Bootstrap one resample and solve it; returns (weights or None, cpu seconds).
+
+    ``R`` is the return matrix; pool workers leave it out and read the
+    one attached by ``_init_resample_worker``.
+    """
+    seed_seq, periods_per_year, risk_free_rate = task
+    cpu_start = time.process_time()
+    rng = np.random.default_rng(seed_seq)
+    if R is None:
+        R = _RESAMPLE_RETURNS
+    sample = R[rng.integers(0, R.shape[0], R.shape[0])]
+    mu = sample.mean(axis=0) * periods_per_year
+    S = np.cov(sample, rowvar=False) * periods_per_year
+    try:
+        weights = _max_sharpe_weights(mu, np.atleast_2d(S), risk_free_rate)
+    except ValueError:
+        weights = None
+    return weights, time.process_time() - cpu_start
+
 
 class PortfolioOptimizer:
     """
@@ -100,45 +176,47 @@ class PortfolioOptimizer:
         """
         # 1) Compute simple returns
         returns = price_df.pct_change().dropna()
+        self.returns = returns
+        self.periods_per_year = periods_per_year
 
         # 2) Annualize expected return and covariance
         self.mu = returns.mean() * periods_per_year                   # Series: expected annual return
         self.S  = returns.cov() * periods_per_year                    # DataFrame: annual covariance
 
         self.tickers = list(price_df.columns)
+        # forward-filled: an exchange closed on the last session has no quote in its row
+        self.last_prices = price_df.ffill().iloc[-1] if len(price_df) else None
 
-    def mean_variance_optimization(self, risk_free_rate: float = 0.0) -> dict:
-        """
-        Solve max Sharpe = (w^T mu - rf) / sqrt(w^T S w)
-        under w >= 0 and sum(w)==1.
-        Returns the same dict structure as before.
+    @classmethod
+    def from_estimator(cls, estimator, periods_per_year: int = 252) -> "PortfolioOptimizer":
         """
-        n = len(self.mu)
-
-        def neg_sharpe(w):
-            # portfolio return
-            port_ret = w @ self.mu
-            # portfolio vol
-            port_vol = np.sqrt(w @ self.S.values @ w)
-            # negative Sharpe
-            return - (port_ret - risk_free_rate) / port_vol
+        Build an optimizer from a streaming estimator (see core.estimators)
+        instead of a full price history.
 
-        # constraints: sum weights = 1
-        cons = ({'type': 'eq', 'fun': lambda w: np.sum(w) - 1})
-        # bounds: no shorting
-        bnds = tuple((0.0, 1.0) for _ in range(n))
-        # initial guess: equal weights
-        w0 = np.repeat(1/n, n)
-
-        sol = minimize(neg_sharpe, w0,
-                       method="SLSQP",
-                       bounds=bnds,
-                       constraints=cons)
+        Args:
+            estimator: Object exposing per-period ``mean``, ``covariance``
+                       and ``tickers`` (e.g. ``OnlineCovariance``).
+            periods_per_year: Number of trading periods in a year (252 for daily).
 
-        if not sol.success:
-            raise ValueError(f"Optimization failed: {sol.message}")
+        Note:
+            No return history is kept, so ``cvar_optimization`` needs an
+            explicit scenario matrix.
+        """
+        opt = cls.__new__(cls)
+        opt.returns = None
+        opt.periods_per_year = periods_per_year
+        opt.mu = estimator.mean * periods_per_year
+        opt.S  = estimator.covariance * periods_per_year
+        opt.tickers = list(estimator.tickers)
+        last = getattr(estimator, "last_prices", None)
+        opt.last_prices = None if last is None else pd.Series(last, index=opt.tickers)
+        return opt
 
-        weights = sol.x
+    def _result(self, weights: np.ndarray, risk_free_rate: float = 0.0) -> dict:
+        """
+        Package a weight vector into the standard result dict
+        ({"weights": {...}, "performance": {...}}).
+        """
         # zero out very small weights
         cleaned = {t: float(w) for t, w in zip(self.tickers, weights) if w > 1e-6}
 
@@ -156,7 +234,360 @@ class PortfolioOptimizer:
             }
         }
 
+    def mean_variance_optimization(self, risk_free_rate: float = 0.0) -> dict:
+        """
+        Solve max Sharpe = (w^T mu - rf) / sqrt(w^T S w)
+        under w >= 0 and sum(w)==1.
+        Returns the same dict structure as before.
+        """
+        weights = _max_sharpe_weights(self.mu.values, self.S.values, risk_free_rate)
+        return self._result(weights, risk_free_rate)
+
+    def resampled_optimization(self, n_resamples: int = 200, risk_free_rate: float = 0.0,
+                               seed: int = None, n_jobs: int = None,
+                               max_cpu_seconds: float = None,
+                               band_quantiles=(0.05, 0.95)) -> dict:
+        """
+        Michaud-style resampled efficiency: bootstrap the return history,
+        solve max Sharpe on every resample and average the weights.
+
+        Resamples are solved across a process pool. The return matrix is
+        placed in shared memory once and every worker maps it read-only,
+        so only seeds and weight vectors cross process boundaries. Each
+        resample draws from its own ``SeedSequence`` child, so results do
+        not depend on the number of workers.
+
+        Args:
+            n_resamples: Number of bootstrap resamples.
+            risk_free_rate: Risk-free rate used in the Sharpe objective.
+            seed: Seed for reproducible resampling.
+            n_jobs: Worker processes (None = all cores, 1 = in-process).
+            max_cpu_seconds: Stop launching new resamples once the summed
+                             solver CPU time exceeds this budget.
+            band_quantiles: (low, high) quantiles for the weight bands.
+
+        Returns:
+            dict: Same structure as ``mean_variance_optimization``, plus
+                  "weight_bands" {ticker: (low, high)} and "n_resamples"
+                  (the number actually solved).
+        """
+        if self.returns is None:
+            raise ValueError("No return history available to resample")
+
+        R = np.ascontiguousarray(self.returns[self.tickers].values, dtype=float)
+        children = np.random.SeedSequence(seed).spawn(n_resamples)
+        tasks = [(child, self.periods_per_year, risk_free_rate) for child in children]
+
+        solved = []
+        cpu_used = 0.0
+        if n_jobs == 1:
+            for task in tasks:
+                if max_cpu_seconds is not None and cpu_used >= max_cpu_seconds:
+                    break
+                weights, cpu = _solve_resample(task, R)
+                cpu_used += cpu
+                if weights is not None:
+                    solved.append(weights)
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=R.nbytes)
+            try:
+                np.ndarray(R.shape, dtype=R.dtype, buffer=shm.buf)[:] = R
+                with ProcessPoolExecutor(max_workers=n_jobs,
+                                         initializer=_init_resample_worker,
+                                         initargs=(shm.name, R.shape, R.dtype.str)) as pool:
+                    workers = n_jobs or os.cpu_count() or 1
+                    # submit in waves so the CPU budget can stop further work
+                    for start in range(0, len(tasks), workers):
+                        if max_cpu_seconds is not None and cpu_used >= max_cpu_seconds:
+                            break
+                        for weights, cpu in pool.map(_solve_resample, tasks[start:start + workers]):
+                            cpu_used += cpu
+                            if weights is not None:
+                                solved.append(weights)
+            finally:
+                shm.close()
+                shm.unlink()
+
+        if not solved:
+            raise ValueError("Optimization failed: no resample could be solved")
+
+        W = np.vstack(solved)
+        weights = W.mean(axis=0)
+        low, high = np.quantile(W, band_quantiles, axis=0)
+
+        result = self._result(weights, risk_free_rate)
+        result["weight_bands"] = {t: (float(l), float(h)) for t, l, h in zip(self.tickers, low, high)}
+        result["n_resamples"] = len(solved)
+        return result
+
+    def rebalance(self, portfolio_data: dict, prices: pd.Series = None, cash: float = 0.0,
+                  risk_aversion: float = 1.0, transaction_cost: float = 0.001,
+                  turnover_penalty: float = 0.0, whole_shares: bool = True) -> dict:
+        """
+        Turn current holdings into concrete share orders, trading off the
+        mean-variance objective against trading costs:
+
+            max  w^T mu - (lambda / 2) w^T S w - (c + kappa) * sum|w - w0|
+
+        with w = w0 + buy - sell, buy, sell >= 0, sum(w) == 1, w >= 0.
+        Splitting the trade into buy/sell legs keeps the objective smooth,
+        so SLSQP with analytic gradients solves typical portfolios in a
+        few milliseconds.
+
+        Args:
+            portfolio_data: Lots keyed by ticker, as returned by
+                            ``core.portfolio_io.load_portfolio``.
+            prices: Latest price per ticker (defaults to the last row of
+                    the price history the optimizer was built from).
+            cash: Uninvested cash available to deploy.
+            risk_aversion: lambda, weight on annual variance.
+            transaction_cost: c, proportional cost per unit of traded value.
+            turnover_penalty: kappa, extra penalty per unit of turnover.
+            whole_shares: Round orders to whole shares. Sells are rounded
+                          up (never past the shares held) and buys down,
+                          then buys are trimmed until cash covers them
+                          and the transaction cost. Fractional buys are
+                          scaled down pro rata to the same budget.
+
+        Returns:
+            dict: {"orders": DataFrame, "weights": {...},
+                   "turnover": float, "transaction_cost": float,
+                   "cash_remaining": float}
+        """
+        if prices is None:
+            prices = self.last_prices
+        if prices is None:
+            raise ValueError("No prices available; pass the latest prices")
+        px = prices.reindex(self.tickers).values.astype(float)
+        if not np.all(np.isfinite(px) & (px > 0)):
+            missing = [t for t, p in zip(self.tickers, px) if not (np.isfinite(p) and p > 0)]
+            raise ValueError(f"No valid price for {', '.join(missing)}")
+
+        shares = np.array([sum(l["shares"] for l in portfolio_data.get(t, [])) for t in self.tickers])
+        total_value = shares @ px + cash
+        if total_value <= 0:
+            raise ValueError("Portfolio has no value to rebalance")
+        w0 = shares * px / total_value
+
+        n = len(self.tickers)
+        mu, S = self.mu.values, self.S.values
+        cost = transaction_cost + turnover_penalty
+
+        def objective(x):
+            w = w0 + x[:n] - x[n:]
+            Sw = S @ w
+            grad_w = -mu + risk_aversion * Sw
+            value = -(w @ mu) + 0.5 * risk_aversion * (w @ Sw) + cost * x.sum()
+            return value, np.concatenate([grad_w + cost, -grad_w + cost])
+
+        cons = ({'type': 'eq',
+                 'fun': lambda x: np.sum(w0 + x[:n] - x[n:]) - 1,
+                 'jac': lambda x: np.concatenate([np.ones(n), -np.ones(n)])},)
+        bnds = [(0.0, 1.0 - w) for w in w0] + [(0.0, w) for w in w0]
+        # start from "do nothing" except deploying any cash pro rata
+        x0 = np.concatenate([np.full(n, (1 - w0.sum()) / n), np.zeros(n)])
+
+        sol = minimize(objective, x0, jac=True, method="SLSQP", bounds=bnds, constraints=cons)
+        if not sol.success:
+            raise ValueError(f"Optimization failed: {sol.message}")
+
+        target = w0 + sol.x[:n] - sol.x[n:]
+        order_shares = (target - w0) * total_value / px
+        if whole_shares:
+            order_shares = np.where(order_shares > 0, np.floor(order_shares + 1e-9),
+                                    np.maximum(np.floor(order_shares), -shares))
+            while True:
+                spend = order_shares @ px + np.abs(order_shares) @ px * transaction_cost
+                buys = np.flatnonzero(order_shares > 0)
+                if spend <= cash + 1e-9 or not len(buys):
+                    break
+                # drop a share of the cheapest buy that covers the shortfall, else of the dearest
+                short = spend - cash
+                covers = buys[px[buys] * (1 + transaction_cost) >= short]
+                i = covers[np.argmin(px[covers])] if len(covers) else buys[np.argmax(px[buys])]
+                order_shares[i] -= 1
+        else:
+            # the weights sum to one before costs, so scale buys down until cash covers the cost
+            buy_value = np.clip(order_shares, 0, None) @ px
+            sell_value = -np.clip(order_shares, None, 0) @ px
+            budget = max((cash + sell_value * (1 - transaction_cost)) / (1 + transaction_cost), 0.0)
+            if buy_value > budget:
+                order_shares = np.where(order_shares > 0, order_shares * budget / buy_value, order_shares)
+        order_value = order_shares * px
+
+        orders = pd.DataFrame({
+            "Ticker": self.tickers,
+            "Current Shares": shares,
+            "Current Weight": w0,
+            "Target Weight": target,
+            "Order Shares": order_shares,
+            "Order Value": order_value,
+            "Est. Cost": np.abs(order_value) * transaction_cost,
+        })
+        orders = orders[orders["Order Shares"] != 0].reset_index(drop=True)
+
+        return {
+            "orders": orders,
+            "weights": {t: float(w) for t, w in zip(self.tickers, target) if w > 1e-6},
+            "turnover": float(np.abs(order_value).sum() / total_value),
+            "transaction_cost": float(orders["Est. Cost"].sum()),
+            "cash_remaining": float(cash - order_value.sum() - np.abs(order_value).sum() * transaction_cost),
+        }
+
+    def cvar_optimization(self, scenarios=None, confidence_level: float = 0.95,
+                          target_return: float = None, risk_free_rate: float = 0.0,
+                          max_rounds: int = 50) -> dict:
+        """
+        Minimize Conditional Value-at-Risk (expected shortfall) over a
+        scenario matrix using the Rockafellar-Uryasev linear program:
+
+            min  alpha + 1 / ((1 - beta) * S) * sum(u_s)
+            s.t. u_s >= -r_s^T w - alpha,  u_s >= 0,
+                 sum(w) == 1,  0 <= w <= 1,
+                 [w^T mu >= target_return]
+
+        Only scenarios in (or near) the loss tail can have u_s > 0, so the
+        LP is solved over an active subset of scenarios and grown by
+        constraint generation: after each solve, every scenario whose loss
+        exceeds alpha is added and the LP is re-solved. The constraint
+        matrix is assembled in sparse (CSR) form, and the full S x n matrix
+        is only touched through one matrix-vector product per round.
+
+        Args:
+            scenarios: (S x n) per-period returns, historical or simulated.
+                       A DataFrame is aligned to ``self.tickers``; defaults to
+                       the historical returns computed in ``__init__``.
+            confidence_level: CVaR confidence level beta (e.g. 0.95).
+            target_return: Optional minimum annual expected return.
+            risk_free_rate: Used only for the reported Sharpe ratio.
+            max_rounds: Maximum number of constraint-generation rounds.
+
+        Returns:
+            dict: Same structure as ``mean_variance_optimization``, with
+                  per-period "var" and "cvar" (as positive losses) added
+                  to "performance".
+        """
+        if scenarios is None:
+            if self.returns is None:
+                raise ValueError("No return history available; pass a scenario matrix")
+            scenarios = self.returns
+        if isinstance(scenarios, pd.DataFrame):
+            scenarios = scenarios[self.tickers].values
+        R = np.asarray(scenarios)
+        n_scen, n = R.shape
+        if n != len(self.tickers):
+            raise ValueError(f"Scenario matrix has {n} assets, expected {len(self.tickers)}")
+
+        scale = 1.0 / ((1.0 - confidence_level) * n_scen)
+        k = max(int(np.ceil((1.0 - confidence_level) * n_scen)), 1)
+
+        # seed the active set with the tail of the equal-weight portfolio
+        losses = -(R @ np.repeat(1 / n, n))
+        active = np.argpartition(losses, n_scen - min(2 * k, n_scen))[n_scen - min(2 * k, n_scen):]
+
+        for _ in range(max_rounds):
+            m = len(active)
+            # variable layout: [w (n), alpha (1), u (m)]
+            c = np.concatenate([np.zeros(n), [1.0], np.full(m, scale)])
+
+            # -R_a w - alpha - u <= 0
+            A_ub = sparse.hstack([
+                sparse.csr_matrix(-R[active]),
+                sparse.csr_matrix(-np.ones((m, 1))),
+                -sparse.identity(m, format="csr"),
+            ], format="csr")
+            b_ub = np.zeros(m)
+
+            if target_return is not None:
+                ret_row = sparse.csr_matrix(np.concatenate([-self.mu.values, np.zeros(1 + m)]))
+                A_ub = sparse.vstack([A_ub, ret_row], format="csr")
+                b_ub = np.append(b_ub, -target_return)
+
+            A_eq = sparse.csr_matrix(np.concatenate([np.ones(n), np.zeros(1 + m)]))
+            b_eq = np.array([1.0])
+
+            bnds = [(0.0, 1.0)] * n + [(None, None)] + [(0.0, None)] * m
+
+            sol = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+                          bounds=bnds, method="highs-ipm")
+
+            if not sol.success:
+                raise ValueError(f"Optimization failed: {sol.message}")
+
+            w, alpha = sol.x[:n], sol.x[n]
+            losses = -(R @ w)
+            violated = np.flatnonzero(losses > alpha + 1e-10)
+            violated = np.setdiff1d(violated, active, assume_unique=True)
+            if violated.size == 0:
+                break
+            active = np.concatenate([active, violated])
+        else:
+            raise ValueError("Optimization failed: CVaR scenario generation did not converge")
+
+        result = self._result(w, risk_free_rate)
+        result["performance"]["var"] = float(alpha)
+        result["performance"]["cvar"] = float(sol.fun)
+        return result
+
+
+    def hrp_optimization(self, linkage_method: str = "single", risk_free_rate: float = 0.0) -> dict:
+        """
+        Hierarchical Risk Parity (Lopez de Prado, 2016).
+
+        1) Cluster assets on the correlation distance sqrt((1 - rho) / 2).
+        2) Quasi-diagonalize: order assets by the dendrogram leaves so that
+           correlated assets sit next to each other.
+        3) Recursive bisection: split the ordered list in halves and divide
+           weight between them in inverse proportion to their
+           inverse-variance cluster variance.
+
+        No matrix is inverted and there is no numerical optimizer, so the
+        cost is dominated by the O(n^2) linkage and cluster variances.
+
+        Args:
+            linkage_method: scipy linkage method ("single", "average", "ward", ...).
+            risk_free_rate: Used only for the reported Sharpe ratio.
+
+        Returns:
+            dict: Same structure as ``mean_variance_optimization``.
+        """
+        cov = self.S.values
+        n = cov.shape[0]
+        if n == 1:
+            return self._result(np.ones(1), risk_free_rate)
+
+        # 1) correlation distance -> hierarchical clustering
+        std = np.sqrt(np.diag(cov))
+        corr = np.clip(cov / np.outer(std, std), -1.0, 1.0)
+        dist = np.sqrt(np.clip(0.5 * (1.0 - corr), 0.0, None))
+        link = linkage(squareform(dist, checks=False), method=linkage_method)
+
+        # 2) quasi-diagonal ordering
+        order = leaves_list(link)
+
+        # 3) recursive bisection (iterative, one cluster pair at a time)
+        inv_var = 1.0 / np.diag(cov)
+
+        def cluster_var(idx):
+            w = inv_var[idx] / inv_var[idx].sum()
+            return w @ cov[np.ix_(idx, idx)] @ w
+
+        weights = np.ones(n)
+        stack = [order]
+        while stack:
+            items = stack.pop()
+            if len(items) < 2:
+                continue
+            half = len(items) // 2
+            left, right = items[:half], items[half:]
+            var_l, var_r = cluster_var(left), cluster_var(right)
+            alpha = 1.0 - var_l / (var_l + var_r)
+            weights[left] *= alpha
+            weights[right] *= 1.0 - alpha
+            stack.extend([left, right])
+
+        return self._result(weights, risk_free_rate)
+
 
     # If you still need Black‐Litterman, you can re‐implement it
     # with cvxpy or manual matrix algebra—but that’s more involved.
-
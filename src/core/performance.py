@@ -3,6 +3,10 @@ Module: performance
 Evaluates performance metrics of a portfolio.
 """
 
+import numpy as np
+import pandas as pd
+
+
 def calculate_sharpe_ratio(returns, risk_free_rate=0.01):
     """
     Calculate Sharpe Ratio.
@@ -16,3 +20,162 @@ def calculate_sharpe_ratio(returns, risk_free_rate=0.01):
     """
     excess_returns = returns.mean() - risk_free_rate / 252
     return excess_returns / returns.std() * (252**0.5)
+
+
+def _as_frame(returns):
+    if isinstance(returns, pd.Series):
+        return returns.to_frame(returns.name if returns.name is not None else "Portfolio")
+    return returns
+
+
+def performance_metrics(returns, benchmark: pd.Series = None, risk_free_rate=0.01,
+                        periods_per_year=252) -> pd.DataFrame:
+    """
+    Compute the standard performance metrics for one or many return series
+    from a single set of power sums.
+
+    Every moment-based metric (mean, volatility, Sharpe, Sortino, skew,
+    kurtosis, hit rate, beta, information ratio) is derived from column
+    sums of r, r^2, r^3, r^4, the downside squares, r*b and the hit count,
+    so each series is swept once instead of once per metric. Calmar uses
+    the compounded NAV for CAGR and max drawdown.
+
+    Args:
+        returns (pd.Series | pd.DataFrame): Per-period returns, one column per series.
+        benchmark (pd.Series, optional): Benchmark returns for beta / information ratio.
+        risk_free_rate (float): Annual risk-free rate.
+        periods_per_year (int): 252 for daily data.
+
+    Returns:
+        pd.DataFrame: One row per series with "Annual Return", "Volatility",
+                      "Sharpe Ratio", "Sortino Ratio", "Calmar Ratio",
+                      "Max Drawdown", "Skew", "Kurtosis", "Hit Rate" and,
+                      with a benchmark, "Beta" and "Information Ratio".
+    """
+    frame = _as_frame(returns).dropna(how="all")
+    if benchmark is not None:
+        frame, benchmark = frame.align(benchmark.dropna(), join="inner", axis=0)
+    R = frame.to_numpy(dtype=float)
+    # NaNs are dropped per series (e.g. a ticker listed later), not row-wise
+    valid = np.isfinite(R)
+    if benchmark is not None:
+        b = benchmark.to_numpy(dtype=float)
+        valid &= np.isfinite(b)[:, None]
+        B = np.where(valid, b[:, None], 0.0)
+    R = np.where(valid, R, 0.0)
+    n = valid.sum(axis=0)
+    P = periods_per_year
+    rf = risk_free_rate / P
+
+    # power sums (the single pass)
+    s1 = R.sum(axis=0)
+    s2 = (R * R).sum(axis=0)
+    s3 = (R ** 3).sum(axis=0)
+    s4 = (R ** 4).sum(axis=0)
+    down = np.where(valid, np.minimum(R - rf, 0.0), 0.0)
+    sd2 = (down * down).sum(axis=0)
+    hits = (R > 0).sum(axis=0)
+
+    # missing periods count as flat for the compounded NAV
+    growth = np.cumprod(1 + R, axis=0)
+    peak = np.maximum.accumulate(growth, axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s1 / n
+        m2 = s2 / n - mean ** 2                                   # population central moments
+        m3 = s3 / n - 3 * mean * s2 / n + 2 * mean ** 3
+        m4 = s4 / n - 4 * mean * s3 / n + 6 * mean ** 2 * s2 / n - 3 * mean ** 4
+        std = np.sqrt(m2 * n / (n - 1))                           # sample std, like pandas
+
+        max_dd = (growth / peak - 1).min(axis=0) if len(R) else np.full(R.shape[1], np.nan)
+        cagr = (growth[-1] if len(R) else np.ones(R.shape[1])) ** (P / n) - 1
+
+        metrics = {
+            "Annual Return": cagr,
+            "Volatility": std * np.sqrt(P),
+            "Sharpe Ratio": (mean - rf) / std * np.sqrt(P),
+            "Sortino Ratio": (mean - rf) / np.sqrt(sd2 / n) * np.sqrt(P),
+            "Calmar Ratio": cagr / np.abs(max_dd),
+            "Max Drawdown": max_dd,
+            "Skew": m3 / m2 ** 1.5,
+            "Kurtosis": m4 / m2 ** 2 - 3,
+            "Hit Rate": hits / n,
+        }
+
+        if benchmark is not None:
+            sb, sbb = B.sum(axis=0), (B * B).sum(axis=0)
+            srb = (R * B).sum(axis=0)
+            cov_rb = srb / n - mean * sb / n
+            var_b = sbb / n - (sb / n) ** 2
+            active_mean = mean - sb / n
+            active_var = (s2 - 2 * srb + sbb) / n - active_mean ** 2
+            metrics["Beta"] = cov_rb / var_b
+            metrics["Information Ratio"] = active_mean / np.sqrt(active_var * n / (n - 1)) * np.sqrt(P)
+
+    return pd.DataFrame(metrics, index=frame.columns)
+
+
+def rolling_performance(returns, window: int = 63, risk_free_rate=0.01,
+                        periods_per_year=252, min_periods: int = None) -> pd.DataFrame:
+    """
+    Rolling volatility, Sharpe, Sortino, skew, kurtosis and hit rate in O(n).
+
+    Window sums are differences of cumulative sums (of r, r^2, r^3, r^4,
+    downside squares and hits), so each step costs O(1) per series rather
+    than recomputing the window. NaNs enter the sums as zeros and are
+    left out of a per-window count of valid periods, so a gap only
+    affects the windows that contain it.
+
+    Args:
+        returns (pd.Series | pd.DataFrame): Per-period returns.
+        window (int): Window length in periods.
+        risk_free_rate (float): Annual risk-free rate.
+        periods_per_year (int): 252 for daily data.
+        min_periods (int, optional): Valid periods a window needs for a
+            value (defaults to ``window``, as in ``DataFrame.rolling``).
+
+    Returns:
+        pd.DataFrame: For a Series, one column per metric. For a DataFrame,
+                      MultiIndex columns (metric, series). Windows with
+                      fewer than ``min_periods`` valid periods are NaN.
+    """
+    frame = _as_frame(returns)
+    R = frame.to_numpy(dtype=float)
+    P = periods_per_year
+    rf = risk_free_rate / P
+    min_periods = window if min_periods is None else min_periods
+
+    def window_sum(X):
+        c = np.vstack([np.zeros((1, X.shape[1])), np.cumsum(X, axis=0)])
+        out = np.full(X.shape, np.nan)
+        out[window - 1:] = c[window:] - c[:-window]
+        return out
+
+    valid = np.isfinite(R)
+    R = np.where(valid, R, 0.0)
+    down = np.where(valid, np.minimum(R - rf, 0.0), 0.0)
+    n = window_sum(valid.astype(float))
+    n[n < max(min_periods, 2)] = np.nan
+    s1, s2, s3, s4 = (window_sum(R ** k) for k in (1, 2, 3, 4))
+    sd2 = window_sum(down * down)
+    hits = window_sum((R > 0).astype(float))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s1 / n
+        m2 = np.maximum(s2 / n - mean ** 2, 0.0)
+        m3 = s3 / n - 3 * mean * s2 / n + 2 * mean ** 3
+        m4 = s4 / n - 4 * mean * s3 / n + 6 * mean ** 2 * s2 / n - 3 * mean ** 4
+        std = np.sqrt(m2 * n / (n - 1))
+        metrics = {
+            "Volatility": std * np.sqrt(P),
+            "Sharpe Ratio": (mean - rf) / std * np.sqrt(P),
+            "Sortino Ratio": (mean - rf) / np.sqrt(sd2 / n) * np.sqrt(P),
+            "Skew": m3 / m2 ** 1.5,
+            "Kurtosis": m4 / m2 ** 2 - 3,
+            "Hit Rate": hits / n,
+        }
+
+    if isinstance(returns, pd.Series):
+        return pd.DataFrame({k: v[:, 0] for k, v in metrics.items()}, index=frame.index)
+    return pd.concat({k: pd.DataFrame(v, index=frame.index, columns=frame.columns)
+                      for k, v in metrics.items()}, axis=1)
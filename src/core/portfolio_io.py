@@ -1,28 +1,285 @@
 # src/core/portfolio_io.py
 
+import functools
 import json
 import os
+import threading
+from types import MappingProxyType
+
+from . import binary_store, journal_store, sqlite_store
+from .nav_cache import earliest_changed_date, invalidate_nav
 
 PORTFOLIO_DIR = "data/portfolios"
 
-def get_all_portfolio_names():
-    """Return a list of available portfolios."""
-    if not os.path.exists(PORTFOLIO_DIR):
-        os.makedirs(PORTFOLIO_DIR)
-    return [f.replace(".json", "") for f in os.listdir(PORTFOLIO_DIR) if f.endswith(".json")]
+# storage backend: "json" (one file per portfolio), "sqlite" or "journal"
+PORTFOLIO_BACKEND = os.environ.get("PORTFOLIO_BACKEND", "json")
+PORTFOLIO_DB = os.environ.get("PORTFOLIO_DB", "data/portfolios.db")
+PORTFOLIO_JOURNAL_DIR = os.environ.get("PORTFOLIO_JOURNAL_DIR", "data/journal")
+# file format written by the json backend: "json" or "binary" (.pfb); both are read
+PORTFOLIO_FORMAT = os.environ.get("PORTFOLIO_FORMAT", "json")
 
-def load_portfolio(name):
-    """Load a portfolio by name."""
-    path = os.path.join(PORTFOLIO_DIR, f"{name}.json")
+def _use_sqlite():
+    return PORTFOLIO_BACKEND == "sqlite"
+
+def _use_journal():
+    return PORTFOLIO_BACKEND == "journal"
+
+def _json_path(name):
+    return os.path.join(PORTFOLIO_DIR, f"{name}.json")
+
+def _binary_path(name):
+    return os.path.join(PORTFOLIO_DIR, name + binary_store.SUFFIX)
+
+def _stored_as_binary(name):
+    """True when a file-backend portfolio is read from its binary file."""
+    return (not _use_sqlite() and not _use_journal()
+            and not os.path.exists(_json_path(name)) and os.path.exists(_binary_path(name)))
+
+# ---- Repository cache ----
+# Parsed portfolios are kept per process and handed out frozen. An entry
+# is reused while the (inode, mtime, size) of its backing files is
+# unchanged, so a Streamlit rerun costs a few stat calls instead of a
+# directory listing and a parse.
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def _file_identity(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _backing_files(name=None):
+    """Files whose change invalidates the portfolio list (name=None) or one portfolio."""
+    if _use_sqlite():
+        return [PORTFOLIO_DB, PORTFOLIO_DB + "-wal"]
+    if _use_journal():
+        if name is None:
+            return [PORTFOLIO_JOURNAL_DIR]
+        base = os.path.join(PORTFOLIO_JOURNAL_DIR, name)
+        return [base + journal_store.JOURNAL_SUFFIX, base + journal_store.SNAPSHOT_SUFFIX]
+    if name is None:
+        return [PORTFOLIO_DIR]
+    return [_json_path(name), _binary_path(name)]
+
+def _cached(name, read, part=None):
+    paths = _backing_files(name)
+    key = (PORTFOLIO_BACKEND, tuple(os.path.abspath(p) for p in paths), name, part)
+    # identity is taken before reading: a write racing the read leaves a
+    # stale identity, which only forces one extra reload
+    identity = tuple(_file_identity(p) for p in paths)
+    with _cache_lock:
+        hit = _cache.get(key)
+    if hit is not None and hit[0] == identity:
+        return hit[1]
+    value = read()
+    with _cache_lock:
+        _cache[key] = (identity, value)
+    return value
+
+def _forget(name):
+    """Drop a portfolio's entry and the name list after an in-process write."""
+    with _cache_lock:
+        for key in [k for k in _cache if k[2] in (name, None)]:
+            del _cache[key]
+
+def _writes_portfolio(func):
+    """Forget the cached copy of the portfolio a write function touched."""
+    @functools.wraps(func)
+    def wrapper(name, *args, **kwargs):
+        try:
+            return func(name, *args, **kwargs)
+        finally:
+            _forget(name)
+    return wrapper
+
+def clear_cache():
+    """Drop every cached portfolio and name list."""
+    with _cache_lock:
+        _cache.clear()
+
+def freeze_portfolio(portfolio_data):
+    """Read-only view: a mapping of ticker -> tuple of read-only lots."""
+    return MappingProxyType({t: tuple(MappingProxyType(dict(l)) for l in lots)
+                             for t, lots in portfolio_data.items()})
+
+def thaw_portfolio(portfolio):
+    """Mutable copy of a (frozen) portfolio."""
+    return {t: [dict(l) for l in lots] for t, lots in portfolio.items()}
+
+def _read_portfolio_names():
+    if _use_sqlite():
+        return tuple(sqlite_store.get_all_portfolio_names(PORTFOLIO_DB))
+    if _use_journal():
+        return tuple(journal_store.get_all_portfolio_names(PORTFOLIO_JOURNAL_DIR))
+    names = []
+    for f in os.listdir(PORTFOLIO_DIR):
+        if f.endswith(".json"):
+            names.append(f[:-len(".json")])
+        elif f.endswith(binary_store.SUFFIX):
+            names.append(f[:-len(binary_store.SUFFIX)])
+    return tuple(dict.fromkeys(names))
+
+def _read_portfolio(name):
+    if _use_sqlite():
+        return sqlite_store.load_portfolio(PORTFOLIO_DB, name)
+    if _use_journal():
+        return journal_store.load_portfolio(PORTFOLIO_JOURNAL_DIR, name)
+    path = _json_path(name)
     if os.path.exists(path):
         with open(path, "r") as f:
             return json.load(f)
+    elif os.path.exists(_binary_path(name)):
+        return binary_store.read_portfolio(_binary_path(name))
     else:
         return {}
 
+def get_all_portfolio_names():
+    """Return a list of available portfolios."""
+    if not _use_sqlite() and not _use_journal() and not os.path.exists(PORTFOLIO_DIR):
+        os.makedirs(PORTFOLIO_DIR)
+    return list(_cached(None, _read_portfolio_names))
+
+def get_portfolio(name):
+    """Shared, read-only portfolio (see freeze_portfolio); reloaded only when its files change."""
+    return _cached(name, lambda: freeze_portfolio(_read_portfolio(name)))
+
+def load_portfolio(name):
+    """Load a portfolio by name (a mutable copy)."""
+    return thaw_portfolio(get_portfolio(name))
+
+def portfolio_tickers(name):
+    """Tickers of a portfolio; binary files answer from their index alone."""
+    if _stored_as_binary(name):
+        read = lambda: tuple(binary_store.read_tickers(_binary_path(name)))
+        return list(_cached(name, read, part="tickers"))
+    return list(get_portfolio(name))
+
+def load_ticker_lots(name, ticker):
+    """
+    Lots of one ticker (a mutable copy). Binary files seek straight to
+    the ticker's block instead of decoding the whole portfolio.
+    """
+    if _stored_as_binary(name):
+        read = lambda: freeze_portfolio({ticker: binary_store.read_ticker(_binary_path(name), ticker)})[ticker]
+        lots = _cached(name, read, part=("lots", ticker))
+    else:
+        lots = get_portfolio(name).get(ticker, ())
+    return [dict(l) for l in lots]
+
+@_writes_portfolio
 def save_portfolio(name, portfolio_data):
     """Save portfolio data to disk."""
+    # drop cached NAV from the earliest lot that was added or removed
+    changed = earliest_changed_date(load_portfolio(name), portfolio_data)
+    if changed is not None:
+        invalidate_nav(name, changed)
+    if _use_sqlite():
+        sqlite_store.save_portfolio(PORTFOLIO_DB, name, portfolio_data)
+        return
+    if _use_journal():
+        journal_store.save_portfolio(PORTFOLIO_JOURNAL_DIR, name, portfolio_data)
+        return
     if not os.path.exists(PORTFOLIO_DIR):
         os.makedirs(PORTFOLIO_DIR)
-    with open(os.path.join(PORTFOLIO_DIR, f"{name}.json"), "w") as f:
-        json.dump(portfolio_data, f, indent=2)
+    # write the configured format and drop the other, so reads are unambiguous
+    if PORTFOLIO_FORMAT == "binary":
+        binary_store.write_portfolio(_binary_path(name), portfolio_data)
+        stale = _json_path(name)
+    else:
+        with open(_json_path(name), "w") as f:
+            json.dump(portfolio_data, f, indent=2)
+        stale = _binary_path(name)
+    if os.path.exists(stale):
+        os.remove(stale)
+
+def add_lot(name, ticker, lot):
+    """Append one lot ({"shares", "price", "date"}) to a portfolio."""
+    add_lots(name, {ticker: [lot]})
+
+@_writes_portfolio
+def add_lots(name, lots_by_ticker):
+    """Append a batch of lots ({ticker: [lot, ...]}) to a portfolio in one write."""
+    dates = [str(l["date"]) for lots in lots_by_ticker.values() for l in lots]
+    if not dates:
+        return
+    invalidate_nav(name, min(dates))
+    if _use_sqlite():
+        sqlite_store.add_lots(PORTFOLIO_DB, name, lots_by_ticker)
+        return
+    if _use_journal():
+        journal_store.append_events(PORTFOLIO_JOURNAL_DIR, name, [
+            {"op": "add", "ticker": t, "lot": l} for t, lots in lots_by_ticker.items() for l in lots])
+        return
+    data = load_portfolio(name)
+    for ticker, lots in lots_by_ticker.items():
+        data.setdefault(ticker, []).extend(lots)
+    save_portfolio(name, data)
+
+@_writes_portfolio
+def remove_lot(name, ticker, index):
+    """Remove the index-th lot of a ticker and return it."""
+    if index < 0:
+        raise KeyError(f"No lot {index} of {ticker} in portfolio '{name}'")
+    if _use_sqlite():
+        lot = sqlite_store.remove_lot(PORTFOLIO_DB, name, ticker, index)
+        invalidate_nav(name, str(lot["date"]))
+        return lot
+    data = load_portfolio(name)
+    if index >= len(data.get(ticker, [])):
+        raise KeyError(f"No lot {index} of {ticker} in portfolio '{name}'")
+    if _use_journal():
+        lot = data[ticker][index]
+        journal_store.append_events(PORTFOLIO_JOURNAL_DIR, name, [{"op": "remove", "ticker": ticker, "index": index}])
+        invalidate_nav(name, str(lot["date"]))
+        return lot
+    lot = data[ticker].pop(index)
+    if not data[ticker]:
+        del data[ticker]
+    save_portfolio(name, data)
+    return lot
+
+@_writes_portfolio
+def apply_split(name, ticker, ratio, date):
+    """Restate a ticker's lots bought before date for a ratio-for-1 split."""
+    data = load_portfolio(name)
+    if ticker not in data:
+        raise KeyError(f"No {ticker} lots in portfolio '{name}'")
+    if _use_journal():
+        adjusted = {**data, ticker: journal_store.split_adjust(data[ticker], ratio, date)}
+        changed = earliest_changed_date(data, adjusted)
+        if changed is not None:
+            invalidate_nav(name, changed)
+        journal_store.append_events(PORTFOLIO_JOURNAL_DIR, name,
+                                    [{"op": "split", "ticker": ticker, "ratio": ratio, "date": str(date)}])
+        return
+    data[ticker] = journal_store.split_adjust(data[ticker], ratio, date)
+    save_portfolio(name, data)
+
+def load_portfolio_at(name, as_of):
+    """Load a portfolio as it stood at a past moment (journal backend only)."""
+    if not _use_journal():
+        raise ValueError("Point-in-time loads need the journal backend")
+    return journal_store.load_portfolio_at(PORTFOLIO_JOURNAL_DIR, name, as_of)
+
+def migrate_json_to_sqlite(json_dir=None, db_path=None):
+    """Copy the JSON portfolio directory into the SQLite database."""
+    return sqlite_store.import_json_dir(db_path or PORTFOLIO_DB, json_dir or PORTFOLIO_DIR)
+
+def migrate_json_to_journal(json_dir=None, journal_dir=None):
+    """Journal every portfolio in the JSON directory."""
+    return journal_store.import_json_dir(journal_dir or PORTFOLIO_JOURNAL_DIR, json_dir or PORTFOLIO_DIR)
+
+def migrate_json_to_binary():
+    """Rewrite every JSON portfolio file in the binary format."""
+    converted = {}
+    for name in get_all_portfolio_names():
+        if os.path.exists(_json_path(name)):
+            data = _read_portfolio(name)
+            binary_store.write_portfolio(_binary_path(name), data)
+            os.remove(_json_path(name))
+            _forget(name)
+            converted[name] = sum(len(lots) for lots in data.values())
+    return converted
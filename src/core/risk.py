@@ -4,29 +4,172 @@ Provides risk analysis utilities including:
 1. Value-at-Risk (VaR)
 2. Stress Testing
 3. Scenario Analysis
+4. Batched VaR / Expected Shortfall tables
+5. Rolling quantiles / rolling VaR
+6. Full-revaluation scenario engine (per-asset / per-sector shocks)
+7. Marginal / component risk contributions
 """
 
+from bisect import bisect_left, insort
+
 import numpy as np
 import pandas as pd
-from typing import Dict
+from scipy import stats
+from typing import Dict, Sequence
+
+from .simulation import DEFAULT_DISTRIBUTION, parametric_var, monte_carlo_var
 
 
-def calculate_var(returns: pd.Series, confidence_level: float = 0.95) -> float:
+def calculate_var(returns: pd.Series, confidence_level: float = 0.95,
+                  method: str = "historical", distribution: str = DEFAULT_DISTRIBUTION,
+                  **kwargs) -> float:
     """
-    Calculate Value-at-Risk (VaR) using the historical method.
+    Calculate Value-at-Risk (VaR).
 
     Args:
-        returns (pd.Series): Historical returns of the portfolio.
+        returns (pd.Series): Historical returns of the portfolio. For the
+            "parametric" and "monte_carlo" methods this may also be a
+            DataFrame of asset returns, with ``weights=`` passed in kwargs.
         confidence_level (float): Confidence level for VaR.
+        method (str): "historical" (default), "parametric" or "monte_carlo".
+        distribution (str): "normal" or "t" shocks for the parametric and
+            Monte Carlo methods (ignored by "historical").
+        **kwargs: Passed to ``core.simulation.parametric_var`` or
+            ``core.simulation.monte_carlo_var``.
 
     Returns:
         float: Value-at-Risk at the given confidence level.
     """
     if returns.empty:
         return 0.0
+    if method == "parametric":
+        return parametric_var(returns, confidence_level, distribution=distribution, **kwargs)
+    if method == "monte_carlo":
+        return monte_carlo_var(returns, confidence_level, distribution=distribution, **kwargs)
+    if method != "historical":
+        raise ValueError(f"Unknown VaR method: {method}")
     return np.percentile(returns, (1 - confidence_level) * 100)
 
 
+def var_es_table(returns, confidence_levels: Sequence[float] = (0.95, 0.99),
+                 horizons: Sequence[int] = (1,)) -> pd.DataFrame:
+    """
+    Historical VaR and Expected Shortfall for many portfolios, confidence
+    levels and horizons in one pass.
+
+    Only the lower tail is needed, so each row is partitioned once at the
+    deepest order statistic required (O(T) per row) and just that tail
+    slice is sorted. VaR interpolates linearly between order statistics,
+    matching ``calculate_var``; ES is the mean of returns at or below VaR.
+    Multi-day horizons use square-root-of-time scaling.
+
+    Args:
+        returns: 2-D array or DataFrame shaped (portfolios x time).
+        confidence_levels: Confidence levels (e.g. 0.95, 0.99).
+        horizons: Horizons in periods (e.g. 1, 5, 10).
+
+    Returns:
+        pd.DataFrame: One row per portfolio; columns are a MultiIndex of
+                      (measure, confidence_level, horizon) with measure in
+                      {"VaR", "ES"}. Values are returns (losses negative).
+    """
+    index = returns.index if isinstance(returns, pd.DataFrame) else None
+    X = np.atleast_2d(np.asarray(returns, dtype=float))
+    n_port, T = X.shape
+    levels = np.asarray(confidence_levels, dtype=float)
+    horizons = np.asarray(horizons, dtype=float)
+
+    # fractional rank of each quantile, as in np.percentile(..., "linear")
+    rank = (T - 1) * (1.0 - levels)
+    lo = np.floor(rank).astype(int)
+    hi = np.minimum(lo + 1, T - 1)
+    frac = rank - lo
+
+    kmax = int(hi.max())
+    tail = np.partition(X, kmax, axis=1)[:, :kmax + 1] if kmax < T - 1 else X.copy()
+    tail.sort(axis=1)
+
+    var = tail[:, lo] + frac * (tail[:, hi] - tail[:, lo])          # (P, C)
+    mask = tail[:, None, :] <= var[:, :, None]                       # (P, C, k)
+    es = (tail[:, None, :] * mask).sum(axis=2) / mask.sum(axis=2)   # (P, C)
+
+    scale = np.sqrt(horizons)                                        # (H,)
+    var_h = var[:, :, None] * scale
+    es_h = es[:, :, None] * scale
+
+    columns = pd.MultiIndex.from_product(
+        [["VaR", "ES"], levels.tolist(), horizons.astype(int).tolist()],
+        names=["measure", "confidence_level", "horizon"],
+    )
+    data = np.concatenate([var_h.reshape(n_port, -1), es_h.reshape(n_port, -1)], axis=1)
+    return pd.DataFrame(data, index=index, columns=columns)
+
+
+def rolling_quantiles(returns: pd.Series, window: int = 250,
+                      quantiles: Sequence[float] = (0.05,)) -> pd.DataFrame:
+    """
+    Rolling quantiles of a return series, several quantiles at once.
+
+    The current window is kept as a sorted list: each step finds the
+    newest observation's slot and the leaving one's by binary search
+    (O(log w)), but inserting and deleting shift the list, so an update
+    costs O(w) element moves and the whole series O(n * w). The shifts
+    are a single memmove each, which for windows up to a few thousand
+    beats both re-sorting every window (O(n * w log w)) and a Python
+    balanced tree. Every requested quantile is then read by index.
+
+    Args:
+        returns (pd.Series): Return series (NaNs are dropped).
+        window (int): Window length in observations.
+        quantiles (Sequence[float]): Quantiles in [0, 1].
+
+    Returns:
+        pd.DataFrame: One column per quantile, aligned to ``returns``;
+                      rows before the first full window are NaN.
+    """
+    clean = returns.dropna()
+    values = clean.to_numpy(dtype=float)
+    qs = np.asarray(quantiles, dtype=float)
+    out = np.full((len(values), len(qs)), np.nan)
+
+    # fractional ranks inside a full window, as in np.percentile(..., "linear")
+    rank = (window - 1) * qs
+    lo = np.floor(rank).astype(int)
+    hi = np.minimum(lo + 1, window - 1)
+    frac = rank - lo
+
+    sorted_window = []
+    for i, x in enumerate(values):
+        insort(sorted_window, x)
+        if i >= window:
+            del sorted_window[bisect_left(sorted_window, values[i - window])]
+        if i >= window - 1:
+            for j in range(len(qs)):
+                a, b = sorted_window[lo[j]], sorted_window[hi[j]]
+                out[i, j] = a + frac[j] * (b - a)
+
+    result = pd.DataFrame(out, index=clean.index, columns=list(quantiles))
+    return result.reindex(returns.index)
+
+
+def rolling_var(returns: pd.Series, window: int = 250,
+                confidence_levels: Sequence[float] = (0.95,)) -> pd.DataFrame:
+    """
+    Rolling historical VaR, one column per confidence level.
+
+    Args:
+        returns (pd.Series): Historical returns of the portfolio.
+        window (int): Look-back window in observations.
+        confidence_levels (Sequence[float]): Confidence levels for VaR.
+
+    Returns:
+        pd.DataFrame: Columns named like "VaR 95%", aligned to ``returns``.
+    """
+    q = rolling_quantiles(returns, window, [1 - c for c in confidence_levels])
+    q.columns = [f"VaR {c:.0%}" for c in confidence_levels]
+    return q
+
+
 def stress_test_portfolio(returns: pd.Series, shock_pct: float = -0.1) -> float:
     """
     Apply a hypothetical stress scenario to simulate loss.
@@ -60,3 +203,169 @@ def scenario_analysis(returns: pd.Series, scenarios: Dict[str, float]) -> Dict[s
         results[name] = avg_return + shock
     return results
 
+
+def unmatched_shock_keys(scenarios: Dict[str, Dict[str, float]], tickers: Sequence[str],
+                         sectors: Dict[str, str] = None) -> Dict[str, list]:
+    """
+    Scenario keys that name neither a holding nor a held sector.
+
+    Returns:
+        Dict[str, list]: Scenario name -> unmatched keys (scenarios with
+                         none are left out).
+    """
+    known = set(tickers) | {(sectors or {}).get(t) for t in tickers} | {"*"}
+    unmatched = {name: [k for k in spec if k not in known] for name, spec in scenarios.items()}
+    return {name: keys for name, keys in unmatched.items() if keys}
+
+
+def build_shock_matrix(scenarios: Dict[str, Dict[str, float]], tickers: Sequence[str],
+                       sectors: Dict[str, str] = None, strict: bool = True) -> pd.DataFrame:
+    """
+    Expand named scenarios into a (scenarios x tickers) matrix of return shocks.
+
+    Each scenario maps keys to shocks; a key may be a ticker, a sector name
+    (resolved through ``sectors``) or "*" for every holding. A ticker key
+    overrides its sector, which overrides "*". Unmentioned holdings get 0.
+
+    Args:
+        scenarios (Dict[str, Dict[str, float]]): e.g.
+            {"Tech Crash": {"Technology": -0.3, "*": -0.05}}
+        tickers (Sequence[str]): Column order of the result.
+        sectors (Dict[str, str], optional): Ticker -> sector name.
+        strict (bool): Raise on keys matching no holding or sector (a
+            typo would otherwise shock nothing); pass False for preset
+            scenarios that may name sectors the portfolio doesn't hold,
+            and check ``unmatched_shock_keys`` instead.
+
+    Returns:
+        pd.DataFrame: Shock matrix indexed by scenario name.
+
+    Raises:
+        ValueError: With ``strict``, if a key matches no ticker or sector.
+    """
+    tickers = list(tickers)
+    sectors = sectors or {}
+    if strict:
+        unmatched = unmatched_shock_keys(scenarios, tickers, sectors)
+        if unmatched:
+            detail = "; ".join(f"{name}: {', '.join(map(str, keys))}" for name, keys in unmatched.items())
+            raise ValueError(f"Scenario keys match no holding or sector ({detail})")
+    sector_of = np.array([sectors.get(t, "") for t in tickers], dtype=object)
+    shocks = np.zeros((len(scenarios), len(tickers)))
+
+    for i, spec in enumerate(scenarios.values()):
+        row = np.full(len(tickers), spec.get("*", 0.0))
+        for key, shock in spec.items():
+            if key != "*" and key not in tickers:
+                row[sector_of == key] = shock
+        for j, t in enumerate(tickers):
+            if t in spec:
+                row[j] = spec[t]
+        shocks[i] = row
+
+    return pd.DataFrame(shocks, index=list(scenarios.keys()), columns=tickers)
+
+
+def revalue_scenarios(position_values: pd.Series, shocks: pd.DataFrame) -> Dict[str, object]:
+    """
+    Fully revalue current positions under every scenario at once.
+
+    With V the position values (n,) and X the shock matrix (m x n), the
+    per-position P&L is X * V (broadcast) and the portfolio P&L is the
+    single matrix-vector product X @ V.
+
+    Args:
+        position_values (pd.Series): Current market value per ticker.
+        shocks (pd.DataFrame): (scenarios x tickers) return shocks, e.g.
+            from ``build_shock_matrix``.
+
+    Returns:
+        Dict[str, object]:
+            "pnl": pd.Series of portfolio P&L per scenario,
+            "return": pd.Series of portfolio return per scenario,
+            "by_position": pd.DataFrame of P&L per scenario and position.
+    """
+    values = position_values.reindex(shocks.columns).fillna(0.0).to_numpy(dtype=float)
+    X = shocks.to_numpy(dtype=float)
+    total = X @ values
+    total_value = values.sum()
+
+    return {
+        "pnl": pd.Series(total, index=shocks.index),
+        "return": pd.Series(total / total_value if total_value else np.zeros_like(total), index=shocks.index),
+        "by_position": pd.DataFrame(X * values, index=shocks.index, columns=shocks.columns),
+    }
+
+
+def risk_contributions(weights: pd.Series, cov: pd.DataFrame, confidence_level: float = 0.95,
+                       portfolio_value: float = 1.0) -> pd.DataFrame:
+    """
+    Parametric (normal) marginal and component VaR for every position.
+
+    Everything follows from the single product S w:
+        sigma_p      = sqrt(w^T S w)
+        marginal_i   = z * (S w)_i / sigma_p
+        component_i  = w_i * marginal_i        (sums to the portfolio VaR)
+
+    Args:
+        weights (pd.Series): Portfolio weights per ticker.
+        cov (pd.DataFrame): Covariance of per-period asset returns.
+        confidence_level (float): Confidence level for VaR.
+        portfolio_value (float): Scales results to currency amounts.
+
+    Returns:
+        pd.DataFrame: Indexed by ticker with "Marginal VaR", "Component VaR"
+                      and "Risk Contribution %" (VaR reported as a positive loss).
+    """
+    tickers = list(weights.index)
+    w = weights.to_numpy(dtype=float)
+    S = cov.loc[tickers, tickers].to_numpy(dtype=float)
+
+    sigma_w = S @ w
+    vol = np.sqrt(w @ sigma_w)
+    z = -stats.norm.ppf(1 - confidence_level)
+    marginal = z * sigma_w / vol if vol > 0 else np.zeros_like(w)
+    component = w * marginal
+    total = component.sum()
+
+    return pd.DataFrame({
+        "Marginal VaR": marginal * portfolio_value,
+        "Component VaR": component * portfolio_value,
+        "Risk Contribution %": component / total * 100 if total else np.zeros_like(w),
+    }, index=tickers)
+
+
+def historical_risk_contributions(asset_returns: pd.DataFrame, weights: pd.Series,
+                                  confidence_level: float = 0.95,
+                                  portfolio_value: float = 1.0) -> pd.DataFrame:
+    """
+    Historical-simulation component Expected Shortfall per position.
+
+    The portfolio tail is the set of periods at or below historical VaR;
+    each position's component is minus its weighted average return over
+    those periods (Euler allocation of ES), so components sum to ES.
+
+    Args:
+        asset_returns (pd.DataFrame): Per-period asset returns.
+        weights (pd.Series): Portfolio weights per ticker.
+        confidence_level (float): Confidence level.
+        portfolio_value (float): Scales results to currency amounts.
+
+    Returns:
+        pd.DataFrame: Indexed by ticker with "Component ES" and
+                      "ES Contribution %" (ES reported as a positive loss).
+    """
+    tickers = list(weights.index)
+    R = asset_returns[tickers].to_numpy(dtype=float)
+    w = weights.to_numpy(dtype=float)
+
+    port = R @ w
+    tail = port <= np.percentile(port, (1 - confidence_level) * 100)
+    component = -w * R[tail].mean(axis=0)
+    total = component.sum()
+
+    return pd.DataFrame({
+        "Component ES": component * portfolio_value,
+        "ES Contribution %": component / total * 100 if total else np.zeros_like(w),
+    }, index=tickers)
+
@@ -0,0 +1,185 @@
+"""
+Module: sqlite_store
+SQLite storage backend for portfolios.
+
+Features:
+- One database file for all portfolios, in WAL mode so readers never
+  block the writer
+- Lots indexed by (portfolio, ticker, date)
+- Whole-portfolio saves in a single transaction, plus granular
+  add-lot / remove-lot updates
+- One-shot migration from the JSON portfolio directory
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS portfolios (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS lots (
+    id           INTEGER PRIMARY KEY,
+    portfolio_id INTEGER NOT NULL REFERENCES portfolios(id) ON DELETE CASCADE,
+    ticker       TEXT NOT NULL,
+    date         TEXT NOT NULL,
+    shares       REAL NOT NULL,
+    price        REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lots_portfolio_ticker_date ON lots(portfolio_id, ticker, date);
+"""
+
+_local = threading.local()
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """
+    Connection to ``db_path`` for the calling thread (created on first use).
+
+    Streamlit serves sessions from several threads, so each thread keeps
+    its own connection; WAL lets them read while another writes.
+    """
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(SCHEMA)
+        conns[db_path] = conn
+    return conn
+
+
+def close(db_path: str):
+    """Close the calling thread's connection to ``db_path``, if open."""
+    conn = getattr(_local, "conns", {}).pop(db_path, None)
+    if conn is not None:
+        conn.close()
+
+
+class _transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK, taking the write lock up front."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def _portfolio_id(conn, name: str, create: bool = False):
+    row = conn.execute("SELECT id FROM portfolios WHERE name = ?", (name,)).fetchone()
+    if row is None and create:
+        return conn.execute("INSERT INTO portfolios (name) VALUES (?)", (name,)).lastrowid
+    return row[0] if row else None
+
+
+def get_all_portfolio_names(db_path: str) -> List[str]:
+    """Portfolio names in creation order."""
+    return [r[0] for r in connect(db_path).execute("SELECT name FROM portfolios ORDER BY id")]
+
+
+def load_portfolio(db_path: str, name: str) -> dict:
+    """Lots keyed by ticker, in insertion order ({} if the portfolio is missing)."""
+    conn = connect(db_path)
+    pid = _portfolio_id(conn, name)
+    data = {}
+    if pid is None:
+        return data
+    rows = conn.execute(
+        "SELECT ticker, shares, price, date FROM lots WHERE portfolio_id = ? ORDER BY id", (pid,))
+    for ticker, shares, price, date in rows:
+        data.setdefault(ticker, []).append({"shares": shares, "price": price, "date": date})
+    return data
+
+
+def _lot_rows(pid: int, portfolio_data: dict):
+    for ticker, lots in portfolio_data.items():
+        for l in lots:
+            yield pid, ticker, str(l["date"]), float(l["shares"]), float(l["price"])
+
+
+def save_portfolio(db_path: str, name: str, portfolio_data: dict):
+    """Replace all lots of a portfolio in one transaction."""
+    conn = connect(db_path)
+    with _transaction(conn):
+        pid = _portfolio_id(conn, name, create=True)
+        conn.execute("DELETE FROM lots WHERE portfolio_id = ?", (pid,))
+        conn.executemany(
+            "INSERT INTO lots (portfolio_id, ticker, date, shares, price) VALUES (?, ?, ?, ?, ?)",
+            _lot_rows(pid, portfolio_data))
+
+
+def add_lots(db_path: str, name: str, lots_by_ticker: Dict[str, List[dict]]):
+    """Append lots ({ticker: [lot, ...]}) to a portfolio in one transaction (creating it if needed)."""
+    conn = connect(db_path)
+    with _transaction(conn):
+        pid = _portfolio_id(conn, name, create=True)
+        conn.executemany(
+            "INSERT INTO lots (portfolio_id, ticker, date, shares, price) VALUES (?, ?, ?, ?, ?)",
+            _lot_rows(pid, lots_by_ticker))
+
+
+def remove_lot(db_path: str, name: str, ticker: str, index: int) -> dict:
+    """
+    Delete the ``index``-th lot of a ticker (as ordered by ``load_portfolio``).
+
+    Returns:
+        dict: The removed lot.
+
+    Raises:
+        KeyError: If the portfolio has no such lot.
+    """
+    conn = connect(db_path)
+    with _transaction(conn):
+        pid = _portfolio_id(conn, name)
+        row = None
+        if pid is not None and index >= 0:
+            row = conn.execute(
+                "SELECT id, shares, price, date FROM lots WHERE portfolio_id = ? AND ticker = ? "
+                "ORDER BY id LIMIT 1 OFFSET ?", (pid, ticker, int(index))).fetchone()
+        if row is None:
+            raise KeyError(f"No lot {index} of {ticker} in portfolio '{name}'")
+        conn.execute("DELETE FROM lots WHERE id = ?", (row[0],))
+    return {"shares": row[1], "price": row[2], "date": row[3]}
+
+
+def import_json_dir(db_path: str, json_dir: str) -> Dict[str, int]:
+    """
+    Copy every ``<name>.json`` portfolio in ``json_dir`` into the database.
+
+    Portfolios already in the database are replaced. The whole import is
+    one transaction.
+
+    Returns:
+        dict: Lots imported per portfolio.
+    """
+    conn = connect(db_path)
+    imported = {}
+    with _transaction(conn):
+        for fname in sorted(os.listdir(json_dir)):
+            if not fname.endswith(".json"):
+                continue
+            name = fname[:-len(".json")]
+            with open(os.path.join(json_dir, fname), "r") as f:
+                data = json.load(f)
+            pid = _portfolio_id(conn, name, create=True)
+            conn.execute("DELETE FROM lots WHERE portfolio_id = ?", (pid,))
+            conn.executemany(
+                "INSERT INTO lots (portfolio_id, ticker, date, shares, price) VALUES (?, ?, ?, ?, ?)",
+                _lot_rows(pid, data))
+            imported[name] = sum(len(lots) for lots in data.values())
+    return imported
@@ -0,0 +1,219 @@
+"""
+Module: stress
+Historical crisis replay against current holdings.
+
+Features:
+- Named catalog of crisis windows
+- Per-ticker growth paths precomputed once and cached on disk
+- Proxy substitution for tickers that did not trade during a window
+- Replay of any portfolio as one vectorized multiply
+"""
+
+import os
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from .data_loader import fetch_historical_data
+from .portfolio_io import load_portfolio
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "data/cache/crises"
+
+# name -> (start, end) of the drawdown window, "YYYY-MM-DD"
+CRISIS_CATALOG = {
+    "2008 Global Financial Crisis": ("2008-09-01", "2009-03-10"),
+    "2016 India Demonetization": ("2016-11-08", "2016-12-30"),
+    "March 2020 COVID Crash": ("2020-02-19", "2020-03-24"),
+    "2022 Rate Shock": ("2022-01-03", "2022-10-13"),
+}
+
+# ticker suffix -> index used when the ticker has no history in the window
+DEFAULT_PROXIES = {
+    ".NS": "^NSEI",
+    ".BO": "^BSESN",
+}
+DEFAULT_PROXY = "^GSPC"
+
+# a ticker whose first quote comes later than this after the window start
+# did not trade at the start; within it, the gap is an exchange holiday
+START_TOLERANCE = timedelta(days=7)
+
+
+def _cache_path(crisis: str) -> str:
+    slug = "".join(c if c.isalnum() else "_" for c in crisis).strip("_").lower()
+    return os.path.join(CACHE_DIR, f"{slug}.csv")
+
+
+def _proxy_for(ticker: str, proxies: Dict[str, str] = None) -> str:
+    """Proxy ticker: explicit mapping first, then exchange suffix, then the S&P 500."""
+    if proxies and ticker in proxies:
+        return proxies[ticker]
+    for suffix, proxy in DEFAULT_PROXIES.items():
+        if ticker.endswith(suffix):
+            return proxy
+    return DEFAULT_PROXY
+
+
+def _read_cache(crisis: str) -> pd.DataFrame:
+    path = _cache_path(crisis)
+    if os.path.exists(path):
+        return pd.read_csv(path, index_col=0, parse_dates=True)
+    return pd.DataFrame()
+
+
+def precompute_crisis_paths(crisis: str, tickers: List[str]) -> pd.DataFrame:
+    """
+    Make sure growth paths for ``tickers`` are cached for ``crisis``.
+
+    Only tickers missing from the cache are downloaded, in one batched
+    request. Each ticker's path is its prices normalised to 1.0 on its
+    own first quote, so exchanges closed on the window's first day (a
+    batch mixes calendars) still get a path. A ticker whose first quote
+    is more than ``START_TOLERANCE`` after the window start did not
+    trade at the start; it is stored as an all-NaN column so it is not
+    downloaded again. Tickers the download
+    returned no prices for at all (a failed request or an unknown
+    symbol) are not cached, so the next call retries them.
+
+    Returns:
+        pd.DataFrame: The full cached path table for the crisis.
+    """
+    if crisis not in CRISIS_CATALOG:
+        raise ValueError(f"Unknown crisis: {crisis}")
+    start, end = CRISIS_CATALOG[crisis]
+
+    cached = _read_cache(crisis)
+    missing = sorted(set(tickers) - set(cached.columns))
+    if not missing:
+        return cached
+
+    # yfinance end date is exclusive
+    end_excl = (datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    prices = fetch_historical_data(tuple(missing), start, end_excl)
+    prices = prices.reindex(columns=missing)
+    fetched = [t for t in missing if prices[t].notna().any()]
+    if len(fetched) < len(missing):
+        logger.warning("No prices for %s during %s; not cached",
+                       ", ".join(t for t in missing if t not in fetched), crisis)
+    if not fetched:
+        return cached
+
+    prices = prices[fetched].dropna(how="all")
+    latest_start = pd.Timestamp(start) + START_TOLERANCE
+    paths = pd.DataFrame(np.nan, index=prices.index, columns=fetched)
+    for t in fetched:
+        first = prices[t].first_valid_index()
+        if first <= latest_start:
+            paths[t] = prices[t] / prices.at[first, t]
+
+    table = pd.concat([cached, paths], axis=1) if not cached.empty else paths
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    table.to_csv(_cache_path(crisis))
+    return table
+
+
+def precompute_crisis_library(tickers: List[str], crises: List[str] = None) -> None:
+    """Warm the on-disk cache for every crisis in the catalog (or a subset)."""
+    for crisis in crises or CRISIS_CATALOG:
+        tickers_and_proxies = set(tickers) | {_proxy_for(t) for t in tickers}
+        precompute_crisis_paths(crisis, sorted(tickers_and_proxies))
+
+
+def crisis_paths(crisis: str, tickers: List[str], proxies: Dict[str, str] = None):
+    """
+    Growth paths for ``tickers`` during ``crisis``, with proxies substituted.
+
+    Returns:
+        (pd.DataFrame, Dict[str, str]): paths (sessions x tickers, 1.0 at
+        the start) and the substitutions that were made.
+
+    Raises:
+        ValueError: If neither a ticker nor its proxy has a path.
+    """
+    proxy_of = {t: _proxy_for(t, proxies) for t in tickers}
+    table = precompute_crisis_paths(crisis, sorted(set(tickers) | set(proxy_of.values())))
+
+    def has_path(t):
+        return t in table and table[t].notna().any()
+
+    substitutions = {}
+    columns = {}
+    for t in tickers:
+        if has_path(t):
+            columns[t] = table[t]
+        elif has_path(proxy_of[t]):
+            columns[t] = table[proxy_of[t]]
+            substitutions[t] = proxy_of[t]
+    unavailable = [t for t in tickers if t not in columns]
+    if unavailable:
+        raise ValueError(f"No {crisis} price path for {', '.join(unavailable)} or "
+                         f"{'its proxy' if len(unavailable) == 1 else 'their proxies'}")
+    paths = pd.DataFrame(columns, index=table.index).ffill().fillna(1.0)
+    return paths, substitutions
+
+
+def replay_crisis(position_values: pd.Series, crisis: str,
+                  proxies: Dict[str, str] = None) -> Dict[str, object]:
+    """
+    Replay a historical crisis on current positions.
+
+    Args:
+        position_values (pd.Series): Current market value per ticker.
+        crisis (str): Key of ``CRISIS_CATALOG``.
+        proxies (Dict[str, str], optional): Ticker -> proxy overrides.
+
+    Returns:
+        Dict[str, object]:
+            "value": pd.Series of portfolio value per session,
+            "pnl": pd.Series of cumulative P&L per session,
+            "by_position": pd.Series of end-of-window P&L per ticker,
+            "max_loss": float, worst cumulative P&L in the window,
+            "substitutions": Dict[str, str] of ticker -> proxy used.
+    """
+    tickers = list(position_values.index)
+    paths, substitutions = crisis_paths(crisis, tickers, proxies)
+    values = position_values.to_numpy(dtype=float)
+
+    growth = paths[tickers].to_numpy()
+    value = growth @ values
+    pnl = value - values.sum()
+
+    return {
+        "value": pd.Series(value, index=paths.index),
+        "pnl": pd.Series(pnl, index=paths.index),
+        "by_position": pd.Series((growth[-1] - 1.0) * values, index=tickers),
+        "max_loss": float(pnl.min()) if len(pnl) else 0.0,
+        "substitutions": substitutions,
+    }
+
+
+def replay_portfolio(name: str, crisis: str, latest_prices: pd.Series = None,
+                     proxies: Dict[str, str] = None) -> Dict[str, object]:
+    """
+    Replay a crisis on a saved portfolio's current holdings.
+
+    Args:
+        name (str): Portfolio name (see ``core.portfolio_io``).
+        crisis (str): Key of ``CRISIS_CATALOG``.
+        latest_prices (pd.Series, optional): Price per ticker; fetched if omitted.
+        proxies (Dict[str, str], optional): Ticker -> proxy overrides.
+
+    Returns:
+        Dict[str, object]: See ``replay_crisis``.
+    """
+    portfolio = load_portfolio(name)
+    shares = pd.Series({t: sum(l["shares"] for l in lots) for t, lots in portfolio.items()})
+    shares = shares[shares > 0]
+    if shares.empty:
+        raise ValueError(f"Portfolio '{name}' has no holdings")
+
+    if latest_prices is None:
+        end = datetime.today().strftime("%Y-%m-%d")
+        start = (datetime.today() - timedelta(days=10)).strftime("%Y-%m-%d")
+        latest_prices = fetch_historical_data(tuple(shares.index), start, end).ffill().iloc[-1]
+
+    return replay_crisis(shares * latest_prices.reindex(shares.index), crisis, proxies)
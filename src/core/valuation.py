@@ -0,0 +1,119 @@
+"""
+Module: valuation
+Position valuation engine shared by the analyzer and the pages.
+
+Holdings are reduced to aligned arrays (tickers, shares, cost basis) and
+valued against one price snapshot with whole-array operations.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+
+from .data_loader import fetch_price_snapshot
+
+
+def holdings_arrays(portfolio_data: dict) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Collapse stored lots into per-ticker share and cost-basis arrays.
+
+    Args:
+        portfolio_data: {ticker: [{"shares", "price", "date"}, ...]} as
+                        returned by ``core.portfolio_io.load_portfolio``.
+
+    Returns:
+        (tickers, shares, cost_basis)
+    """
+    tickers = [t for t, lots in portfolio_data.items() if lots]
+    counts = np.array([len(portfolio_data[t]) for t in tickers], dtype=int)
+    lot_shares = np.array([l["shares"] for t in tickers for l in portfolio_data[t]], dtype=float)
+    lot_price = np.array([l["price"] for t in tickers for l in portfolio_data[t]], dtype=float)
+    owner = np.repeat(np.arange(len(tickers)), counts)
+
+    shares = np.bincount(owner, weights=lot_shares, minlength=len(tickers))
+    cost = np.bincount(owner, weights=lot_shares * lot_price, minlength=len(tickers))
+    return tickers, shares, cost
+
+
+def value_positions(tickers: List[str], shares, cost_basis, latest, previous) -> dict:
+    """
+    Value every position at once.
+
+    Args:
+        tickers: Position tickers.
+        shares: Shares held per position.
+        cost_basis: Total cost per position.
+        latest: Latest price per position.
+        previous: Previous close per position.
+
+    Returns:
+        dict:
+            summary: {total_value, total_cost, total_gain, total_gain_pct,
+                      day_gain, day_gain_pct}
+            positions: DataFrame with "Ticker", "Shares", "Current Price",
+                       "Current Value", "Cost Basis", "Day Gain",
+                       "Day Gain %", "Total Gain", "Total Gain %".
+            Positions without a latest price are left out.
+    """
+    shares = np.asarray(shares, dtype=float)
+    cost = np.asarray(cost_basis, dtype=float)
+    latest = np.asarray(latest, dtype=float)
+    previous = np.asarray(previous, dtype=float)
+    # no previous close -> no day change
+    previous = np.where(np.isnan(previous), latest, previous)
+
+    priced = ~np.isnan(latest)
+    tickers = np.asarray(tickers, dtype=object)[priced]
+    shares, cost, latest, previous = shares[priced], cost[priced], latest[priced], previous[priced]
+
+    value = shares * latest
+    prev_value = shares * previous
+    day_gain = value - prev_value
+    total_gain = value - cost
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        day_pct = np.where(prev_value != 0, day_gain / prev_value * 100, 0.0)
+        total_pct = np.where(cost != 0, total_gain / cost * 100, 0.0)
+
+    positions = pd.DataFrame({
+        "Ticker": tickers,
+        "Shares": shares,
+        "Current Price": latest,
+        "Current Value": value,
+        "Cost Basis": cost,
+        "Day Gain": day_gain,
+        "Day Gain %": day_pct,
+        "Total Gain": total_gain,
+        "Total Gain %": total_pct,
+    })
+
+    total_value, total_cost = value.sum(), cost.sum()
+    total_day = day_gain.sum()
+    summary = {
+        "total_value": float(total_value),
+        "total_cost": float(total_cost),
+        "total_gain": float(total_value - total_cost),
+        "total_gain_pct": float((total_value - total_cost) / total_cost * 100) if total_cost else 0,
+        "day_gain": float(total_day),
+        "day_gain_pct": float(total_day / (total_value - total_day) * 100) if total_value - total_day else 0,
+    }
+    return {"summary": summary, "positions": positions}
+
+
+def value_portfolio(portfolio_data: dict, snapshot: pd.DataFrame = None) -> dict:
+    """
+    Value stored lots against one price snapshot.
+
+    Args:
+        portfolio_data: Lots keyed by ticker.
+        snapshot: "latest"/"previous" prices indexed by ticker; fetched in
+                  one batched request if omitted.
+
+    Returns:
+        dict: See ``value_positions``.
+    """
+    tickers, shares, cost = holdings_arrays(portfolio_data)
+    if snapshot is None:
+        snapshot = fetch_price_snapshot(tickers)
+    snapshot = snapshot.reindex(tickers)
+    return value_positions(tickers, shares, cost, snapshot["latest"].values, snapshot["previous"].values)
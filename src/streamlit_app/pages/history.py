@@ -1,4 +1,5 @@
 import streamlit as st
+import pandas as pd
 import os
 import sys
 from datetime import datetime, timedelta
@@ -6,8 +7,18 @@ from datetime import datetime, timedelta
 # Make sure core modules import correctly
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from core.portfolio_io import get_all_portfolio_names, load_portfolio
-from core.portfolio_analyzer import compute_historical_portfolio_value
+from core.portfolio_io import get_all_portfolio_names, get_portfolio
+from core.nav import cached_nav_series, cached_drawdown, flow_adjusted_returns
+from core.risk import rolling_var
+from core.drawdown import underwater, top_drawdowns
+
+@st.cache_data(show_spinner=False)
+def _window_analytics(name, start, last_session, last_growth, _daily_returns, _growth):
+    """Rolling VaR, underwater curve and top drawdowns of one range, cached per last point."""
+    var = None
+    if len(_daily_returns) >= 250:
+        var = rolling_var(_daily_returns, window=250, confidence_levels=(0.95, 0.99)).dropna()
+    return var, underwater(_growth), top_drawdowns(_growth, n=5)
 
 #st.set_page_config(page_title="Portfolio History", layout="wide")
 st.title("📈 Portfolio Historical Performance")
@@ -20,15 +31,9 @@ if not portfolios:
 
 selected = st.selectbox("Select Portfolio", portfolios)
 
-# 2) Aggregate total shares per ticker
-data = load_portfolio(selected)
-holdings = []
-for ticker, lots in data.items():
-    total_shares = sum(l["shares"] for l in lots)
-    if total_shares > 0:
-        holdings.append({"ticker": ticker, "shares": total_shares})
-
-if not holdings:
+# 2) Load lots (holdings change over time as lots were bought)
+data = get_portfolio(selected)
+if not any(sum(l["shares"] for l in lots) > 0 for lots in data.values()):
     st.info("This portfolio has no holdings to chart.")
     st.stop()
 
@@ -36,13 +41,13 @@ if not holdings:
 range_map = {"1M":30, "6M":182, "1Y":365, "5Y":365*5, "All":None}
 choice = st.selectbox("Select Time Range", list(range_map.keys()), index=2)
 
-end = datetime.today().strftime("%Y-%m-%d")
 days = range_map[choice]
 start = (datetime.today() - timedelta(days=days)).strftime("%Y-%m-%d") if days else "1900-01-01"
 
 # 4) Compute historical values
 with st.spinner("Fetching historical prices…"):
-    hist_df = compute_historical_portfolio_value(holdings, start, end)
+    full_df = cached_nav_series(selected, data)
+    hist_df = full_df[full_df.index >= start]
 
 if hist_df.empty:
     st.error("Could not load historical data. Check your holdings or dates.")
@@ -51,3 +56,26 @@ if hist_df.empty:
 # 5) Render chart
 st.subheader(f"Portfolio Value Over {choice}")
 st.line_chart(hist_df["Total Value"], use_container_width=True)
+
+# Returns and drawdowns exclude lot purchases: growth of 1 invested
+daily_returns = flow_adjusted_returns(hist_df, data).dropna()
+growth = pd.concat([pd.Series([1.0], index=hist_df.index[:1]), (1 + daily_returns).cumprod()]).rename("Growth")
+var_df, underwater_df, episodes = _window_analytics(selected, start, growth.index[-1],
+                                                     float(growth.iloc[-1]), daily_returns, growth)
+
+# 6) Rolling historical VaR
+st.subheader("📉 Rolling 250-Day Historical VaR")
+if var_df is None:
+    st.info("Select a longer time range to see rolling 250-day VaR.")
+else:
+    st.line_chart(var_df, use_container_width=True)
+
+# 7) Drawdowns (headline figures since inception, from the persisted tracker)
+st.subheader("🌊 Drawdowns")
+tracker = cached_drawdown(selected, full_df, data)
+d1, d2, d3 = st.columns(3)
+d1.metric("Max Drawdown (since inception)", f"{tracker.max_drawdown[0]:.2%}")
+d2.metric("Current Drawdown", f"{tracker.current_drawdown[0]:.2%}")
+d3.metric("Longest Drawdown (since inception)", f"{int(tracker.max_duration[0])} sessions")
+st.area_chart(underwater_df.rename(columns={"Growth": "Underwater"}), use_container_width=True)
+st.dataframe(episodes.style.format({"Drawdown": "{:.2%}"}), use_container_width=True)
@@ -3,11 +3,14 @@
 import streamlit as st
 import os, sys, json
 import pandas as pd
+from datetime import datetime
 
 # Allow imports from src/
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from core.portfolio_io import get_all_portfolio_names, load_portfolio
+from core.portfolio_io import get_all_portfolio_names, portfolio_tickers, load_ticker_lots
+from core.data_loader import fetch_price_snapshot
+from core.lots import LotLedger
 
 #st.set_page_config(page_title="Purchase History", layout="wide")
 st.title("🕑 Purchase History Viewer")
@@ -19,37 +22,32 @@ if not portfolios:
     st.stop()
 selected_portfolio = st.selectbox("Select Portfolio", portfolios)
 
-# 2) Load portfolio data
-data = load_portfolio(selected_portfolio)
-if not data:
+# 2) List tickers (binary portfolios answer from their index)
+tickers = portfolio_tickers(selected_portfolio)
+if not tickers:
     st.info("This portfolio has no holdings.")
     st.stop()
 
 # 3) Select Ticker
-tickers = list(data.keys())
 selected_ticker = st.selectbox("Select Ticker", tickers)
 
-# 4) Sort Order Choice
-order = st.radio("Sort Lots By", ["FIFO (Oldest First)", "LIFO (Newest First)"])
+# 4) Lot Matching Choice
+order = st.radio("Sort Lots By", ["FIFO (Oldest First)", "LIFO (Newest First)", "HIFO (Highest Cost First)"])
+method = order.split()[0].lower()
 
 # 5) Prepare and display DataFrame
-purchases = data[selected_ticker]
-# Sort by 'date' (string in 'YYYY-MM-DD' format)
-reverse = True if order.startswith("LIFO") else False
-sorted_purchases = sorted(purchases, key=lambda x: x["date"], reverse=reverse)
-
-# Build DataFrame
-df = pd.DataFrame(sorted_purchases)
-df.rename(columns={
-    "date": "Purchase Date",
-    "shares": "Shares",
-    "price": "Purchase Price"
-}, inplace=True)
+ledger = LotLedger.from_portfolio({selected_ticker: load_ticker_lots(selected_portfolio, selected_ticker)})
+current_price = fetch_price_snapshot([selected_ticker])["latest"].get(selected_ticker)
+
+lots = ledger.unrealized_gains({selected_ticker: current_price})
+df = lots.loc[ledger.open_lots(selected_ticker, method)].drop(columns="Ticker")
 df["Purchase Date"] = pd.to_datetime(df["Purchase Date"])
 
-# 6) Highlight the first row (oldest or newest) for LIFO/FIFO guidance
+# 6) Highlight the lot a sale would consume first
 def highlight_first(row):
-    color = "#d4edda" if order.startswith("FIFO") else "#f8d7da"
+    if row.name != df.index[0]:
+        return [""] * len(row)
+    color = {"fifo": "#d4edda", "lifo": "#f8d7da", "hifo": "#fff3cd"}[method]
     return [f"background-color: {color}"] * len(row)
 
 st.subheader(f"📋 Purchase Lots for {selected_ticker}")
@@ -57,3 +55,19 @@ st.dataframe(
     df.style.apply(highlight_first, axis=1),
     use_container_width=True
 )
+
+# 7) Sale preview: which lots a sale would consume and the realized gain
+st.subheader("🧾 Sale Preview")
+held = float(df["Shares"].sum())
+col1, col2 = st.columns(2)
+sell_shares = col1.number_input("Shares to sell", min_value=0.0, max_value=held, value=0.0)
+sell_price = col2.number_input("Sale price", min_value=0.0,
+                               value=float(current_price) if pd.notna(current_price) else 0.0)
+if sell_shares > 0:
+    fills = ledger.sell(selected_ticker, sell_shares, sell_price,
+                        datetime.today().strftime("%Y-%m-%d"), method=method)
+    st.dataframe(fills.drop(columns="Ticker").set_index("Lot ID"), use_container_width=True)
+    by_term = fills.groupby("Term")["Realized Gain"].sum()
+    c1, c2 = st.columns(2)
+    c1.metric("Short-Term Gain", f"${by_term.get('Short', 0.0):,.2f}")
+    c2.metric("Long-Term Gain", f"${by_term.get('Long', 0.0):,.2f}")
@@ -20,6 +20,11 @@ from core.data_loader import fetch_historical_data
 from streamlit_app.components.investment_form import add_investment_form
 from streamlit_app.components.charts import display_weights_pie, plot_efficient_frontier
 
+@st.cache_data(show_spinner=False, ttl=3600)
+def _cached_history(tickers, start, end):
+    """Price history cached across reruns so rebalancing only re-solves."""
+    return fetch_historical_data(tickers, start, end)
+
 def app():
         # --- Page configuration ---
         #st.set_page_config(page_title="Portfolio Manager & Optimizer", layout="wide")
@@ -66,8 +71,10 @@ def app():
         # --- Metrics & Positions Preview ---
         if portfolio_data:
             # Compute summary metrics
-            # Build a simple holdings list for analyzer: [{'ticker','shares'}...]
-            holdings = [{"ticker": t, "shares": sum(l["shares"] for l in portfolio_data[t])}
+            # Build a simple holdings list for analyzer: [{'ticker','shares','cost'}...]
+            holdings = [{"ticker": t,
+                         "shares": sum(l["shares"] for l in portfolio_data[t]),
+                         "cost": sum(l["shares"] * l["price"] for l in portfolio_data[t])}
                         for t in portfolio_data]
             metrics = compute_portfolio_metrics(holdings)
             summary = metrics["summary"]
@@ -129,5 +136,47 @@ def app():
 
                         st.markdown("### 📈 Efficient Frontier")
                         plot_efficient_frontier(prices)
+
+            # --- 🔁 Rebalancing Orders (re-solved on every holdings change) ---
+            st.subheader("🔁 Rebalance Current Holdings")
+            if st.checkbox("Show rebalancing orders"):
+                r1, r2, r3 = st.columns(3)
+                risk_aversion = r1.slider("Risk Aversion", 0.5, 10.0, 2.0, 0.5)
+                cost_bps = r2.slider("Transaction Cost (bps)", 0, 100, 10)
+                turnover_bps = r3.slider("Turnover Penalty (bps)", 0, 500, 50)
+
+                tickers = [h["ticker"] for h in holdings]
+                end = datetime.today().strftime("%Y-%m-%d")
+                start = (datetime.today() - timedelta(days=365)).strftime("%Y-%m-%d")
+                prices = _cached_history(tuple(tickers), start, end)
+
+                if prices.empty or len(prices.columns) < len(tickers):
+                    st.error("❌ Failed to fetch historical prices for rebalancing.")
+                else:
+                    try:
+                        reb = PortfolioOptimizer(prices).rebalance(
+                            portfolio_data,
+                            risk_aversion=risk_aversion,
+                            transaction_cost=cost_bps / 10000,
+                            turnover_penalty=turnover_bps / 10000,
+                        )
+                    except ValueError as e:
+                        st.error(f"❌ Rebalancing failed: {e}")
+                    else:
+                        if reb["orders"].empty:
+                            st.info("✅ Current holdings are already optimal after costs.")
+                        else:
+                            st.dataframe(reb["orders"].style.format({
+                                "Current Weight": "{:.2%}",
+                                "Target Weight": "{:.2%}",
+                                "Order Shares": "{:+.0f}",
+                                "Order Value": "₹{:+.2f}",
+                                "Est. Cost": "₹{:.2f}",
+                            }), use_container_width=True)
+                            st.caption(
+                                f"Turnover {reb['turnover']:.2%} · "
+                                f"Estimated cost ₹{reb['transaction_cost']:.2f} · "
+                                f"Cash left ₹{reb['cash_remaining']:.2f}"
+                            )
         else:
             st.info("🚀 Start by adding an investment lot to this portfolio.")
@@ -1,94 +1,97 @@
 import streamlit as st
-import pandas as pd
-import yfinance as yf
-import os
-import json
+from datetime import datetime, timedelta
 
-#st.set_page_config(page_title="Positions", layout="wide")
-
-DATA_DIR = "user_data"
-
-def load_portfolio(portfolio_name):
-    filepath = os.path.join(DATA_DIR, f"{portfolio_name}.json")
-    if os.path.exists(filepath):
-        with open(filepath, "r") as f:
-            return json.load(f)
-    return {}
+from core.portfolio_io import get_portfolio
+from core.data_loader import fetch_historical_data, get_daily_returns
+from core.risk import risk_contributions, historical_risk_contributions
+from core.valuation import value_portfolio
+from core.harvest import scan_all_portfolios
 
-def get_current_price(ticker):
-    try:
-        price = yf.Ticker(ticker).history(period="1d")["Close"].iloc[-1]
-        return round(price, 2)
-    except Exception:
-        return None
+#st.set_page_config(page_title="Positions", layout="wide")
 
-def compute_position_summary(purchases):
-    total_shares = sum([p["shares"] for p in purchases])
-    total_cost = sum([p["shares"] * p["price"] for p in purchases])
-    avg_price = total_cost / total_shares if total_shares > 0 else 0
-    return total_shares, total_cost, avg_price
+@st.cache_data(show_spinner=False, ttl=3600)
+def _cached_history(tickers, start, end):
+    """Price history cached across reruns so the risk columns only recompute."""
+    return fetch_historical_data(tickers, start, end)
 
-def compute_position_metrics(ticker, purchases):
-    total_shares, total_cost, avg_price = compute_position_summary(purchases)
-    current_price = get_current_price(ticker)
-    if current_price is None:
-        return None
+@st.cache_data(show_spinner=False, ttl=600)
+def _cached_harvest_scan():
+    """Harvest candidates across all portfolios, rescanned at most every ten minutes."""
+    return scan_all_portfolios()
 
-    current_value = round(total_shares * current_price, 2)
-    total_gain = round(current_value - total_cost, 2)
-    total_gain_pct = round((total_gain / total_cost) * 100, 2) if total_cost else 0
+def compute_position_metrics(portfolio_data):
+    """Value every position from one price snapshot (see core.valuation)."""
+    positions = value_portfolio(portfolio_data)["positions"]
+    positions = positions.drop(columns=["Cost Basis"]).rename(columns={"Shares": "Shares Owned"})
+    money = ["Current Price", "Current Value", "Total Gain", "Total Gain %", "Day Gain", "Day Gain %"]
+    positions[money] = positions[money].round(2)
+    return positions
 
-    # Day Gain
-    hist = yf.Ticker(ticker).history(period="2d")
-    if len(hist) < 2:
-        day_gain = 0
-        day_gain_pct = 0
-    else:
-        prev_close = hist["Close"].iloc[-2]
-        change = current_price - prev_close
-        day_gain = round(change * total_shares, 2)
-        day_gain_pct = round((change / prev_close) * 100, 2) if prev_close else 0
+def add_risk_columns(df, confidence_level=0.95):
+    """
+    Append 1-day 95% marginal/component VaR and historical component ES
+    per position, from one year of daily returns.
+    """
+    end = datetime.today().strftime("%Y-%m-%d")
+    start = (datetime.today() - timedelta(days=365)).strftime("%Y-%m-%d")
+    returns = get_daily_returns(_cached_history(tuple(df["Ticker"]), start, end))
+    tickers = [t for t in df["Ticker"] if t in returns.columns]
+    if len(returns) < 2 or not tickers:
+        return df
 
-    return {
-        "Ticker": ticker,
-        "Shares Owned": total_shares,
-        "Current Price": current_price,
-        "Current Value": current_value,
-        "Total Gain": total_gain,
-        "Total Gain %": total_gain_pct,
-        "Day Gain": day_gain,
-        "Day Gain %": day_gain_pct,
-    }
+    values = df.set_index("Ticker")["Current Value"].loc[tickers]
+    total_value = values.sum()
+    weights = values / total_value
+    risk = risk_contributions(weights, returns.cov(), confidence_level, total_value)
+    hist = historical_risk_contributions(returns, weights, confidence_level, total_value)
+    return df.join(risk.join(hist), on="Ticker")
 
 def render_positions_table(portfolio_name):
     st.title(f"📊 Positions — {portfolio_name}")
-    portfolio_data = load_portfolio(portfolio_name)
+    portfolio_data = get_portfolio(portfolio_name)
     
     if not portfolio_data:
         st.info("No positions found in this portfolio.")
         return
 
-    rows = []
-    for ticker, purchases in portfolio_data.items():
-        metrics = compute_position_metrics(ticker, purchases)
-        if metrics:
-            rows.append(metrics)
-
-    df = pd.DataFrame(rows)
+    df = compute_position_metrics(portfolio_data)
     if not df.empty:
+        df = add_risk_columns(df)
         st.dataframe(df.style.format({
             "Current Price": "${:.2f}",
             "Current Value": "${:.2f}",
             "Total Gain": "${:.2f}",
             "Total Gain %": "{:.2f}%",
             "Day Gain": "${:.2f}",
-            "Day Gain %": "{:.2f}%"
-        }), use_container_width=True)
+            "Day Gain %": "{:.2f}%",
+            "Marginal VaR": "${:.2f}",
+            "Component VaR": "${:.2f}",
+            "Risk Contribution %": "{:.2f}%",
+            "Component ES": "${:.2f}",
+            "ES Contribution %": "{:.2f}%"
+        }, na_rep="—"), use_container_width=True)
     else:
         st.warning("Could not fetch current prices for any ticker.")
 
+def render_harvest_candidates():
+    with st.expander("🌾 Tax-Loss Harvesting — all portfolios"):
+        if not st.checkbox("Scan all portfolios for harvest candidates"):
+            return
+        candidates = _cached_harvest_scan()
+        if candidates.empty:
+            st.info("No lots are trading below cost.")
+            return
+        st.dataframe(candidates.style.format({
+            "Purchase Price": "${:.2f}",
+            "Current Price": "${:.2f}",
+            "Unrealized Loss": "${:.2f}",
+            "Loss %": "{:.2f}%",
+            "Harvest Value": "${:.2f}",
+        }), use_container_width=True)
+
 # ---- Main App Logic ----
 if "active_portfolio" in st.session_state:
     render_positions_table(st.session_state.active_portfolio)
+    render_harvest_candidates()
 else:
     st.warning("Please select or create a portfolio first.")
\ No newline at end of file
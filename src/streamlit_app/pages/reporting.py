@@ -7,6 +7,7 @@ import streamlit as st
 from core.data_loader import fetch_historical_data, get_daily_returns
 from core.optimizer import PortfolioOptimizer
 from core.risk import scenario_analysis
+from core.performance import performance_metrics
 from components.inputs import portfolio_input_form
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
@@ -38,6 +39,7 @@ if st.button("Generate Report"):
             "Rally": 0.15
         }
         scenario_results = scenario_analysis(port_returns, scenarios)
+        metrics = performance_metrics(port_returns).iloc[0]
 
         # --- Generate PDF
         buffer = BytesIO()
@@ -55,6 +57,12 @@ if st.button("Generate Report"):
             story.append(Paragraph(f"{key}: {val:.2%}", styles['Normal']))
         story.append(Spacer(1, 12))
 
+        story.append(Paragraph("Risk & Return Metrics:", styles['Heading2']))
+        for key, val in metrics.items():
+            fmt = f"{val:.2%}" if key in ("Annual Return", "Volatility", "Max Drawdown", "Hit Rate") else f"{val:.2f}"
+            story.append(Paragraph(f"{key}: {fmt}", styles['Normal']))
+        story.append(Spacer(1, 12))
+
         story.append(Paragraph("Optimal Weights:", styles['Heading2']))
         for asset, weight in weights.items():
             story.append(Paragraph(f"{asset}: {weight:.2%}", styles['Normal']))
@@ -9,9 +9,10 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 
-from core.data_loader import fetch_historical_data, get_daily_returns
+from core.data_loader import fetch_historical_data, get_daily_returns, fetch_sector
 from core.optimizer import PortfolioOptimizer
-from core.risk import scenario_analysis, stress_test_portfolio
+from core.risk import build_shock_matrix, revalue_scenarios, stress_test_portfolio, unmatched_shock_keys
+from core.performance import performance_metrics
 
 from components.inputs import portfolio_input_form
 from components.charts import display_weights_pie
@@ -50,19 +51,31 @@ if st.button("Simulate Scenarios"):
         display_weights_pie(weights)
         st.json(result['performance'])
 
-        # --- Simulated Scenarios
+        st.subheader("📐 Historical Risk & Return Metrics")
+        st.dataframe(performance_metrics(port_returns.rename("Optimized Portfolio")).T)
+
+        # --- Simulated Scenarios (per-sector shocks, full revaluation)
+        sectors = {t: fetch_sector(t) for t in weights}
         scenarios = {
-            "⚡ Tech Sector Crash": sector_shock / 100,
-            "📈 Interest Rate Spike": -interest_hike / 100,
-            "📉 Global Recession": -0.3,
-            "🚀 Market Rally": 0.15
+            "⚡ Tech Sector Crash": {"Technology": sector_shock / 100,
+                                    "Communication Services": sector_shock / 100},
+            "📈 Interest Rate Spike": {"*": -interest_hike / 100},
+            "📉 Global Recession": {"*": -0.3},
+            "🚀 Market Rally": {"*": 0.15}
         }
+        # preset scenarios may name sectors this portfolio doesn't hold
+        shocks = build_shock_matrix(scenarios, list(weights), sectors, strict=False)
+        for name, keys in unmatched_shock_keys(scenarios, list(weights), sectors).items():
+            st.caption(f"{name}: no holdings in {', '.join(keys)}")
+        revalued = revalue_scenarios(pd.Series(weights), shocks)
 
         st.subheader("🧪 Scenario Outcomes")
-        sim_results = scenario_analysis(port_returns, scenarios)
-        df_scenarios = pd.DataFrame.from_dict(sim_results, orient='index', columns=["Simulated Return"])
+        df_scenarios = revalued["return"].to_frame("Simulated Return")
         st.dataframe(df_scenarios.style.format({"Simulated Return": "{:.2%}"}))
 
+        st.subheader("🧩 Impact by Position")
+        st.dataframe(revalued["by_position"].style.format("{:.2%}"))
+
         # --- Stress Test
         st.subheader("🔧 Stress Testing (10% drop)")
         stress_loss = stress_test_portfolio(port_returns, shock_pct=-0.1)
@@ -71,5 +84,5 @@ if st.button("Simulate Scenarios"):
         # --- Line Chart: Overlay
         st.subheader("📉 Portfolio Returns Under Scenarios")
         base = port_returns.cumsum()
-        shock_df = pd.DataFrame({name: base + shock for name, shock in sim_results.items()})
+        shock_df = pd.DataFrame({name: base + shock for name, shock in revalued["return"].items()})
         st.line_chart(shock_df)
@@ -0,0 +1,37 @@
+"""
+Unit tests for bootstrap.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.core.bootstrap import bootstrap_indices, bootstrap_ci
+from src.core.performance import calculate_sharpe_ratio
+from src.core.risk import calculate_var
+
+
+def test_bootstrap_indices_shapes_and_blocks():
+    rng = np.random.default_rng(0)
+    for method in ("iid", "block", "stationary"):
+        idx = bootstrap_indices(100, 50, method, block_size=10, rng=rng)
+        assert idx.shape == (50, 100)
+        assert idx.min() >= 0 and idx.max() < 100
+
+    # moving blocks are runs of consecutive (circular) indices
+    idx = bootstrap_indices(100, 5, "block", block_size=10, rng=rng)
+    steps = (np.diff(idx[:, :10], axis=1) % 100)
+    assert (steps == 1).all()
+
+def test_bootstrap_ci_brackets_point_estimates():
+    returns = pd.Series(np.random.default_rng(1).normal(0.0005, 0.01, 750))
+
+    sharpe = bootstrap_ci(returns, "sharpe", n_resamples=2000, seed=3)
+    assert np.isclose(sharpe["estimate"], calculate_sharpe_ratio(returns))
+    assert sharpe["lower"] < sharpe["estimate"] < sharpe["upper"]
+
+    var = bootstrap_ci(returns, "var", n_resamples=2000, seed=3, confidence_level=0.95)
+    assert np.isclose(var["estimate"], calculate_var(returns, 0.95))
+    assert var["lower"] < var["estimate"] < var["upper"]
+
+    again = bootstrap_ci(returns, "var", n_resamples=2000, seed=3, confidence_level=0.95)
+    assert again == var
@@ -0,0 +1,39 @@
+"""
+Unit tests for cashflows.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.core.cashflows import xirr, portfolio_xirr, time_weighted_return, lot_flow_series
+
+
+def test_xirr_known_rates():
+    rates = xirr([
+        (["2023-01-01", "2024-01-01"], [-100.0, 110.0]),
+        (["2023-01-01", "2023-07-02", "2024-01-01"], [-100.0, -100.0, 200.0]),
+        (["2023-01-01", "2025-01-01"], [-100.0, 50.0]),
+    ])
+    assert np.isclose(rates[0], 0.10, atol=1e-3)
+    assert np.isclose(rates[1], 0.0, atol=1e-6)
+    assert np.isclose(rates[2], np.sqrt(0.5) - 1, atol=1e-3)
+
+def test_portfolio_xirr_many_portfolios():
+    lots = {"AAA": [{"shares": 10, "price": 100.0, "date": "2023-01-01"}]}
+    portfolios = {f"p{i}": lots for i in range(1000)}
+    prices = pd.Series({"AAA": 121.0})
+    rates = portfolio_xirr(portfolios, prices, as_of="2025-01-01")
+
+    assert len(rates) == 1000
+    assert np.allclose(rates, 0.1, atol=1e-3)
+    by_pos = portfolio_xirr({"p": lots}, prices, as_of="2025-01-01", by_position=True)
+    assert np.isclose(by_pos[("p", "AAA")], rates["p0"])
+
+def test_time_weighted_return_ignores_deposits():
+    nav = pd.Series([100.0, 110.0, 1110.0, 1221.0],
+                    index=pd.date_range("2024-01-01", periods=4))
+    flows = pd.Series([1000.0], index=[pd.Timestamp("2024-01-03")])
+    result = time_weighted_return(nav, flows)
+    assert np.isclose(result["twr"], 1.1 * 1.0 * 1.1 - 1)
+
+    assert lot_flow_series({"A": [{"shares": 2, "price": 5.0, "date": "2024-01-01"}]}).iloc[0] == 10.0
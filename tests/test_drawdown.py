@@ -0,0 +1,48 @@
+"""
+Unit tests for drawdown.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.core.drawdown import underwater, drawdown_stats, top_drawdowns, DrawdownTracker
+
+
+def test_drawdown_stats_simple_path():
+    nav = pd.Series([100, 110, 99, 88, 110, 120, 108, 121],
+                    index=pd.date_range("2024-01-01", periods=8))
+    stats = drawdown_stats(nav).iloc[0]
+
+    assert np.isclose(stats["Max Drawdown"], 88 / 110 - 1)
+    assert stats["Peak"] == nav.index[1]
+    assert stats["Trough"] == nav.index[3]
+    assert stats["Recovery"] == nav.index[4]
+    assert stats["Recovery Time"] == 1
+    assert stats["Max Duration"] == 2  # two sessions below the 110 peak
+    assert np.isclose(stats["Current Drawdown"], 0)
+    assert (underwater(nav).iloc[:, 0] <= 0).all()
+
+def test_top_drawdowns_episodes():
+    nav = pd.Series([100, 110, 99, 88, 110, 120, 108, 121, 100])
+    episodes = top_drawdowns(nav, n=3)
+
+    assert len(episodes) == 3
+    assert np.isclose(episodes["Drawdown"].iloc[0], 88 / 110 - 1)
+    assert episodes["Trough"].iloc[0] == 3
+    assert pd.isna(episodes["Recovery"].iloc[1])  # last episode not recovered
+
+def test_tracker_matches_batch():
+    rng = np.random.default_rng(0)
+    navs = 100 * np.cumprod(1 + rng.normal(0, 0.02, (300, 4)), axis=0)
+    batch = drawdown_stats(navs)
+
+    tracker = DrawdownTracker(4)
+    tracker.update(navs[:100])
+    tracker = DrawdownTracker.from_state(tracker.state_dict())
+    for row in navs[100:]:
+        tracker.update(row)
+
+    assert np.allclose(tracker.max_drawdown, batch["Max Drawdown"])
+    assert np.array_equal(tracker.max_drawdown_pos, batch["Trough"])
+    assert np.array_equal(tracker.max_duration, batch["Max Duration"])
+    assert np.allclose(tracker.current_drawdown, batch["Current Drawdown"])
@@ -0,0 +1,52 @@
+"""
+Unit tests for estimators.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.core.estimators import OnlineCovariance
+from src.core.optimizer import PortfolioOptimizer
+
+
+def _prices(n_days=200, n_assets=3, seed=1):
+    rng = np.random.default_rng(seed)
+    rets = rng.normal(0.0005, 0.01, (n_days, n_assets))
+    return pd.DataFrame(100 * np.cumprod(1 + rets, axis=0), columns=["A", "B", "C"][:n_assets])
+
+def test_streaming_matches_batch():
+    prices = _prices()
+    est = OnlineCovariance(prices.columns)
+    # one bar, then a batch, then bar by bar
+    est.update(prices.iloc[0])
+    est.update(prices.iloc[1:50])
+    for _, row in prices.iloc[50:].iterrows():
+        est.update(row)
+
+    returns = prices.pct_change().dropna()
+    assert est.n_obs == len(returns)
+    assert np.allclose(est.mean, returns.mean())
+    assert np.allclose(est.covariance, returns.cov())
+
+def test_checkpoint_restore(tmp_path):
+    prices = _prices()
+    est = OnlineCovariance(prices.columns, halflife=30)
+    est.update(prices.iloc[:100])
+    path = tmp_path / "est.npz"
+    est.save(path)
+
+    restored = OnlineCovariance.load(path)
+    est.update(prices.iloc[100:])
+    restored.update(prices.iloc[100:])
+    assert np.allclose(est.covariance, restored.covariance)
+    assert np.allclose(est.mean, restored.mean)
+
+def test_optimizer_from_estimator():
+    prices = _prices()
+    est = OnlineCovariance(prices.columns).update(prices)
+    opt = PortfolioOptimizer.from_estimator(est)
+    ref = PortfolioOptimizer(prices)
+
+    assert np.allclose(opt.mu, ref.mu)
+    assert np.allclose(opt.S, ref.S)
+    assert abs(sum(opt.hrp_optimization()["weights"].values()) - 1) < 1e-9
@@ -0,0 +1,65 @@
+"""
+Unit tests for harvest.py
+"""
+
+import pandas as pd
+
+from src.core.harvest import lot_table, scan_harvest
+
+
+def _portfolios():
+    return {
+        "taxable": {
+            "AAA": [{"shares": 10.0, "price": 100.0, "date": "2023-01-03"},
+                    {"shares": 10.0, "price": 90.0, "date": "2024-05-20"}],
+            "BBB": [{"shares": 100.0, "price": 50.0, "date": "2024-01-02"}],
+            "CCC": [{"shares": 10.0, "price": 10.0, "date": "2024-01-02"}],
+        },
+        "ira": {
+            "BBB": [{"shares": 1.0, "price": 40.0, "date": "2024-05-25"}],
+        },
+    }
+
+PRICES = {"AAA": 80.0, "BBB": 45.0, "CCC": 12.0}
+
+def test_lot_table_indexes():
+    names, tickers, lots = lot_table(_portfolios())
+    assert names == ["taxable", "ira"]
+    assert tickers == ["AAA", "BBB", "CCC"]
+    assert lots["lot"].tolist() == [0, 1, 0, 0, 0]
+    assert lots["portfolio"].tolist() == [0, 0, 0, 0, 1]
+
+def test_scan_ranks_losses_and_flags_wash_sales():
+    scan = scan_harvest(_portfolios(), PRICES, as_of="2024-06-03")
+
+    # CCC and the IRA BBB lot are at a gain
+    assert "CCC" not in scan["Ticker"].tolist()
+    assert "ira" not in scan["Portfolio"].tolist()
+    assert scan["Harvest Value"].is_monotonic_decreasing
+
+    bbb = scan[(scan["Ticker"] == "BBB") & (scan["Portfolio"] == "taxable")].iloc[0]
+    assert bbb["Unrealized Loss"] == 500.0
+    assert bbb["Harvest Value"] == 500.0 * 0.37
+    # the IRA bought BBB on 2024-05-25, inside the 30-day window
+    assert bbb["Wash Sale Risk"]
+    assert bbb["Clean Date"] == pd.Timestamp("2024-06-25")
+
+    aaa = scan.set_index(["Ticker", "Lot"]).loc[("AAA", 0)]
+    assert aaa["Term"] == "Long"
+    assert aaa["Harvest Value"] == 200.0 * 0.20
+    # lot 1 (bought 2024-05-20) makes selling lot 0 a wash sale
+    assert aaa["Wash Sale Risk"]
+
+def test_wash_sales_per_portfolio():
+    scan = scan_harvest(_portfolios(), PRICES, as_of="2024-06-03", across_portfolios=False)
+    # the IRA purchase no longer counts against the taxable lot
+    taxable_bbb = scan[(scan["Portfolio"] == "taxable") & (scan["Ticker"] == "BBB")].iloc[0]
+    assert not taxable_bbb["Wash Sale Risk"]
+    assert taxable_bbb["Clean Date"] == pd.Timestamp("2024-06-03")
+
+    # a lot's own recent purchase does not make its sale a wash sale
+    aaa_new = scan.set_index(["Ticker", "Lot"]).loc[("AAA", 1)]
+    assert aaa_new["Wash Sale Risk"] == False
+
+def test_empty_portfolios():
+    assert scan_harvest({}, {}, as_of="2024-06-03").empty
@@ -0,0 +1,107 @@
+"""
+Unit tests for importer.py
+"""
+
+import pandas as pd
+import pytest
+
+import src.core.importer as importer
+import src.core.nav_cache as nav_cache
+import src.core.portfolio_io as portfolio_io
+
+
+def _ohlc(ticker, start, end):
+    days = pd.bdate_range(start, end, inclusive="left")
+    base = {"AAA": 100.0, "BBB": 50.0}.get(ticker)
+    if base is None:
+        return pd.DataFrame()
+    return pd.DataFrame({"Open": base, "High": base * 1.01, "Low": base * 0.99, "Close": base}, index=days)
+
+@pytest.fixture
+def portfolio_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(portfolio_io, "PORTFOLIO_DIR", str(tmp_path / "portfolios"))
+    monkeypatch.setattr(nav_cache, "NAV_CACHE_DIR", str(tmp_path / "nav"))
+    calls = []
+    monkeypatch.setattr(importer, "fetch_ohlc_range", lambda t, s, e: calls.append(t) or _ohlc(t, s, e))
+    return calls
+
+def _write(tmp_path, rows):
+    path = tmp_path / "trades.csv"
+    pd.DataFrame(rows, columns=["Symbol", "Trade Date", "Quantity", "Price", "Action"]).to_csv(path, index=False)
+    return str(path)
+
+def test_import_validates_and_writes_once(portfolio_dir, tmp_path, monkeypatch):
+    path = _write(tmp_path, [
+        ["aaa", "2024-01-02", 10, 100.5, "BUY"],
+        ["AAA", "2024-01-03", 5, "$1,000.00", "BUY"],      # outside the day's range
+        ["BBB", "2024-01-06", 2, 50.0, "BUY"],             # Saturday -> unverified
+        ["BBB", "2024-01-08", 3, 49.8, "BUY"],
+        ["AAA", "2024-01-09", -4, 101.0, "SELL"],
+        ["CCC", "not a date", 1, 10.0, "BUY"],
+        ["CCC", "2024-01-10", 1, 10.0, "BUY"],             # no OHLC -> unverified
+    ] * 3)
+    saves = []
+    for writer in ("add_lots", "save_portfolio"):
+        original = getattr(importer, writer)
+        monkeypatch.setattr(importer, writer, lambda *a, _w=original, **k: saves.append(a[0]) or _w(*a, **k))
+    seen = []
+    report = importer.import_trades(path, "imported", chunksize=4,
+                                    progress=lambda done, total: seen.append((done, total)))
+
+    assert report["rows"] == 21
+    assert report["imported"] == 12
+    assert report["sold"] == 3
+    assert report["unverified"] == 6
+    assert report["skipped_sells"] == 0
+    assert sorted(report["rejected"]["reason"].unique()) == ["price outside the day's range", "unparseable date"]
+    assert report["rejected"]["row"].tolist()[:2] == [2, 6]
+    assert seen[-1] == (21, 21)
+    assert saves == ["imported"]                         # one write for all six chunks
+
+    # one OHLC download per ticker
+    assert sorted(portfolio_dir) == ["AAA", "BBB", "CCC"]
+
+    # 12 AAA shares sold FIFO out of three 10-share lots
+    data = portfolio_io.load_portfolio("imported")
+    assert [l["shares"] for l in data["AAA"]] == [8.0, 10.0]
+    assert len(data["BBB"]) == 6 and len(data["CCC"]) == 3
+    assert report["realized"]["Shares"].sum() == 12
+    assert report["realized"]["Realized Gain"].sum() == pytest.approx(12 * 0.5)
+
+def test_import_sells_respect_dates_and_ignore_flag(portfolio_dir, tmp_path):
+    path = _write(tmp_path, [
+        ["AAA", "2024-01-02", 10, 100.0, "BUY"],
+        ["AAA", "2024-01-03", 15, 100.0, "SELL"],          # only 10 held on that date
+        ["AAA", "2024-01-04", 10, 100.0, "BUY"],
+        ["AAA", "2024-01-05", 5, 100.0, "SELL"],
+    ])
+    report = importer.import_trades(path, "p", sell_method="lifo")
+    assert report["rejected"]["reason"].tolist() == ["sell exceeds shares held"]
+    assert [l["shares"] for l in portfolio_io.load_portfolio("p")["AAA"]] == [10.0, 5.0]
+
+    report = importer.import_trades(path, "q", ignore_sells=True)
+    assert report["skipped_sells"] == 2 and report["sold"] == 0
+    assert len(portfolio_io.load_portfolio("q")["AAA"]) == 2
+
+def test_failed_import_writes_nothing(portfolio_dir, tmp_path):
+    path = _write(tmp_path, [["AAA", "2024-01-02", 10, 100.0, "BUY"]] * 10)
+
+    def fail(done, total):
+        if done > 4:
+            raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        importer.import_trades(path, "p", chunksize=4, progress=fail)
+    assert portfolio_io.load_portfolio("p") == {}
+
+def test_import_without_validation_and_column_override(portfolio_dir, tmp_path):
+    path = tmp_path / "trades.csv"
+    pd.DataFrame({"Sym": ["AAA"], "When": ["2024-01-02"], "Qty": [1], "Px": [999.0]}).to_csv(path, index=False)
+
+    with pytest.raises(ValueError):
+        importer.import_trades(str(path), "p")
+
+    report = importer.import_trades(str(path), "p", validate=False,
+                                    columns={"ticker": "Sym", "date": "When", "shares": "Qty", "price": "Px"})
+    assert report["imported"] == 1
+    assert portfolio_dir == []
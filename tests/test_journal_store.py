@@ -0,0 +1,109 @@
+"""
+Unit tests for journal_store.py
+"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import src.core.journal_store as journal_store
+
+
+def _lot(date, shares=10.0, price=100.0):
+    return {"shares": shares, "price": price, "date": date}
+
+@pytest.fixture
+def journal_dir(tmp_path):
+    yield str(tmp_path)
+    journal_store.close_all()
+
+def test_diff_events_only_touch_changes():
+    old = {"AAA": [_lot("2024-01-02")], "BBB": [_lot("2024-01-03")]}
+    new = {"AAA": [_lot("2024-01-02"), _lot("2024-01-05")]}
+    events = journal_store.diff_events(old, new)
+    assert events == [
+        {"op": "add", "ticker": "AAA", "lot": _lot("2024-01-05")},
+        {"op": "remove", "ticker": "BBB", "index": 0},
+    ]
+    data = {t: list(l) for t, l in old.items()}
+    for e in events:
+        journal_store.apply_event(data, e)
+    assert data == new
+
+def test_snapshot_plus_tail_matches_full_replay(journal_dir, monkeypatch):
+    monkeypatch.setattr(journal_store, "SNAPSHOT_EVERY", 10)
+    for i in range(25):
+        journal_store.append_events(journal_dir, "p", [{"op": "add", "ticker": "AAA", "lot": _lot("2024-01-02", i)}])
+    journal_store.append_events(journal_dir, "p", [{"op": "remove", "ticker": "AAA", "index": 0}])
+
+    with open(os.path.join(journal_dir, "p.snap.json")) as f:
+        snap = json.load(f)
+    assert snap["seq"] == 20
+
+    journal_store.close_all()
+    data = journal_store.load_portfolio(journal_dir, "p")
+    assert [l["shares"] for l in data["AAA"]] == list(range(1, 25))
+    assert journal_store.load_portfolio_at(journal_dir, "p", float("inf")) == data
+
+def test_point_in_time(journal_dir, monkeypatch):
+    clock = iter([100.0, 200.0, 300.0])
+    monkeypatch.setattr(journal_store.time, "time", lambda: next(clock))
+    journal_store.save_portfolio(journal_dir, "p", {"AAA": [_lot("2024-01-02")]})
+    journal_store.save_portfolio(journal_dir, "p", {"AAA": [_lot("2024-01-02"), _lot("2024-02-01")]})
+    journal_store.append_events(journal_dir, "p", [{"op": "split", "ticker": "AAA", "ratio": 2, "date": "2024-03-01"}])
+
+    assert journal_store.load_portfolio_at(journal_dir, "p", 50) == {}
+    assert journal_store.load_portfolio_at(journal_dir, "p", 150) == {"AAA": [_lot("2024-01-02")]}
+    assert len(journal_store.load_portfolio_at(journal_dir, "p", 250)["AAA"]) == 2
+    assert journal_store.load_portfolio(journal_dir, "p")["AAA"][0] == _lot("2024-01-02", 20.0, 50.0)
+
+def test_torn_final_line_is_ignored(journal_dir):
+    journal_store.save_portfolio(journal_dir, "p", {"AAA": [_lot("2024-01-02")]})
+    journal_store.close_all()
+    with open(os.path.join(journal_dir, "p.log"), "ab") as f:
+        f.write(b'{"seq": 2, "op": "add", "tick')
+
+    assert journal_store.load_portfolio(journal_dir, "p") == {"AAA": [_lot("2024-01-02")]}
+    assert journal_store.get_all_portfolio_names(journal_dir) == ["p"]
+
+    # the next append replaces the torn line
+    journal_store.append_events(journal_dir, "p", [{"op": "add", "ticker": "BBB", "lot": _lot("2024-01-03")}])
+    journal_store.close_all()
+    assert journal_store.load_portfolio(journal_dir, "p") == {"AAA": [_lot("2024-01-02")], "BBB": [_lot("2024-01-03")]}
+
+def test_idle_writer_is_synced_after_the_interval(journal_dir, monkeypatch):
+    monkeypatch.setattr(journal_store, "FSYNC_INTERVAL", 0.05)
+    synced = []
+    fsync = os.fsync
+    monkeypatch.setattr(journal_store.os, "fsync", lambda fd: synced.append(fd) or fsync(fd))
+    journal_store.save_portfolio(journal_dir, "p", {"AAA": [_lot("2024-01-02")]})
+    assert synced == []
+
+    time.sleep(0.3)                     # no further append to trigger the check
+    assert len(synced) == 1
+    assert journal_store._journals[(os.path.abspath(journal_dir), "p")].unsynced == 0
+
+@pytest.mark.skipif(journal_store.fcntl is None, reason="needs advisory file locks")
+def test_torn_tail_of_a_live_writer_is_not_truncated(journal_dir):
+    journal_store.save_portfolio(journal_dir, "p", {"AAA": [_lot("2024-01-02")]})
+    journal_store.close_all()
+    line = json.dumps({"seq": 2, "ts": 0, "op": "add", "ticker": "BBB", "lot": _lot("2024-01-03")}).encode()
+
+    with open(os.path.join(journal_dir, "p.log"), "ab") as writer:
+        journal_store.fcntl.flock(writer.fileno(), journal_store.fcntl.LOCK_EX)
+        writer.write(line[:20])
+        writer.flush()
+        opener = threading.Thread(target=journal_store.load_portfolio, args=(journal_dir, "p"))
+        opener.start()
+        opener.join(0.2)
+        assert opener.is_alive()        # waits for the writer instead of truncating its line
+        writer.write(line[20:] + b"\n")
+        writer.flush()
+        journal_store.fcntl.flock(writer.fileno(), journal_store.fcntl.LOCK_UN)
+    opener.join()
+
+    journal_store.close_all()
+    assert journal_store.load_portfolio(journal_dir, "p") == {"AAA": [_lot("2024-01-02")], "BBB": [_lot("2024-01-03")]}
@@ -0,0 +1,92 @@
+"""
+Unit tests for lots.py
+"""
+
+import numpy as np
+import pytest
+
+from src.core.lots import LotLedger, holding_term
+
+
+def _ledger():
+    return LotLedger.from_portfolio({
+        "AAA": [
+            {"shares": 10.0, "price": 100.0, "date": "2022-01-03"},
+            {"shares": 10.0, "price": 150.0, "date": "2023-06-01"},
+            {"shares": 10.0, "price": 120.0, "date": "2024-02-01"},
+        ],
+        "BBB": [{"shares": 5.0, "price": 50.0, "date": "2024-01-02"}],
+    })
+
+@pytest.mark.parametrize("method, expected", [
+    ("fifo", [0, 1]),
+    ("lifo", [2, 1]),
+    ("hifo", [1, 2]),
+])
+def test_sell_matching_order(method, expected):
+    ledger = _ledger()
+    fills = ledger.sell("AAA", 15, 130.0, "2024-06-03", method=method)
+
+    assert fills["Lot ID"].tolist() == expected
+    assert fills["Shares"].tolist() == [10.0, 5.0]
+    assert ledger.lots["remaining"].sum() == pytest.approx(35 - 15)
+
+def test_specific_id_and_realized_gains():
+    ledger = _ledger()
+    ledger.sell("AAA", 4, 130.0, "2024-06-03", method="specific", lot_ids=[2])
+    ledger.sell("AAA", 10, 130.0, "2024-06-03")                    # FIFO lot 0
+
+    realized = ledger.realized_gains()
+    assert realized["Realized Gain"].tolist() == pytest.approx([4 * 10.0, 10 * 30.0])
+    assert realized["Term"].tolist() == ["Short", "Long"]
+
+    with pytest.raises(ValueError):
+        ledger.sell("AAA", 1, 130.0, "2024-06-03", method="specific", lot_ids=[0])
+    with pytest.raises(ValueError):
+        ledger.sell("BBB", 6, 60.0, "2024-06-03")
+
+@pytest.mark.parametrize("lot_ids", [[0, 0], [-1], [99]])
+def test_specific_sell_rejects_duplicate_or_unknown_ids(lot_ids):
+    ledger = _ledger()
+    with pytest.raises(ValueError):
+        ledger.sell("AAA", 15, 130.0, "2024-06-03", method="specific", lot_ids=lot_ids)
+    assert ledger.lots["remaining"].tolist() == [10.0, 10.0, 10.0, 5.0]
+    assert len(ledger.realized_gains()) == 0
+
+def test_sell_rejects_non_positive_shares():
+    ledger = _ledger()
+    for shares in (0, -5):
+        with pytest.raises(ValueError):
+            ledger.sell("AAA", shares, 130.0, "2024-06-03")
+    with pytest.raises(ValueError):
+        ledger.sell_many("AAA", [5, 0], [130.0, 130.0], ["2024-06-03", "2024-06-04"])
+
+def test_sell_many_only_consumes_lots_held_on_the_sell_date():
+    ledger = _ledger()
+    applied = ledger.sell_many("AAA", [25, 12, 5], [130.0, 130.0, 130.0],
+                               ["2024-06-03", "2023-01-02", "2023-07-03"], method="lifo")
+
+    # 2023-01-02: only lot 0 held -> 12 refused; 2023-07-03: LIFO takes lot 1
+    assert applied.tolist() == [True, False, True]
+    assert ledger.realized_gains()["Lot ID"].tolist() == [1, 2, 1, 0]
+    assert ledger.lots["remaining"].tolist() == [0.0, 0.0, 0.0, 5.0]
+
+def test_unrealized_gains_and_roundtrip():
+    ledger = _ledger()
+    ledger.sell("AAA", 10, 130.0, "2024-06-03")
+    u = ledger.unrealized_gains({"AAA": 140.0, "BBB": 40.0}, as_of="2024-06-03")
+
+    assert u.index.tolist() == [1, 2, 3]
+    assert u["Unrealized Gain"].tolist() == pytest.approx([-100.0, 200.0, -50.0])
+    assert u["Term"].tolist() == ["Long", "Short", "Short"]
+
+    summary = ledger.gains_summary({"AAA": 140.0, "BBB": 40.0}, as_of="2024-06-03")
+    assert summary.loc["AAA", "Realized Long"] == pytest.approx(300.0)
+    assert summary.loc["AAA", "Unrealized Short"] == pytest.approx(200.0)
+
+    assert sum(len(v) for v in ledger.to_portfolio().values()) == 3
+
+def test_holding_term_boundary():
+    terms = holding_term(np.array(["2023-03-01"] * 2, dtype="datetime64[D]"),
+                         np.array(["2024-03-01", "2024-03-02"], dtype="datetime64[D]"))
+    assert terms.tolist() == ["Short", "Long"]
@@ -0,0 +1,111 @@
+"""
+Unit tests for nav.py
+"""
+
+import numpy as np
+import pandas as pd
+
+import src.core.nav as nav
+import src.core.nav_cache as nav_cache
+from src.core.nav import share_position_matrix
+from src.core.drawdown import drawdown_stats
+
+
+def test_share_position_matrix_follows_lot_dates():
+    sessions = pd.bdate_range("2024-01-01", "2024-01-12")
+    portfolio = {
+        "AAA": [{"shares": 10, "price": 1.0, "date": "2023-12-01"},
+                {"shares": 5, "price": 1.0, "date": "2024-01-06"}],  # Saturday -> Monday
+        "BBB": [{"shares": 3, "price": 1.0, "date": "2024-01-03"}],
+    }
+    held = share_position_matrix(portfolio, sessions)
+
+    assert held.shape == (len(sessions), 2)
+    assert held.loc["2024-01-05", "AAA"] == 10
+    assert held.loc["2024-01-08", "AAA"] == 15
+    assert held.loc["2024-01-02", "BBB"] == 0
+    assert held.loc["2024-01-03", "BBB"] == 3
+    assert np.all(np.diff(held.values, axis=0) >= 0)
+
+
+def _prices(frame):
+    """fetch_historical_data stand-in serving rows of a fixed price frame."""
+    def fetch(tickers, start, end):
+        rows = frame[(frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end))]
+        return rows.reindex(columns=list(tickers)).dropna(how="all")
+    return fetch
+
+
+def test_cached_nav_keeps_cache_when_no_new_sessions(monkeypatch, tmp_path):
+    monkeypatch.setattr(nav_cache, "NAV_CACHE_DIR", str(tmp_path))
+    portfolio = {"AAA": [{"shares": 2, "price": 10.0, "date": "2024-01-02"}]}
+    frame = pd.DataFrame({"AAA": [10.0, 11.0]}, index=pd.bdate_range("2024-01-02", periods=2))
+    monkeypatch.setattr(nav, "fetch_historical_data", _prices(frame))
+
+    first = nav.cached_nav_series("p", portfolio, end_date="2024-01-04")
+    again = nav.cached_nav_series("p", portfolio, end_date="2024-01-10")
+
+    assert list(first["Total Value"]) == [20.0, 22.0]
+    assert list(again["Total Value"]) == [20.0, 22.0]
+
+
+def test_cached_nav_seeds_ffill_from_last_cached_price(monkeypatch, tmp_path):
+    monkeypatch.setattr(nav_cache, "NAV_CACHE_DIR", str(tmp_path))
+    portfolio = {"AAA": [{"shares": 2, "price": 10.0, "date": "2024-01-02"}],
+                 "BBB": [{"shares": 1, "price": 50.0, "date": "2024-01-02"}]}
+    frame = pd.DataFrame({"AAA": [10.0, 11.0, 12.0], "BBB": [50.0, np.nan, 55.0]},
+                         index=pd.bdate_range("2024-01-02", periods=3))
+    monkeypatch.setattr(nav, "fetch_historical_data", _prices(frame))
+
+    nav.cached_nav_series("p", portfolio, end_date="2024-01-03")
+    full = nav.cached_nav_series("p", portfolio, end_date="2024-01-05")
+
+    # BBB has no quote on 2024-01-03 and carries the cached 50.0
+    assert list(full["BBB"]) == [50.0, 50.0, 55.0]
+    assert list(full["Total Value"]) == [70.0, 72.0, 79.0]
+
+
+def test_flow_adjusted_returns_ignore_purchases():
+    portfolio = {"AAA": [{"shares": 10, "price": 10.0, "date": "2024-01-02"},
+                         {"shares": 10, "price": 10.0, "date": "2024-01-04"}]}
+    sessions = pd.bdate_range("2024-01-02", periods=4)
+    prices = np.array([10.0, 11.0, 11.0, 9.9])
+    held = share_position_matrix(portfolio, sessions)["AAA"].to_numpy()
+    nav_df = pd.DataFrame({"AAA": prices * held}, index=sessions)
+    nav_df["Total Value"] = nav_df["AAA"]
+
+    returns = nav.flow_adjusted_returns(nav_df, portfolio)
+
+    # the NAV doubles on 2024-01-04 from the purchase, the return is flat
+    assert np.allclose(returns, [0.1, 0.0, -0.1])
+
+
+def test_cached_drawdown_resumes_from_persisted_state(monkeypatch, tmp_path):
+    monkeypatch.setattr(nav_cache, "NAV_CACHE_DIR", str(tmp_path))
+    portfolio = {"AAA": [{"shares": 10, "price": 10.0, "date": "2024-01-02"},
+                         {"shares": 10, "price": 10.0, "date": "2024-01-05"}]}
+    sessions = pd.bdate_range("2024-01-02", periods=8)
+    prices = np.array([10.0, 12.0, 9.0, 9.0, 10.0, 8.0, 13.0, 12.0])
+    held = share_position_matrix(portfolio, sessions)["AAA"].to_numpy()
+    nav_df = pd.DataFrame({"AAA": prices * held}, index=sessions)
+    nav_df["Total Value"] = nav_df["AAA"]
+
+    nav.cached_drawdown("p", nav_df.iloc[:5], portfolio)
+    assert nav_cache.read_drawdown_state("p")["date"] == "2024-01-08"
+
+    # the resumed tracker never sees the first five sessions again
+    seen = []
+    update = nav.DrawdownTracker.update
+    monkeypatch.setattr(nav.DrawdownTracker, "update",
+                        lambda self, values: seen.append(len(values)) or update(self, values))
+    tracker = nav.cached_drawdown("p", nav_df, portfolio)
+
+    growth = pd.Series(prices / prices[0], index=sessions)
+    batch = drawdown_stats(growth).iloc[0]
+    assert seen == [3]
+    assert np.isclose(tracker.max_drawdown[0], batch["Max Drawdown"])
+    assert np.isclose(tracker.current_drawdown[0], batch["Current Drawdown"])
+    assert tracker.max_duration[0] == batch["Max Duration"]
+
+    nav_cache.invalidate_nav("p", "2024-01-10")
+    assert nav_cache.read_drawdown_state("p") is None
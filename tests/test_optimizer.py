@@ -14,3 +14,80 @@ def test_mean_variance_optimization():
     assert "weights" in result
     assert abs(sum(result["weights"].values()) - 1) < 0.01
     assert "sharpe_ratio" in result["performance"]
+
+def _synthetic_prices(n_days=300, n_assets=4, seed=0):
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    rets = rng.normal(0.0005, 0.01, (n_days, n_assets))
+    return pd.DataFrame(100 * np.cumprod(1 + rets, axis=0),
+                        columns=[f"T{i}" for i in range(n_assets)])
+
+def test_cvar_optimization():
+    import numpy as np
+    opt = PortfolioOptimizer(_synthetic_prices())
+    result = opt.cvar_optimization(confidence_level=0.95)
+
+    assert abs(sum(result["weights"].values()) - 1) < 1e-6
+    # reported CVaR matches the empirical tail mean of the optimal portfolio
+    w = np.array([result["weights"].get(t, 0.0) for t in opt.tickers])
+    losses = -(opt.returns.values @ w)
+    k = int(np.ceil(0.05 * len(losses)))
+    assert result["performance"]["cvar"] >= np.sort(losses)[-k:].mean() - 1e-6
+    assert result["performance"]["cvar"] >= result["performance"]["var"]
+
+def test_hrp_optimization():
+    opt = PortfolioOptimizer(_synthetic_prices(n_assets=6))
+    result = opt.hrp_optimization()
+
+    assert abs(sum(result["weights"].values()) - 1) < 1e-9
+    assert all(w > 0 for w in result["weights"].values())
+    assert len(result["weights"]) == 6
+
+def test_resampled_optimization_is_deterministic():
+    opt = PortfolioOptimizer(_synthetic_prices())
+    serial = opt.resampled_optimization(n_resamples=8, seed=42, n_jobs=1)
+    pooled = opt.resampled_optimization(n_resamples=8, seed=42, n_jobs=2)
+
+    # the in-process path leaves no worker state behind in the parent
+    import src.core.optimizer as optimizer
+    assert optimizer._RESAMPLE_RETURNS is None and optimizer._RESAMPLE_SHM is None
+
+    assert serial["n_resamples"] == pooled["n_resamples"] == 8
+    assert abs(sum(serial["weights"].values()) - 1) < 1e-6
+    for t, w in serial["weights"].items():
+        assert abs(pooled["weights"][t] - w) < 1e-9
+        low, high = serial["weight_bands"][t]
+        assert low <= high
+
+def test_rebalance_orders():
+    prices = _synthetic_prices()
+    opt = PortfolioOptimizer(prices)
+    holdings = {"T0": [{"shares": 100.0, "price": 90.0, "date": "2024-01-02"}],
+                "T1": [{"shares": 50.0, "price": 95.0, "date": "2024-01-02"},
+                       {"shares": 50.0, "price": 99.0, "date": "2024-02-01"}]}
+
+    free = opt.rebalance(holdings, transaction_cost=0.0)
+    costly = opt.rebalance(holdings, transaction_cost=0.0, turnover_penalty=1.0)
+
+    assert abs(sum(free["weights"].values()) - 1) < 1e-6
+    assert set(free["orders"].columns) >= {"Ticker", "Order Shares", "Order Value"}
+    # a prohibitive turnover penalty means holding still
+    assert costly["turnover"] <= free["turnover"]
+    assert costly["orders"].empty
+
+@pytest.mark.parametrize("whole_shares", [True, False])
+def test_rebalance_stays_within_cash_with_a_stale_last_row(whole_shares):
+    import numpy as np
+    prices = _synthetic_prices()
+    prices.iloc[-1, 2] = np.nan                      # exchange closed on the last session
+    opt = PortfolioOptimizer(prices)
+    assert np.isfinite(opt.last_prices).all()
+
+    holdings = {"T0": [{"shares": 3.0, "price": 90.0, "date": "2024-01-02"}]}
+    reb = opt.rebalance(holdings, cash=1000.0, transaction_cost=0.01, whole_shares=whole_shares)
+
+    assert reb["orders"]["Order Shares"].notna().all()
+    if whole_shares:
+        assert (reb["orders"]["Order Shares"] % 1 == 0).all()
+    assert reb["cash_remaining"] >= 0
@@ -0,0 +1,55 @@
+"""
+Unit tests for performance.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.core.performance import calculate_sharpe_ratio, performance_metrics, rolling_performance
+
+
+def _returns(seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(0.0005, 0.01, (500, 3)), columns=["A", "B", "C"])
+
+def test_performance_metrics_match_pandas():
+    returns = _returns()
+    bench = pd.Series(np.random.default_rng(9).normal(0.0004, 0.01, 500))
+    table = performance_metrics(returns, benchmark=bench)
+
+    for col in returns:
+        r = returns[col]
+        row = table.loc[col]
+        assert np.isclose(row["Sharpe Ratio"], calculate_sharpe_ratio(r))
+        assert np.isclose(row["Volatility"], r.std() * np.sqrt(252))
+        assert np.isclose(row["Skew"], r.skew(), rtol=0.02)
+        assert np.isclose(row["Hit Rate"], (r > 0).mean())
+        assert np.isclose(row["Beta"], r.cov(bench) / bench.var())
+        active = r - bench
+        assert np.isclose(row["Information Ratio"], active.mean() / active.std() * np.sqrt(252))
+
+def test_rolling_performance_matches_windowed():
+    r = _returns()["A"]
+    rolled = rolling_performance(r, window=60)
+
+    assert rolled.iloc[:59].isna().all().all()
+    for end in (60, 200, 500):
+        window = r.iloc[end - 60:end]
+        assert np.isclose(rolled["Sharpe Ratio"].iloc[end - 1], calculate_sharpe_ratio(window))
+        assert np.isclose(rolled["Volatility"].iloc[end - 1], window.std() * np.sqrt(252))
+
+def test_nans_only_affect_their_own_series_and_windows():
+    returns = _returns()
+    late = returns.copy()
+    late.loc[:99, "B"] = np.nan                  # B lists 100 periods later
+    late.loc[300, "C"] = np.nan                  # one missing quote
+
+    table = performance_metrics(late)
+    assert np.isclose(table.loc["A", "Volatility"], returns["A"].std() * np.sqrt(252))
+    assert np.isclose(table.loc["B", "Volatility"], returns["B"].iloc[100:].std() * np.sqrt(252))
+    assert np.isclose(table.loc["C", "Hit Rate"], (returns["C"].drop(300) > 0).mean())
+
+    rolled = rolling_performance(late, window=60)["Volatility"]
+    expected = late.rolling(60).std() * np.sqrt(252)
+    assert np.allclose(rolled, expected, equal_nan=True)
+    assert rolled["C"].iloc[300:360].isna().all() and rolled["C"].iloc[360:].notna().all()
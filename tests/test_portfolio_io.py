@@ -0,0 +1,185 @@
+"""
+Unit tests for portfolio_io.py and the NAV cache it maintains
+"""
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import src.core.journal_store as journal_store
+import src.core.nav_cache as nav_cache
+import src.core.portfolio_io as portfolio_io
+
+
+def _lot(date, shares=10.0, price=100.0):
+    return {"shares": shares, "price": price, "date": date}
+
+def _use_tmp_dirs(monkeypatch, tmp_path):
+    monkeypatch.setattr(portfolio_io, "PORTFOLIO_DIR", str(tmp_path / "portfolios"))
+    monkeypatch.setattr(nav_cache, "NAV_CACHE_DIR", str(tmp_path / "nav"))
+    monkeypatch.setattr(portfolio_io, "PORTFOLIO_DB", str(tmp_path / "portfolios.db"))
+    monkeypatch.setattr(portfolio_io, "PORTFOLIO_JOURNAL_DIR", str(tmp_path / "journal"))
+
+@pytest.fixture(params=["json", "sqlite", "journal"])
+def backend(request, monkeypatch, tmp_path):
+    _use_tmp_dirs(monkeypatch, tmp_path)
+    monkeypatch.setattr(portfolio_io, "PORTFOLIO_BACKEND", request.param)
+    yield request.param
+    journal_store.close_all()
+
+def test_save_and_load_roundtrip(backend):
+    data = {"AAA": [_lot("2024-01-02")], "BBB": [_lot("2024-01-03"), _lot("2023-05-01", 2.5, 10.0)]}
+    portfolio_io.save_portfolio("p", data)
+
+    assert portfolio_io.get_all_portfolio_names() == ["p"]
+    assert portfolio_io.load_portfolio("p") == data
+    assert portfolio_io.load_portfolio("missing") == {}
+
+def test_save_truncates_nav_cache_from_changed_lot(backend):
+    data = {"AAA": [_lot("2024-01-02")]}
+    portfolio_io.save_portfolio("p", data)
+
+    nav = pd.DataFrame({"Total Value": range(10)}, index=pd.bdate_range("2024-01-02", periods=10))
+    nav_cache.write_nav("p", nav)
+
+    # re-saving identical lots keeps the cache
+    portfolio_io.save_portfolio("p", {"AAA": [_lot("2024-01-02")]})
+    assert len(nav_cache.read_nav("p")) == 10
+
+    # a lot added on the 9th drops cached sessions from the 9th on
+    portfolio_io.save_portfolio("p", {"AAA": [_lot("2024-01-02"), _lot("2024-01-09")]})
+    cached = nav_cache.read_nav("p")
+    assert cached.index[-1] == pd.Timestamp("2024-01-08")
+
+    appended = nav_cache.append_nav("p", nav.iloc[3:])
+    assert len(appended) == 10
+
+def test_add_and_remove_lot(backend):
+    portfolio_io.save_portfolio("p", {"AAA": [_lot("2024-01-02")]})
+    nav = pd.DataFrame({"Total Value": range(10)}, index=pd.bdate_range("2024-01-02", periods=10))
+    nav_cache.write_nav("p", nav)
+
+    portfolio_io.add_lot("p", "BBB", _lot("2024-01-05", 3.0))
+    portfolio_io.add_lot("p", "AAA", _lot("2024-01-10"))
+    assert portfolio_io.load_portfolio("p") == {
+        "AAA": [_lot("2024-01-02"), _lot("2024-01-10")],
+        "BBB": [_lot("2024-01-05", 3.0)],
+    }
+    assert nav_cache.read_nav("p").index[-1] == pd.Timestamp("2024-01-04")
+
+    assert portfolio_io.remove_lot("p", "AAA", 0) == _lot("2024-01-02")
+    assert portfolio_io.load_portfolio("p")["AAA"] == [_lot("2024-01-10")]
+    assert nav_cache.read_nav("p").empty
+    with pytest.raises(KeyError):
+        portfolio_io.remove_lot("p", "AAA", 1)
+
+def test_remove_lot_rejects_negative_index(backend):
+    portfolio_io.save_portfolio("p", {"AAA": [_lot("2024-01-02"), _lot("2024-01-03")]})
+    with pytest.raises(KeyError):
+        portfolio_io.remove_lot("p", "AAA", -1)
+    assert len(portfolio_io.load_portfolio("p")["AAA"]) == 2
+
+def test_migrate_json_to_sqlite(monkeypatch, tmp_path):
+    _use_tmp_dirs(monkeypatch, tmp_path)
+    portfolios = {"a": {"AAA": [_lot("2024-01-02")]}, "b": {}}
+    for name, data in portfolios.items():
+        portfolio_io.save_portfolio(name, data)
+
+    assert portfolio_io.migrate_json_to_sqlite() == {"a": 1, "b": 0}
+    monkeypatch.setattr(portfolio_io, "PORTFOLIO_BACKEND", "sqlite")
+    assert sorted(portfolio_io.get_all_portfolio_names()) == ["a", "b"]
+    assert portfolio_io.load_portfolio("a") == portfolios["a"]
+
+def test_apply_split(backend):
+    portfolio_io.save_portfolio("p", {"AAA": [_lot("2024-01-02"), _lot("2024-03-01")]})
+    portfolio_io.apply_split("p", "AAA", 4, "2024-02-15")
+    assert portfolio_io.load_portfolio("p")["AAA"] == [_lot("2024-01-02", 40.0, 25.0), _lot("2024-03-01")]
+
+def test_point_in_time_needs_journal(monkeypatch, tmp_path):
+    _use_tmp_dirs(monkeypatch, tmp_path)
+    with pytest.raises(ValueError):
+        portfolio_io.load_portfolio_at("p", "2024-01-01T00:00:00")
+
+def test_repository_cache_reuses_parsed_portfolio(backend, monkeypatch):
+    portfolio_io.save_portfolio("p", {"AAA": [_lot("2024-01-02")]})
+    reads = []
+    read = portfolio_io._read_portfolio
+    monkeypatch.setattr(portfolio_io, "_read_portfolio", lambda name: reads.append(name) or read(name))
+
+    first = portfolio_io.get_portfolio("p")
+    assert portfolio_io.get_portfolio("p") is first
+    assert reads == ["p"]
+    with pytest.raises(TypeError):
+        first["AAA"][0]["shares"] = 1.0
+
+    # load_portfolio hands out a mutable copy of the cached lots
+    copy = portfolio_io.load_portfolio("p")
+    copy["AAA"].append(_lot("2024-01-03"))
+    assert len(portfolio_io.get_portfolio("p")["AAA"]) == 1
+
+    portfolio_io.add_lot("p", "AAA", _lot("2024-01-04"))
+    assert len(portfolio_io.get_portfolio("p")["AAA"]) == 2
+    assert reads == ["p", "p"]
+
+def test_repository_cache_sees_external_writes(monkeypatch, tmp_path):
+    _use_tmp_dirs(monkeypatch, tmp_path)
+    portfolio_io.save_portfolio("p", {"AAA": [_lot("2024-01-02")]})
+    assert portfolio_io.get_all_portfolio_names() == ["p"]
+    assert len(portfolio_io.get_portfolio("p")["AAA"]) == 1
+
+    # another process rewrites the file and adds a portfolio
+    with open(tmp_path / "portfolios" / "p.json", "w") as f:
+        json.dump({"AAA": [_lot("2024-01-02"), _lot("2024-01-03")]}, f)
+    with open(tmp_path / "portfolios" / "q.json", "w") as f:
+        json.dump({}, f)
+
+    assert len(portfolio_io.get_portfolio("p")["AAA"]) == 2
+    assert sorted(portfolio_io.get_all_portfolio_names()) == ["p", "q"]
+
+def test_binary_format_roundtrip_and_lazy_ticker_reads(monkeypatch, tmp_path):
+    _use_tmp_dirs(monkeypatch, tmp_path)
+    data = {"AAA": [_lot("2024-01-02", 1.5, 101.25), _lot("1999-12-31")], "BBB": [_lot("2024-02-29", 3.0, 7.0)]}
+    portfolio_io.save_portfolio("p", data)
+
+    monkeypatch.setattr(portfolio_io, "PORTFOLIO_FORMAT", "binary")
+    portfolio_io.save_portfolio("p", data)
+    files = sorted(os.listdir(tmp_path / "portfolios"))
+    assert files == ["p.pfb"]
+
+    assert portfolio_io.get_all_portfolio_names() == ["p"]
+    assert portfolio_io.load_portfolio("p") == data
+    assert portfolio_io.portfolio_tickers("p") == ["AAA", "BBB"]
+    assert portfolio_io.load_ticker_lots("p", "BBB") == data["BBB"]
+    assert portfolio_io.load_ticker_lots("p", "ZZZ") == []
+
+    # writing JSON again replaces the binary file
+    monkeypatch.setattr(portfolio_io, "PORTFOLIO_FORMAT", "json")
+    portfolio_io.add_lot("p", "BBB", _lot("2024-03-01"))
+    assert sorted(os.listdir(tmp_path / "portfolios")) == ["p.json"]
+    assert len(portfolio_io.load_ticker_lots("p", "BBB")) == 2
+
+def test_binary_format_refuses_what_it_cannot_hold(monkeypatch, tmp_path):
+    _use_tmp_dirs(monkeypatch, tmp_path)
+    monkeypatch.setattr(portfolio_io, "PORTFOLIO_FORMAT", "binary")
+
+    portfolio_io.save_portfolio("p", {"AAA": [{"shares": 10, "price": 99.5, "date": "2024-01-02"}]})
+    lot = portfolio_io.load_portfolio("p")["AAA"][0]
+    assert type(lot["shares"]) is int and type(lot["price"]) is float
+
+    with pytest.raises(ValueError, match="note"):
+        portfolio_io.save_portfolio("p", {"AAA": [{**_lot("2024-01-02"), "note": "gift"}]})
+    with pytest.raises(ValueError, match="YYYY-MM-DD"):
+        portfolio_io.save_portfolio("p", {"AAA": [_lot("2024-01-02T10:30:00")]})
+    assert portfolio_io.load_portfolio("p") == {"AAA": [lot]}
+
+def test_migrate_json_to_binary(monkeypatch, tmp_path):
+    _use_tmp_dirs(monkeypatch, tmp_path)
+    portfolio_io.save_portfolio("a", {"AAA": [_lot("2024-01-02")] * 3})
+    portfolio_io.save_portfolio("b", {})
+
+    assert portfolio_io.migrate_json_to_binary() == {"a": 3, "b": 0}
+    assert sorted(os.listdir(tmp_path / "portfolios")) == ["a.pfb", "b.pfb"]
+    assert portfolio_io.load_portfolio("a") == {"AAA": [_lot("2024-01-02")] * 3}
+    assert portfolio_io.load_portfolio("b") == {}
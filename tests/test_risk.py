@@ -3,8 +3,10 @@ Unit tests for risk_calculator.py
 """
 
 from src.core.risk import calculate_var, scenario_analysis, stress_test_portfolio
+from src.core.simulation import parametric_var
 import pandas as pd
 import numpy as np
+import pytest
 
 def test_calculate_var():
     returns = pd.Series(np.random.normal(0, 0.01, 252))
@@ -21,3 +23,88 @@ def test_stress_test_portfolio():
     returns = pd.Series(np.random.normal(0, 0.01, 252))
     stress = stress_test_portfolio(returns, shock_pct=-0.1)
     assert isinstance(stress, float)
+
+def test_var_es_table_matches_calculate_var():
+    from src.core.risk import var_es_table
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(0, 0.01, (5, 500))
+    table = var_es_table(matrix, confidence_levels=(0.95, 0.99), horizons=(1, 10))
+
+    for i in range(5):
+        row = pd.Series(matrix[i])
+        for cl in (0.95, 0.99):
+            var = calculate_var(row, cl)
+            assert np.isclose(table.loc[i, ("VaR", cl, 1)], var)
+            assert np.isclose(table.loc[i, ("VaR", cl, 10)], var * np.sqrt(10))
+            assert np.isclose(table.loc[i, ("ES", cl, 1)], row[row <= var].mean())
+
+def test_monte_carlo_var_reproducible_and_consistent():
+    rng = np.random.default_rng(1)
+    assets = pd.DataFrame(rng.normal(0, 0.01, (500, 3)), columns=["A", "B", "C"])
+    weights = {"A": 0.5, "B": 0.3, "C": 0.2}
+
+    mc = calculate_var(assets, 0.95, method="monte_carlo", weights=weights,
+                       n_paths=200_000, chunk_size=30_000, distribution="normal", seed=7)
+    mc_again = calculate_var(assets, 0.95, method="monte_carlo", weights=weights,
+                             n_paths=200_000, chunk_size=30_000, distribution="normal", seed=7, n_jobs=2)
+    parametric = calculate_var(assets, 0.95, method="parametric", weights=weights)
+
+    assert mc == mc_again
+    assert abs(mc - parametric) < 0.05 * abs(parametric)
+
+    # both methods default to the same distribution, and calculate_var passes it through
+    mc_default = calculate_var(assets, 0.95, method="monte_carlo", weights=weights,
+                               n_paths=200_000, chunk_size=30_000, seed=7)
+    assert mc_default == mc
+    t_var = calculate_var(assets, 0.95, method="parametric", weights=weights, distribution="t")
+    assert t_var == parametric_var(assets, 0.95, weights=weights, distribution="t") != parametric
+
+def test_rolling_var_matches_windowed_calculate_var():
+    from src.core.risk import rolling_var
+    returns = pd.Series(np.random.default_rng(2).normal(0, 0.01, 400))
+    rolled = rolling_var(returns, window=100, confidence_levels=(0.95, 0.99))
+
+    assert rolled.iloc[:99].isna().all().all()
+    for end in (100, 250, 400):
+        window = returns.iloc[end - 100:end]
+        assert np.isclose(rolled["VaR 95%"].iloc[end - 1], calculate_var(window, 0.95))
+        assert np.isclose(rolled["VaR 99%"].iloc[end - 1], calculate_var(window, 0.99))
+
+def test_scenario_engine_applies_sector_shocks():
+    from src.core.risk import build_shock_matrix, revalue_scenarios
+    tickers = ["AAPL", "MSFT", "JPM"]
+    sectors = {"AAPL": "Technology", "MSFT": "Technology", "JPM": "Financial Services"}
+    shocks = build_shock_matrix(
+        {"Tech Crash": {"Technology": -0.3, "*": -0.05},
+         "JPM Only": {"JPM": 0.1}},
+        tickers, sectors,
+    )
+    values = pd.Series({"AAPL": 1000.0, "MSFT": 500.0, "JPM": 500.0})
+    out = revalue_scenarios(values, shocks)
+
+    assert out["by_position"].loc["Tech Crash", "AAPL"] == -300.0
+    assert out["by_position"].loc["Tech Crash", "JPM"] == -25.0
+    assert out["pnl"]["JPM Only"] == 50.0
+    assert np.isclose(out["return"]["Tech Crash"], (-300 - 150 - 25) / 2000)
+
+    typo = {"Tech Crash": {"Tecnology": -0.3, "*": -0.05}}
+    with pytest.raises(ValueError, match="Tecnology"):
+        build_shock_matrix(typo, tickers, sectors)
+    loose = build_shock_matrix(typo, tickers, sectors, strict=False)
+    assert (loose.values == -0.05).all()
+
+def test_risk_contributions_sum_to_portfolio_risk():
+    from src.core.risk import risk_contributions, historical_risk_contributions
+    rng = np.random.default_rng(3)
+    assets = pd.DataFrame(rng.normal(0, [0.01, 0.02, 0.015], (1000, 3)), columns=["A", "B", "C"])
+    weights = pd.Series({"A": 0.5, "B": 0.3, "C": 0.2})
+
+    parametric = risk_contributions(weights, assets.cov(), 0.95)
+    vol = np.sqrt(weights @ assets.cov() @ weights)
+    assert np.isclose(parametric["Component VaR"].sum(), 1.6448536 * vol)
+    assert np.isclose(parametric["Risk Contribution %"].sum(), 100)
+
+    hist = historical_risk_contributions(assets, weights, 0.95)
+    port = assets @ weights
+    es = -port[port <= calculate_var(port, 0.95)].mean()
+    assert np.isclose(hist["Component ES"].sum(), es)
@@ -0,0 +1,85 @@
+"""
+Unit tests for stress.py
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.core.stress as stress
+
+CRISIS = "Test Crash"
+PRICES = pd.DataFrame({
+    "AAA": [100.0, 90.0, 80.0, 95.0],
+    "NEW.NS": [np.nan, np.nan, 50.0, 55.0],   # listed mid-window
+    "^NSEI": [1000.0, 900.0, 950.0, 1000.0],
+    "^GSPC": [4000.0, 3800.0, 3600.0, 3900.0],
+}, index=pd.date_range("2024-01-02", periods=4, freq="7D"))
+
+
+@pytest.fixture
+def downloads(monkeypatch, tmp_path):
+    """Scratch cache dir, a test crisis window and a recording fake download."""
+    monkeypatch.setattr(stress, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setitem(stress.CRISIS_CATALOG, CRISIS, ("2024-01-02", "2024-01-23"))
+    calls = []
+
+    def fetch(tickers, start, end):
+        calls.append(tuple(tickers))
+        return PRICES.reindex(columns=[t for t in tickers if t in PRICES])
+
+    monkeypatch.setattr(stress, "fetch_historical_data", fetch)
+    return calls
+
+
+def test_paths_are_cached_and_only_missing_tickers_downloaded(downloads):
+    stress.precompute_crisis_paths(CRISIS, ["AAA", "^GSPC"])
+    stress.precompute_crisis_paths(CRISIS, ["AAA", "^GSPC"])
+    table = stress.precompute_crisis_paths(CRISIS, ["AAA", "^NSEI"])
+
+    assert downloads == [("AAA", "^GSPC"), ("^NSEI",)]
+    assert np.allclose(table["AAA"], [1.0, 0.9, 0.8, 0.95])
+
+
+def test_failed_download_is_not_cached(downloads, monkeypatch):
+    monkeypatch.setattr(stress, "fetch_historical_data", lambda *a: pd.DataFrame())
+    with pytest.raises(ValueError, match="AAA"):
+        stress.crisis_paths(CRISIS, ["AAA"])
+    assert not os.listdir(stress.CACHE_DIR)
+
+
+def test_proxy_substituted_for_ticker_without_history(downloads):
+    paths, substitutions = stress.crisis_paths(CRISIS, ["AAA", "NEW.NS"])
+
+    assert substitutions == {"NEW.NS": "^NSEI"}
+    assert np.allclose(paths["NEW.NS"], [1.0, 0.9, 0.95, 1.0])
+
+
+def test_replay_crisis_math(downloads):
+    result = stress.replay_crisis(pd.Series({"AAA": 1000.0, "NEW.NS": 500.0}), CRISIS)
+
+    expected = 1000.0 * np.array([1.0, 0.9, 0.8, 0.95]) + 500.0 * np.array([1.0, 0.9, 0.95, 1.0])
+    assert np.allclose(result["value"], expected)
+    assert np.allclose(result["pnl"], expected - 1500.0)
+    assert result["max_loss"] == pytest.approx(-225.0)
+    assert result["by_position"]["AAA"] == pytest.approx(-50.0)
+    assert result["by_position"]["NEW.NS"] == pytest.approx(0.0)
+
+
+def test_exchange_holiday_on_window_start_keeps_the_path(downloads, monkeypatch):
+    # US markets closed on the first day, Indian ones open
+    mixed = pd.DataFrame({
+        "AAA": [np.nan, 100.0, 90.0],
+        "^GSPC": [np.nan, 4000.0, 3600.0],
+        "BBB.NS": [50.0, 55.0, 60.0],
+    }, index=pd.bdate_range("2024-01-02", periods=3))
+    monkeypatch.setattr(stress, "fetch_historical_data",
+                        lambda tickers, start, end: mixed.reindex(columns=list(tickers)))
+
+    result = stress.replay_crisis(pd.Series({"AAA": 1000.0, "BBB.NS": 500.0}), CRISIS)
+
+    assert result["substitutions"] == {}
+    assert np.allclose(result["value"], [1500.0, 1550.0, 1500.0])
+    assert stress._read_cache(CRISIS)["AAA"].notna().any()
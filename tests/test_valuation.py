@@ -0,0 +1,36 @@
+"""
+Unit tests for valuation.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.core.valuation import holdings_arrays, value_portfolio
+
+
+PORTFOLIO = {
+    "AAA": [{"shares": 10.0, "price": 100.0, "date": "2024-01-02"},
+            {"shares": 10.0, "price": 120.0, "date": "2024-03-01"}],
+    "BBB": [{"shares": 5.0, "price": 50.0, "date": "2024-02-01"}],
+    "CCC": [{"shares": 1.0, "price": 10.0, "date": "2024-02-01"}],
+}
+
+def test_holdings_arrays():
+    tickers, shares, cost = holdings_arrays(PORTFOLIO)
+    assert tickers == ["AAA", "BBB", "CCC"]
+    assert np.allclose(shares, [20, 5, 1])
+    assert np.allclose(cost, [2200, 250, 10])
+
+def test_value_portfolio_from_snapshot():
+    snapshot = pd.DataFrame({"latest": [121.0, 40.0, np.nan], "previous": [110.0, 50.0, 9.0]},
+                            index=["AAA", "BBB", "CCC"])
+    result = value_portfolio(PORTFOLIO, snapshot)
+    pos = result["positions"].set_index("Ticker")
+
+    assert list(pos.index) == ["AAA", "BBB"]  # unpriced CCC is left out
+    assert np.isclose(pos.loc["AAA", "Current Value"], 2420)
+    assert np.isclose(pos.loc["AAA", "Total Gain"], 220)
+    assert np.isclose(pos.loc["AAA", "Day Gain %"], 10)
+    assert np.isclose(pos.loc["BBB", "Total Gain %"], -20)
+    assert np.isclose(result["summary"]["total_value"], 2620)
+    assert np.isclose(result["summary"]["day_gain"], 220 - 50)